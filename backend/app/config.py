@@ -3,10 +3,31 @@ LLM Orchestration Engine - Configuration
 Enterprise-grade settings with environment-based configuration
 """
 
+import sys
+from types import MappingProxyType
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 from typing import Optional
-from functools import lru_cache
+from dataclasses import dataclass
+from enum import IntFlag
+from functools import cache, cached_property
+
+
+class Provider(IntFlag):
+    """Bitset of LLM providers for O(1) availability checks"""
+    OPENAI = 1
+    ANTHROPIC = 2
+    GEMINI = 4
+    AZURE = 8
+    BEDROCK = 16
+    LOCAL = 32
+    MOCK = 64
+    
+    @classmethod
+    def from_name(cls, name: Optional[str]) -> "Provider":
+        """Flag for a provider name ("openai", "local", ...); empty for unknown names"""
+        member = cls.__members__.get((name or "").upper())
+        return member if member is not None else cls(0)
 
 
 class Settings(BaseSettings):
@@ -23,6 +44,7 @@ class Settings(BaseSettings):
     app_version: str = "1.0.0"
     environment: str = Field(default="development", validation_alias="ENVIRONMENT")
     debug: bool = Field(default=True, validation_alias="DEBUG")
+    debug_validate_responses: bool = Field(default=False, validation_alias="DEBUG_VALIDATE_RESPONSES")
     
     # API Security
     api_key_header: str = "X-API-Key"
@@ -64,35 +86,50 @@ class Settings(BaseSettings):
     enable_local_models: bool = Field(default=True, validation_alias="ENABLE_LOCAL_MODELS")
     local_model_path: str = Field(default="./models", validation_alias="LOCAL_MODEL_PATH")
     
+    # Exact-match response cache (identical resubmits, retries, idempotent replays)
+    enable_exact_cache: bool = Field(default=False, validation_alias="ENABLE_EXACT_CACHE")
+    exact_cache_size: int = Field(default=4096, validation_alias="EXACT_CACHE_SIZE")
+    exact_cache_ttl_s: float = Field(default=300.0, validation_alias="EXACT_CACHE_TTL_S")
+    
+    # Semantic response cache (reuse answers for near-duplicate prompts)
+    enable_semantic_cache: bool = Field(default=False, validation_alias="ENABLE_SEMANTIC_CACHE")
+    semantic_cache_threshold: float = Field(default=0.85, validation_alias="SEMANTIC_CACHE_THRESHOLD")
+    semantic_cache_size: int = Field(default=1024, validation_alias="SEMANTIC_CACHE_SIZE")
+    
     # Metrics & Observability
     enable_metrics: bool = Field(default=True, validation_alias="ENABLE_METRICS")
     metrics_retention_days: int = Field(default=30, validation_alias="METRICS_RETENTION_DAYS")
     
-    @property
-    def valid_api_keys(self) -> set:
-        """Parse comma-separated API keys into a set"""
-        return set(key.strip() for key in self.api_keys.split(",") if key.strip())
+    @cached_property
+    def valid_api_keys(self) -> frozenset[str]:
+        """Parse comma-separated API keys into a set (computed once per instance)"""
+        return frozenset(key.strip() for key in self.api_keys.split(",") if key.strip())
     
-    @property
-    def available_providers(self) -> list:
-        """Return list of configured providers"""
-        providers = []
+    @cached_property
+    def provider_flags(self) -> Provider:
+        """Bitset of configured providers (computed once per instance)"""
+        flags = Provider(0)
         if self.openai_api_key:
-            providers.append("openai")
+            flags |= Provider.OPENAI
         if self.anthropic_api_key:
-            providers.append("anthropic")
+            flags |= Provider.ANTHROPIC
         if self.gemini_api_key:
-            providers.append("gemini")
+            flags |= Provider.GEMINI
         if self.azure_openai_api_key and self.azure_openai_endpoint:
-            providers.append("azure")
+            flags |= Provider.AZURE
         if self.enable_local_models:
-            providers.append("local")
+            flags |= Provider.LOCAL
         # Always include mock for testing
-        providers.append("mock")
-        return providers
+        flags |= Provider.MOCK
+        return flags
+    
+    @cached_property
+    def available_providers(self) -> tuple[str, ...]:
+        """Return configured providers (computed once per instance)"""
+        return tuple(p.name.lower() for p in Provider if p & self.provider_flags)
 
 
-@lru_cache()
+@cache
 def get_settings() -> Settings:
     """Cached settings instance"""
     return Settings()
@@ -240,4 +277,85 @@ MODEL_CAPABILITIES = {
         "quality_score": 0.5,
         "provider": "mock",
     },
-}
\ No newline at end of file
+}
+
+
+def _freeze_table(table: dict) -> MappingProxyType:
+    """Read-only view with interned model keys and task names (tasks kept as ordered tuples)"""
+    frozen = {}
+    for model, entry in table.items():
+        entry = dict(entry)
+        if "tasks" in entry:
+            entry["tasks"] = tuple(sys.intern(task) for task in entry["tasks"])
+        frozen[sys.intern(model)] = MappingProxyType(entry)
+    return MappingProxyType(frozen)
+
+
+MODEL_PRICING = _freeze_table(MODEL_PRICING)
+MODEL_CAPABILITIES = _freeze_table(MODEL_CAPABILITIES)
+
+
+@dataclass(frozen=True)
+class ModelTable:
+    """
+    Column-oriented view of MODEL_PRICING / MODEL_CAPABILITIES for the router hot path.
+    Row i of every column describes names[i]; None marks a missing value.
+    """
+    names: tuple[str, ...]
+    index: dict[str, int]
+    providers: tuple[Optional[str], ...]
+    provider_flags: tuple[Provider, ...]
+    input_cost: tuple[Optional[float], ...]
+    output_cost: tuple[Optional[float], ...]
+    avg_latency_ms: tuple[Optional[float], ...]
+    quality_score: tuple[Optional[float], ...]
+    task_mask: dict[str, int]  # bit i set when names[i] supports the task
+
+
+def _build_model_table() -> ModelTable:
+    """Flatten the pricing/capability dicts into parallel columns"""
+    names = tuple(dict.fromkeys([*MODEL_CAPABILITIES, *MODEL_PRICING]))
+    caps = [MODEL_CAPABILITIES.get(name) for name in names]
+    pricing = [MODEL_PRICING.get(name) for name in names]
+    
+    task_mask: dict[str, int] = {}
+    for i, cap in enumerate(caps):
+        for task in (cap or {}).get("tasks", []):
+            task_mask[task] = task_mask.get(task, 0) | (1 << i)
+    
+    return ModelTable(
+        names=names,
+        index={name: i for i, name in enumerate(names)},
+        providers=tuple(c.get("provider", "unknown") if c else None for c in caps),
+        provider_flags=tuple(Provider.from_name(c.get("provider") if c else None) for c in caps),
+        input_cost=tuple(p["input"] if p else None for p in pricing),
+        output_cost=tuple(p["output"] if p else None for p in pricing),
+        avg_latency_ms=tuple(c.get("avg_latency_ms", 1000) if c else None for c in caps),
+        quality_score=tuple(c.get("quality_score", 0.5) if c else None for c in caps),
+        task_mask=task_mask,
+    )
+
+
+MODEL_TABLE = _build_model_table()
+
+
+def _build_model_info(model: str) -> dict:
+    """Public model description (as served by /models) with every default filled in"""
+    pricing = MODEL_PRICING.get(model, {})
+    capabilities = MODEL_CAPABILITIES.get(model, {})
+    return {
+        "model": model,
+        "provider": capabilities.get("provider", "unknown"),
+        "tasks": capabilities.get("tasks", ()),
+        "max_tokens": capabilities.get("max_tokens", 4096),
+        "avg_latency_ms": capabilities.get("avg_latency_ms", 1000),
+        "quality_score": capabilities.get("quality_score", 0.5),
+        "pricing": {
+            "input_per_1k_tokens": pricing.get("input", 0),
+            "output_per_1k_tokens": pricing.get("output", 0),
+        },
+    }
+
+
+# Built once at import; treat entries as read-only
+MODEL_INFO_TABLE = MappingProxyType({model: _build_model_info(model) for model in MODEL_TABLE.names})
@@ -3,60 +3,398 @@ LLM Orchestration Engine - Local Storage
 Local file-based storage that mimics DynamoDB for development
 """
 
+import atexit
 import json
+import logging
 import os
-from typing import Optional, Any
-from datetime import datetime
+import queue
+from functools import cache
+from typing import Iterator, Optional, Any
+from datetime import datetime, timezone
 from pathlib import Path
 import threading
+from collections import defaultdict, deque
+
+# orjson is optional; fall back to the stdlib encoder when it isn't installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes (values JSON can't encode fall back to str)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+
+def _loads(data: bytes) -> Any:
+    """Deserialize JSON bytes (orjson.JSONDecodeError subclasses json.JSONDecodeError)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write bytes to a temp file with raw os.write, then atomically swap it into place"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+
+def _normalize_datetimes(entry: dict) -> dict:
+    """Store top-level datetimes as ISO strings (nested values go through the encoder's fallback)"""
+    for key, value in entry.items():
+        if isinstance(value, datetime):
+            entry[key] = value.isoformat()
+    return entry
+
+
+def _now_iso() -> tuple[datetime, str]:
+    """Current naive UTC time and its ISO string, computed once per call site"""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return now, now.isoformat()
+
+
+def _epoch_us(dt: datetime) -> int:
+    """Convert a datetime to integer epoch microseconds (naive values are UTC)"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1_000_000)
+
+
+def _entry_ts_us(entry: dict) -> int:
+    """Integer timestamp of a stored entry, parsed from its ISO string (0 if missing)"""
+    try:
+        return _epoch_us(datetime.fromisoformat(entry["timestamp"]))
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def _insort_by_ts(index: deque, item: tuple[int, dict]):
+    """Insert keeping the index in timestamp order (late arrivals usually land near the end)"""
+    ts_us = item[0]
+    pos = len(index)
+    while pos and index[pos - 1][0] > ts_us:
+        pos -= 1
+    if pos == len(index):
+        index.append(item)
+    else:
+        index.insert(pos, item)
+
+
+class _NDJSONStream:
+    """
+    Append-only newline-delimited JSON file
+    Each record is one line, so an insert is a single write instead of a full rewrite.
+    Appends are buffered and flushed every FLUSH_EVERY records (and on close/exit).
+    """
+    
+    BUFFER_SIZE = 256 * 1024
+    FLUSH_EVERY = 64
+    
+    def __init__(self, path: Path, max_records: int):
+        self.path = path
+        self.max_records = max_records
+        self.count = self._compact()
+        self._pending = 0
+        self._fp = open(self.path, "ab", buffering=self.BUFFER_SIZE)
+    
+    def _compact(self) -> int:
+        """Trim the file to the newest max_records lines and return the line count"""
+        if not self.path.exists():
+            self.path.touch()
+            return 0
+        
+        lines = self.path.read_bytes().splitlines(keepends=True)
+        
+        if len(lines) <= self.max_records:
+            return len(lines)
+        
+        _atomic_write(self.path, b"".join(lines[-self.max_records:]))
+        return self.max_records
+    
+    def append(self, record: dict):
+        """Append a single record"""
+        self.append_many([record])
+    
+    def append_many(self, records: list[dict]):
+        """Append a batch of records with a single write"""
+        self._fp.write(b"".join(_dumps(record) + b"\n" for record in records))
+        self.count += len(records)
+        self._pending += len(records)
+        if self._pending >= self.FLUSH_EVERY:
+            self.flush()
+        
+        # Rotate lazily once the file holds twice the retained records
+        if self.count >= 2 * self.max_records:
+            self._fp.close()
+            self.count = self._compact()
+            self._pending = 0
+            self._fp = open(self.path, "ab", buffering=self.BUFFER_SIZE)
+    
+    def read(self) -> list[dict]:
+        """Read the retained (newest max_records) records in insertion order"""
+        self.flush()
+        skip = max(0, self.count - self.max_records)
+        records = []
+        with open(self.path, "rb") as f:
+            for i, line in enumerate(f):
+                if i < skip or not line.strip():
+                    continue
+                try:
+                    records.append(_loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return records
+    
+    def __len__(self) -> int:
+        return min(self.count, self.max_records)
+    
+    def size_bytes(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+    
+    def flush(self):
+        """Push buffered records to disk"""
+        if not self._fp.closed:
+            self._fp.flush()
+        self._pending = 0
+    
+    def truncate(self):
+        """Drop all records"""
+        self._fp.close()
+        self._fp = open(self.path, "wb", buffering=self.BUFFER_SIZE)
+        self.count = 0
+        self._pending = 0
+    
+    def close(self):
+        self._fp.close()
+
+
+class _MemoryStream:
+    """Stand-in for _NDJSONStream when nothing is persisted"""
+    
+    def read(self) -> list[dict]:
+        return []
+    
+    def size_bytes(self) -> int:
+        return 0
+    
+    def flush(self):
+        pass
+    
+    def truncate(self):
+        pass
+    
+    def close(self):
+        pass
 
 
 class LocalStorage:
     """
     Local JSON-based storage that mimics DynamoDB operations
     Used for development and testing without AWS
+    
+    Logs and metrics are append-only NDJSON streams next to the main file;
+    jobs are sharded one file per job so job CRUD only touches that job's bytes.
+    Everything is loaded once into memory so queries never hit disk; log/metric
+    appends are handed to a background writer thread so callers never block on I/O.
+    With in_memory=True nothing touches disk (storage_path is only reported in stats).
     """
     
-    def __init__(self, storage_path: str = "./data/storage.json"):
+    MAX_LOGS = 10000
+    MAX_METRICS = 50000
+    
+    def __init__(self, storage_path: str = "./data/storage.json", in_memory: bool = False):
         self.storage_path = Path(storage_path)
-        self._lock = threading.Lock()
-        self._ensure_storage_exists()
+        self.in_memory = in_memory
+        self._lock = threading.RLock()
+        
+        stem = self.storage_path.stem
+        self._jobs_dir = self.storage_path.with_name(f"{stem}.jobs")
+        self._job_locks: defaultdict[str, threading.Lock] = defaultdict(threading.Lock)
+        
+        if in_memory:
+            self._logs = self._metrics = _MemoryStream()
+        else:
+            self._ensure_storage_exists()
+            logs_path = self.storage_path.with_name(f"{stem}.logs.ndjson")
+            metrics_path = self.storage_path.with_name(f"{stem}.metrics.ndjson")
+            self._migrate_legacy_file(logs_path, metrics_path)
+            self._logs = _NDJSONStream(logs_path, self.MAX_LOGS)
+            self._metrics = _NDJSONStream(metrics_path, self.MAX_METRICS)
+        
+        # In-memory mirror (source of truth for reads); logs are indexed as (epoch_us, entry)
+        # so the integer timestamp used for filtering never appears in the entries themselves
+        self._log_cache: deque[tuple[int, dict]] = deque()
+        self._logs_by_model: defaultdict[str, deque[tuple[int, dict]]] = defaultdict(deque)
+        for log_entry in self._logs.read():
+            log_entry.pop("ts_us", None)  # Written into entries by earlier versions
+            self._index_log(log_entry, _entry_ts_us(log_entry))
+        self._metric_cache: deque[dict] = deque(self._metrics.read(), maxlen=self.MAX_METRICS)
+        self._job_cache: dict[str, dict] = {}
+        self._job_sizes: dict[str, int] = {}
+        
+        # Background writer for log/metric appends
+        self._io_lock = threading.Lock()
+        self._write_queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        if in_memory:
+            return
+        
+        self._load_jobs()
+        self._writer = threading.Thread(target=self._drain, name="local-storage-writer", daemon=True)
+        self._writer.start()
+        
+        atexit.register(self.flush)
     
     def _ensure_storage_exists(self):
-        """Create storage file if it doesn't exist"""
+        """Create storage directories if they don't exist"""
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.storage_path.exists():
-            self._write_data({"logs": [], "jobs": {}, "metrics": []})
+        self._jobs_dir.mkdir(exist_ok=True)
     
-    def _read_data(self) -> dict:
-        """Read all data from storage"""
+    def _migrate_legacy_file(self, logs_path: Path, metrics_path: Path):
+        """One-time move of the logs, metrics and jobs earlier versions kept in storage_path"""
         try:
-            with open(self.storage_path, 'r') as f:
-                return json.load(f)
+            legacy = _loads(self.storage_path.read_bytes())
         except (json.JSONDecodeError, FileNotFoundError):
-            return {"logs": [], "jobs": {}, "metrics": []}
+            return
+        if not isinstance(legacy, dict) or not {"logs", "metrics", "jobs"} & legacy.keys():
+            return
+        
+        for key, path in (("logs", logs_path), ("metrics", metrics_path)):
+            records = legacy.pop(key, None)
+            if not records:
+                continue
+            # Legacy records predate anything already streamed, so they go first
+            existing = path.read_bytes() if path.exists() else b""
+            _atomic_write(path, b"".join(_dumps(record) + b"\n" for record in records) + existing)
+        
+        # Jobs become shards; a shard already written by this version wins over the legacy copy
+        for job_id, job_data in (legacy.pop("jobs", None) or {}).items():
+            try:
+                path = self._job_path(job_id)
+            except ValueError:
+                logger.warning("Skipping legacy job with invalid id %r", job_id)
+                continue
+            if not path.exists():
+                _atomic_write(path, _dumps(job_data))
+        
+        # Rewritten last: an interrupted migration is retried rather than lost
+        _atomic_write(self.storage_path, _dumps(legacy))
+        logger.info("Migrated legacy logs, metrics and jobs out of %s", self.storage_path)
+    
+    def _job_path(self, job_id: str) -> Path:
+        """Path of the shard file for a job"""
+        if not job_id or Path(job_id).name != job_id:
+            raise ValueError(f"Invalid job id: {job_id!r}")
+        return self._jobs_dir / f"{job_id}.json"
+    
+    def _load_jobs(self):
+        """Load all job shards into the in-memory mirror"""
+        for job_file in self._jobs_dir.glob("*.json"):
+            try:
+                data = job_file.read_bytes()
+                self._job_cache[job_file.stem] = _loads(data)
+            except (json.JSONDecodeError, FileNotFoundError):
+                continue
+            self._job_sizes[job_file.stem] = len(data)
+    
+    def _write_job(self, job_id: str, job_data: dict):
+        """Write a single job shard and mirror it in memory"""
+        path = self._job_path(job_id)
+        if not self.in_memory:
+            data = _dumps(job_data)
+            _atomic_write(path, data)
+            self._job_sizes[job_id] = len(data)
+        self._job_cache[job_id] = job_data
     
-    def _write_data(self, data: dict):
-        """Write all data to storage"""
-        with open(self.storage_path, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+    def _enqueue_write(self, stream, records: list[dict]):
+        """Hand records to the writer thread (dropped when memory-only)"""
+        if self._writer is not None:
+            self._write_queue.put_nowait((stream, records))
+    
+    def _drain(self):
+        """Writer thread: coalesce queued appends into one write per stream"""
+        while True:
+            batch = [self._write_queue.get()]
+            while True:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = None in batch
+            logs = [r for stream, records in filter(None, batch) if stream is self._logs for r in records]
+            metrics = [r for stream, records in filter(None, batch) if stream is self._metrics for r in records]
+            try:
+                with self._io_lock:
+                    if logs:
+                        self._logs.append_many(logs)
+                    if metrics:
+                        self._metrics.append_many(metrics)
+            except Exception:
+                # Keep the writer alive: later batches may succeed (e.g. once disk space frees up)
+                logger.exception(
+                    "Local storage write failed; dropped %d log and %d metric records",
+                    len(logs), len(metrics),
+                )
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+            if stop:
+                return
+    
+    def _index_log(self, log_entry: dict, ts_us: int):
+        """Add a log to the time-ordered and per-model indexes, evicting the oldest past the cap"""
+        # Entries carry request start times, so concurrent requests can finish out of order
+        item = (ts_us, log_entry)
+        _insort_by_ts(self._log_cache, item)
+        _insort_by_ts(self._logs_by_model[log_entry.get("model")], item)
+        
+        # Both indexes order ties the same way, so the oldest overall heads its model's index
+        if len(self._log_cache) > self.MAX_LOGS:
+            _, evicted = self._log_cache.popleft()
+            model_logs = self._logs_by_model[evicted.get("model")]
+            model_logs.popleft()
+            if not model_logs:
+                del self._logs_by_model[evicted.get("model")]
     
     def put_log(self, log_entry: dict) -> bool:
         """Store a request log entry"""
+        return self.put_logs_bulk([log_entry])
+    
+    def put_logs_bulk(self, log_entries: list[dict]) -> bool:
+        """Store a batch of request log entries with one lock acquisition and one disk write"""
+        if not log_entries:
+            return True
+        
         with self._lock:
-            data = self._read_data()
-            
-            # Add timestamp if not present
-            if "timestamp" not in log_entry:
-                log_entry["timestamp"] = datetime.utcnow().isoformat()
-            
-            data["logs"].append(log_entry)
+            now, now_iso = _now_iso()
+            for log_entry in log_entries:
+                # Add timestamp if not present; the integer form used for filtering is indexed alongside
+                timestamp = log_entry.get("timestamp")
+                if timestamp is None:
+                    log_entry["timestamp"] = now_iso
+                    ts_us = _epoch_us(now)
+                elif isinstance(timestamp, datetime):
+                    ts_us = _epoch_us(timestamp)
+                else:
+                    ts_us = _entry_ts_us(log_entry)
+                _normalize_datetimes(log_entry)
+                self._index_log(log_entry, ts_us)
             
-            # Keep only last 10000 logs
-            if len(data["logs"]) > 10000:
-                data["logs"] = data["logs"][-10000:]
-            
-            self._write_data(data)
+            self._enqueue_write(self._logs, log_entries)
             return True
     
     def get_logs(
@@ -65,79 +403,94 @@ class LocalStorage:
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
         model: Optional[str] = None,
+        success_only: bool = False,
     ) -> list[dict]:
-        """Query logs with filters"""
-        data = self._read_data()
-        logs = data.get("logs", [])
-        
-        # Apply filters
-        if start_time:
-            logs = [l for l in logs if l.get("timestamp", "") >= start_time.isoformat()]
-        if end_time:
-            logs = [l for l in logs if l.get("timestamp", "") <= end_time.isoformat()]
-        if model:
-            logs = [l for l in logs if l.get("model") == model]
-        
-        # Sort by timestamp descending and limit
-        logs.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        return logs[:limit]
+        """Query logs with filters (newest first)"""
+        return list(self.iter_logs(limit, start_time, end_time, model, success_only))
     
-    def put_job(self, job_id: str, job_data: dict) -> bool:
-        """Store an async job"""
+    def iter_logs(
+        self,
+        limit: int = 100,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        model: Optional[str] = None,
+        success_only: bool = False,
+    ) -> Iterator[dict]:
+        """Iterate logs matching the filters (newest first), filtering at the source"""
+        start = _epoch_us(start_time) if start_time else None
+        end = _epoch_us(end_time) if end_time else None
+        
+        # Only references are collected under the lock; callers encode them lazily
+        matches = []
         with self._lock:
-            data = self._read_data()
+            if model:
+                source = self._logs_by_model.get(model, ())
+            else:
+                source = self._log_cache
             
-            job_data["updated_at"] = datetime.utcnow().isoformat()
+            # Indexes are kept in time order, so walk newest to oldest and stop early
+            for timestamp, log_entry in reversed(source):
+                if len(matches) >= limit:
+                    break
+                if end is not None and timestamp > end:
+                    continue
+                if start is not None and timestamp < start:
+                    break
+                if success_only and not log_entry.get("success", False):
+                    continue
+                matches.append(log_entry)
+        yield from matches
+    
+    def put_job(self, job_id: str, job_data: dict) -> bool:
+        """Store an async job"""
+        with self._job_locks[job_id]:
+            _, now_iso = _now_iso()
+            job_data["updated_at"] = now_iso
             if "created_at" not in job_data:
-                job_data["created_at"] = datetime.utcnow().isoformat()
+                job_data["created_at"] = now_iso
+            _normalize_datetimes(job_data)
             
-            data["jobs"][job_id] = job_data
-            self._write_data(data)
+            self._write_job(job_id, job_data)
             return True
     
     def get_job(self, job_id: str) -> Optional[dict]:
         """Get an async job by ID"""
-        data = self._read_data()
-        return data.get("jobs", {}).get(job_id)
+        job = self._job_cache.get(job_id)
+        return dict(job) if job is not None else None
     
     def update_job(self, job_id: str, updates: dict) -> bool:
         """Update an async job"""
-        with self._lock:
-            data = self._read_data()
-            
-            if job_id not in data.get("jobs", {}):
+        with self._job_locks[job_id]:
+            job = self._job_cache.get(job_id)
+            if job is None:
                 return False
             
-            data["jobs"][job_id].update(updates)
-            data["jobs"][job_id]["updated_at"] = datetime.utcnow().isoformat()
+            job = _normalize_datetimes({**job, **updates})
+            job["updated_at"] = _now_iso()[1]
             
-            self._write_data(data)
+            self._write_job(job_id, job)
             return True
     
     def delete_job(self, job_id: str) -> bool:
         """Delete an async job"""
-        with self._lock:
-            data = self._read_data()
-            
-            if job_id in data.get("jobs", {}):
-                del data["jobs"][job_id]
-                self._write_data(data)
-                return True
-            return False
+        with self._job_locks[job_id]:
+            if self._job_cache.pop(job_id, None) is None:
+                self._job_locks.pop(job_id, None)
+                return False
+            self._job_sizes.pop(job_id, None)
+            if not self.in_memory:
+                self._job_path(job_id).unlink(missing_ok=True)
+            self._job_locks.pop(job_id, None)
+            return True
     
     def put_metric(self, metric: dict) -> bool:
         """Store a metric data point"""
         with self._lock:
-            data = self._read_data()
-            
-            metric["timestamp"] = datetime.utcnow().isoformat()
-            data["metrics"].append(metric)
-            
-            # Keep only last 50000 metrics
-            if len(data["metrics"]) > 50000:
-                data["metrics"] = data["metrics"][-50000:]
-            
-            self._write_data(data)
+            _, now_iso = _now_iso()
+            metric["timestamp"] = now_iso
+            _normalize_datetimes(metric)
+            self._enqueue_write(self._metrics, [metric])
+            self._metric_cache.append(metric)
             return True
     
     def get_metrics(
@@ -146,8 +499,8 @@ class LocalStorage:
         metric_name: Optional[str] = None,
     ) -> list[dict]:
         """Query metrics"""
-        data = self._read_data()
-        metrics = data.get("metrics", [])
+        with self._lock:
+            metrics = list(self._metric_cache)
         
         if metric_name:
             metrics = [m for m in metrics if m.get("name") == metric_name]
@@ -156,19 +509,51 @@ class LocalStorage:
     
     def get_stats(self) -> dict:
         """Get storage statistics"""
-        data = self._read_data()
-        return {
-            "total_logs": len(data.get("logs", [])),
-            "total_jobs": len(data.get("jobs", {})),
-            "total_metrics": len(data.get("metrics", [])),
-            "storage_path": str(self.storage_path),
-            "storage_size_bytes": self.storage_path.stat().st_size if self.storage_path.exists() else 0,
-        }
+        with self._lock:
+            return {
+                "total_logs": len(self._log_cache),
+                "total_jobs": len(self._job_cache),
+                "total_metrics": len(self._metric_cache),
+                "storage_path": str(self.storage_path),
+                "storage_size_bytes": (
+                    sum(self._job_sizes.values()) + self._logs.size_bytes() + self._metrics.size_bytes()
+                ),
+            }
     
     def clear(self):
         """Clear all storage (for testing)"""
         with self._lock:
-            self._write_data({"logs": [], "jobs": {}, "metrics": []})
+            self._write_queue.join()
+            if not self.in_memory:
+                for job_file in self._jobs_dir.glob("*.json"):
+                    job_file.unlink(missing_ok=True)
+            self._job_locks.clear()
+            self._job_cache.clear()
+            self._job_sizes.clear()
+            self._log_cache.clear()
+            self._logs_by_model.clear()
+            self._metric_cache.clear()
+            with self._io_lock:
+                self._logs.truncate()
+                self._metrics.truncate()
+    
+    def flush(self):
+        """Wait for queued appends and flush them to disk"""
+        if self._writer is not None and self._writer.is_alive():
+            self._write_queue.join()
+        with self._io_lock:
+            self._logs.flush()
+            self._metrics.flush()
+    
+    def close(self):
+        """Stop the writer thread and close the append streams"""
+        atexit.unregister(self.flush)
+        if self._writer is not None and self._writer.is_alive():
+            self._write_queue.put(None)
+            self._writer.join()
+        with self._io_lock:
+            self._logs.close()
+            self._metrics.close()
 
 
 # DynamoDB-like interface for easy migration
@@ -178,18 +563,22 @@ class DynamoDBLocal:
     Makes it easy to switch to real DynamoDB in production
     """
     
+    _KEY_FIELDS = ("pk", "request_id", "id")
+    
     def __init__(self, table_name: str, storage_path: str = "./data"):
         self.table_name = table_name
+        name = table_name.lower()
+        self._kind = "logs" if "logs" in name else "jobs" if "jobs" in name else "metrics"
         self.storage = LocalStorage(f"{storage_path}/{table_name}.json")
     
     def put_item(self, item: dict) -> dict:
         """Put an item (DynamoDB-style)"""
         # Extract key
-        key = item.get("pk") or item.get("request_id") or item.get("id")
+        key = next((item[k] for k in self._KEY_FIELDS if item.get(k)), None)
         
-        if "logs" in self.table_name.lower():
+        if self._kind == "logs":
             self.storage.put_log(item)
-        elif "jobs" in self.table_name.lower():
+        elif self._kind == "jobs":
             self.storage.put_job(key, item)
         else:
             self.storage.put_metric(item)
@@ -198,9 +587,9 @@ class DynamoDBLocal:
     
     def get_item(self, key: dict) -> dict:
         """Get an item by key (DynamoDB-style)"""
-        key_value = list(key.values())[0]
+        key_value = next(iter(key.values()))
         
-        if "jobs" in self.table_name.lower():
+        if self._kind == "jobs":
             item = self.storage.get_job(key_value)
             if item:
                 return {"Item": item}
@@ -211,7 +600,7 @@ class DynamoDBLocal:
         """Query items (simplified DynamoDB-style)"""
         limit = kwargs.get("Limit", 100)
         
-        if "logs" in self.table_name.lower():
+        if self._kind == "logs":
             items = self.storage.get_logs(limit=limit)
         else:
             items = self.storage.get_metrics(limit=limit)
@@ -231,6 +620,8 @@ def get_local_storage() -> LocalStorage:
     return _local_storage
 
 
+# One table per name: each LocalStorage owns a writer thread and an atexit flush
+@cache
 def get_dynamodb_table(table_name: str) -> DynamoDBLocal:
     """Get a DynamoDB-compatible table interface"""
     return DynamoDBLocal(table_name)
\ No newline at end of file
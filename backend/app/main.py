@@ -9,16 +9,23 @@ A production-ready AI infrastructure service that:
 - Tracks costs and optimizes spending
 """
 
+import asyncio
+import logging
 import time
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timezone
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from .config import get_settings
+from .db.local_storage import get_local_storage
 from .routers import generate_router, health_router, metrics_router
+from .routers.generate import start_log_flusher, stop_log_flusher
+from .services import get_aggregate_cache, get_router, warm_aggregate_kernel
+
+logger = logging.getLogger(__name__)
 
 # Startup/shutdown lifecycle
 @asynccontextmanager
@@ -30,20 +37,28 @@ async def lifespan(app: FastAPI):
     print(f"🚀 Starting {settings.app_name} v{settings.app_version}")
     print(f"📍 Environment: {settings.environment}")
     print(f"🔌 Available providers: {settings.available_providers}")
+    start_log_flusher()
+    get_aggregate_cache().start()
+    get_router().start_health_monitor()
+    # JIT-compile the large-window aggregation kernel off the event loop (no-op without numba)
+    asyncio.get_running_loop().run_in_executor(None, warm_aggregate_kernel)
     
     yield
     
     # Shutdown
     print("👋 Shutting down...")
+    await stop_log_flusher()
+    await get_aggregate_cache().stop()
+    await get_router().stop_health_monitor()
+    get_local_storage().flush()
 
 
 # Create FastAPI app
 settings = get_settings()
+_is_production = settings.environment == "production"
 
-app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
-    description="""
+# API docs served at /docs; only attached in debug builds to keep worker heaps small
+_FULL_DESCRIPTION = """
 ## LLM Orchestration Engine
 
 Enterprise-grade multi-model LLM routing with intelligent cost and latency optimization.
@@ -82,11 +97,17 @@ print(response.json())
 | `cheap` | Prioritize low cost |
 | `best` | Prioritize quality |
 | `balanced` | Balance all factors |
-    """,
-    docs_url="/docs",
-    redoc_url="/redoc",
-    openapi_url="/openapi.json",
+    """
+
+app = FastAPI(
+    title=settings.app_name,
+    version=settings.app_version,
+    description=_FULL_DESCRIPTION if settings.debug else "",
+    docs_url=None if _is_production else "/docs",
+    redoc_url=None if _is_production else "/redoc",
+    openapi_url=None if _is_production else "/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -100,29 +121,36 @@ app.add_middleware(
 
 
 # Request timing middleware
+_TIMING_HEADER = "X-Process-Time-Ms"
+
+
 @app.middleware("http")
 async def add_timing_header(request: Request, call_next):
     """Add server timing headers"""
-    start_time = time.perf_counter()
+    start_ns = time.perf_counter_ns()
     response = await call_next(request)
-    process_time = (time.perf_counter() - start_time) * 1000
-    response.headers["X-Process-Time-Ms"] = str(round(process_time, 2))
+    response.headers[_TIMING_HEADER] = f"{(time.perf_counter_ns() - start_ns) / 1e6:.2f}"
     return response
 
 
 # Global exception handler
+_ERROR_TEMPLATE = {
+    "success": False,
+    "error": None,
+    "error_code": "INTERNAL_ERROR",
+    "timestamp": None,
+}
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle uncaught exceptions"""
-    return JSONResponse(
-        status_code=500,
-        content={
-            "success": False,
-            "error": str(exc),
-            "error_code": "INTERNAL_ERROR",
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-    )
+    logger.error("Unhandled exception on %s %s", request.method, request.url.path, exc_info=exc)
+    
+    content = _ERROR_TEMPLATE.copy()
+    content["error"] = str(exc)
+    content["timestamp"] = datetime.now(timezone.utc).replace(tzinfo=None)
+    return ORJSONResponse(status_code=500, content=content)
 
 
 # Include routers
@@ -139,7 +167,8 @@ async def root():
         "name": settings.app_name,
         "version": settings.app_version,
         "status": "running",
-        "docs": "/docs",
+        # Docs are only mounted outside production
+        **({"docs": app.docs_url} if app.docs_url else {}),
         "health": "/health",
         "api": {
             "generate": "POST /api/v1/generate",
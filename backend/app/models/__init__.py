@@ -19,6 +19,7 @@ from .responses import (
     GenerateResponse,
     AsyncJobResponse,
     AsyncJobStatusResponse,
+    ProviderHealthStatus,
     HealthResponse,
     MetricsResponse,
     ErrorResponse,
@@ -40,6 +41,7 @@ __all__ = [
     "GenerateResponse",
     "AsyncJobResponse",
     "AsyncJobStatusResponse",
+    "ProviderHealthStatus",
     "HealthResponse",
     "MetricsResponse",
     "ErrorResponse",
@@ -3,7 +3,9 @@ LLM Orchestration Engine - Request Models
 Pydantic schemas for API requests
 """
 
-from pydantic import BaseModel, Field, field_validator
+import sys
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, Literal, Any
 from enum import Enum
 from datetime import datetime
@@ -32,6 +34,22 @@ class ModelPreference(str, Enum):
 class GenerateRequest(BaseModel):
     """Main generation request schema"""
     
+    # No assignment validation or whitespace coercion: the request is validated once on entry
+    model_config = ConfigDict(
+        extra="ignore",
+        validate_assignment=False,
+        str_strip_whitespace=False,
+        json_schema_extra={
+            "example": {
+                "task": "summarize",
+                "model_preference": "balanced",
+                "text": "The quick brown fox jumps over the lazy dog. This is a sample text that needs to be summarized.",
+                "max_tokens": 100,
+                "temperature": 0.7
+            }
+        },
+    )
+    
     task: TaskType = Field(
         default=TaskType.CHAT,
         description="Type of task to perform"
@@ -81,6 +99,14 @@ class GenerateRequest(BaseModel):
         ge=100,
         description="Maximum acceptable latency in milliseconds"
     )
+    hedge: bool = Field(
+        default=False,
+        description=(
+            "With the 'fast' preference, race the top two models and keep the first success. "
+            "Lowers tail latency at up to twice the token spend: the losing call is cancelled "
+            "but may still be billed by its provider"
+        )
+    )
     
     # Request metadata
     request_id: Optional[str] = Field(
@@ -95,20 +121,16 @@ class GenerateRequest(BaseModel):
     @field_validator('text')
     @classmethod
     def validate_text_not_empty(cls, v: str) -> str:
-        if not v.strip():
+        # isspace() stops at the first non-space character instead of copying via strip()
+        if not v or v.isspace():
             raise ValueError("Text cannot be empty or whitespace only")
         return v
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "task": "summarize",
-                "model_preference": "balanced",
-                "text": "The quick brown fox jumps over the lazy dog. This is a sample text that needs to be summarized.",
-                "max_tokens": 100,
-                "temperature": 0.7
-            }
-        }
+    @field_validator('model_override')
+    @classmethod
+    def intern_model_override(cls, v: Optional[str]) -> Optional[str]:
+        # Model tables use interned keys; interning here lets lookups match by identity
+        return sys.intern(v) if v else v
 
 
 class BatchGenerateRequest(BaseModel):
@@ -3,9 +3,9 @@ LLM Orchestration Engine - Response Models
 Pydantic schemas for API responses
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Any, Literal
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 
@@ -18,9 +18,23 @@ class JobStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+# Shared config for server-built response models: no assignment validation,
+# unknown keys dropped, so serialization stays on the pydantic-core fast path
+RESPONSE_MODEL_CONFIG = ConfigDict(
+    extra="ignore",
+    arbitrary_types_allowed=False,
+    validate_assignment=False,
+)
+
+# Per-request submodels are immutable once built; use model_copy(update=...) to change them
+FROZEN_RESPONSE_MODEL_CONFIG = ConfigDict(**RESPONSE_MODEL_CONFIG, frozen=True)
+
+
 class RoutingDecision(BaseModel):
     """Details about the routing decision"""
     
+    model_config = FROZEN_RESPONSE_MODEL_CONFIG
+    
     selected_model: str = Field(description="Model that was selected")
     provider: str = Field(description="Provider (openai, anthropic, local, etc.)")
     reason: str = Field(description="Why this model was selected")
@@ -41,6 +55,8 @@ class RoutingDecision(BaseModel):
 class UsageMetrics(BaseModel):
     """Token usage and cost metrics"""
     
+    model_config = FROZEN_RESPONSE_MODEL_CONFIG
+    
     input_tokens: int = Field(ge=0)
     output_tokens: int = Field(ge=0)
     total_tokens: int = Field(ge=0)
@@ -61,6 +77,8 @@ class UsageMetrics(BaseModel):
 class PerformanceMetrics(BaseModel):
     """Performance timing metrics"""
     
+    model_config = FROZEN_RESPONSE_MODEL_CONFIG
+    
     total_time_ms: float = Field(description="Total request time")
     routing_time_ms: float = Field(description="Time for routing decision")
     inference_time_ms: float = Field(description="Model inference time")
@@ -110,13 +128,14 @@ class GenerateResponse(BaseModel):
         description="Whether a fallback model was used"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        **RESPONSE_MODEL_CONFIG,
+        json_schema_extra={
             "example": {
                 "success": True,
                 "result": "This is a summary of the input text...",
                 "request_id": "req_abc123",
-                "timestamp": "2025-01-15T10:30:00Z",
+                "timestamp": "2025-01-15T10:30:00",
                 "routing": {
                     "selected_model": "gpt-4o-mini",
                     "provider": "openai",
@@ -144,12 +163,15 @@ class GenerateResponse(BaseModel):
                     "overhead_time_ms": 24.8
                 }
             }
-        }
+        },
+    )
 
 
 class AsyncJobResponse(BaseModel):
     """Response for async job submission"""
     
+    model_config = RESPONSE_MODEL_CONFIG
+    
     job_id: str = Field(description="Unique job identifier")
     status: JobStatus = Field(description="Current job status")
     created_at: datetime = Field(description="Job creation timestamp")
@@ -163,6 +185,8 @@ class AsyncJobResponse(BaseModel):
 class AsyncJobStatusResponse(BaseModel):
     """Response for async job status check"""
     
+    model_config = RESPONSE_MODEL_CONFIG
+    
     job_id: str
     status: JobStatus
     created_at: datetime
@@ -179,9 +203,22 @@ class AsyncJobStatusResponse(BaseModel):
     error_code: Optional[str] = Field(default=None)
 
 
+class ProviderHealthStatus(BaseModel):
+    """Health status of a single provider"""
+    
+    model_config = RESPONSE_MODEL_CONFIG
+    
+    status: Literal["healthy", "degraded", "unhealthy", "unknown"]
+    recent_requests: int = Field(ge=0)
+    error_rate: float = Field(ge=0, le=1)
+    avg_latency_ms: Optional[float] = Field(default=None)
+
+
 class HealthResponse(BaseModel):
     """Health check response"""
     
+    model_config = RESPONSE_MODEL_CONFIG
+    
     status: Literal["healthy", "degraded", "unhealthy"] = Field(
         description="Overall health status"
     )
@@ -189,7 +226,7 @@ class HealthResponse(BaseModel):
     timestamp: datetime
     
     # Provider health
-    providers: dict[str, dict[str, Any]] = Field(
+    providers: dict[str, ProviderHealthStatus] = Field(
         description="Health status of each provider"
     )
     
@@ -202,6 +239,8 @@ class HealthResponse(BaseModel):
 class MetricsResponse(BaseModel):
     """Aggregated metrics response"""
     
+    model_config = RESPONSE_MODEL_CONFIG
+    
     time_range: dict[str, datetime] = Field(
         description="Start and end of metrics period"
     )
@@ -236,9 +275,11 @@ class MetricsResponse(BaseModel):
 class ErrorResponse(BaseModel):
     """Standard error response"""
     
+    model_config = RESPONSE_MODEL_CONFIG
+    
     success: bool = Field(default=False)
     error: str = Field(description="Error message")
     error_code: str = Field(description="Machine-readable error code")
     request_id: Optional[str] = Field(default=None)
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
     details: Optional[dict[str, Any]] = Field(default=None)
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+LLM Orchestration Engine - Router Dependencies
+Shared FastAPI dependencies for API routers
+"""
+
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.config import get_settings
+
+
+# Settings are process-wide (get_settings is lru_cached), so bind them once;
+# the per-request check is then a single frozenset lookup
+_valid_keys: frozenset[str] = frozenset()
+_is_dev = False
+
+
+def reload_auth_settings():
+    """Re-bind API keys and environment from settings (call after get_settings.cache_clear())"""
+    global _valid_keys, _is_dev
+    settings = get_settings()
+    _valid_keys = frozenset(settings.valid_api_keys)
+    _is_dev = settings.environment == "development"
+
+
+reload_auth_settings()
+
+
+def _api_key_verifier(missing_detail: str, invalid_status: int, invalid_detail: str):
+    """Build an API key dependency; routers keep their own status codes for invalid keys"""
+    async def verify(x_api_key: Optional[str] = Header(None)) -> str:
+        """Verify API key from header"""
+        # Keyed requests are the common case: one truthiness test, then the set lookup
+        if not x_api_key:
+            if _is_dev:
+                return "dev-anonymous"
+            raise HTTPException(status_code=401, detail=missing_detail)
+        
+        if x_api_key not in _valid_keys:
+            raise HTTPException(status_code=invalid_status, detail=invalid_detail)
+        
+        return x_api_key
+    return verify
+
+
+# Generation endpoints: 401 when missing, 403 when invalid
+verify_api_key = _api_key_verifier("Missing API key", 403, "Invalid API key")
+
+# Metrics endpoints: 401 for both
+verify_metrics_api_key = _api_key_verifier(
+    "Invalid or missing API key", 401, "Invalid or missing API key"
+)
@@ -3,14 +3,19 @@ LLM Orchestration Engine - Generate Router
 Main API endpoint for LLM generation requests
 """
 
+import asyncio
+import itertools
+import os
 import time
-import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Depends, Header, Request
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
 
-from app.config import get_settings, MODEL_PRICING, MODEL_CAPABILITIES
+from app.config import MODEL_INFO_TABLE, get_settings
 from app.models import (
     GenerateRequest,
     GenerateResponse,
@@ -20,92 +25,232 @@ from app.models import (
 )
 from app.services import get_router, get_cost_calculator, get_metrics_collector, RequestMetric
 from app.db.local_storage import get_local_storage
+from app.routers.deps import verify_api_key
 
 
-router = APIRouter(prefix="/api/v1", tags=["generation"])
+router = APIRouter(prefix="/api/v1", tags=["generation"], default_response_class=ORJSONResponse)
 
 
-async def verify_api_key(x_api_key: Optional[str] = Header(None)) -> str:
-    """Verify API key from header"""
-    settings = get_settings()
+def _to_base36(n: int) -> str:
+    """Encode a non-negative int in base 36"""
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if not n:
+            return out
+
+
+# Request IDs: pid + monotonic clock + counter, sortable and unique per host without urandom
+_REQUEST_COUNTER = itertools.count()
+_PID36 = _to_base36(os.getpid())
+
+
+def _new_request_id() -> str:
+    """Generate a request ID"""
+    clock = _to_base36(time.monotonic_ns()).zfill(13)
+    return f"req_{_PID36}-{clock}{_to_base36(next(_REQUEST_COUNTER))}"
+
+
+# Naive UTC, like every other timestamp the API emits
+_UTC_EPOCH = datetime(1970, 1, 1)
+
+# Response models are built from values we computed, so skip validation unless debugging
+_VALIDATE_RESPONSES = get_settings().debug_validate_responses
+
+
+def _build(model_cls, **fields):
+    """Construct a response model, validating only under DEBUG_VALIDATE_RESPONSES"""
+    if _VALIDATE_RESPONSES:
+        return model_cls(**fields)
+    return model_cls.model_construct(**fields)
+
+
+# Per-request bookkeeping (metrics, cost tracking, router stats, request log) is queued
+# and applied in batches off the request path
+LOG_QUEUE_MAXSIZE = 10_000
+LOG_BATCH_SIZE = 100
+LOG_FLUSH_INTERVAL_S = 1.0
+
+_log_queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+_log_flusher_task: Optional[asyncio.Task] = None
+# Bumped by discard_queued_logs so the flusher drops a batch it had already dequeued
+_log_generation = 0
+
+
+def _enqueue_log(metric: RequestMetric):
+    """Queue a request's bookkeeping, applying it inline when the flusher isn't running"""
+    if _log_flusher_task is None or _log_flusher_task.done():
+        _write_logs(get_local_storage(), [metric])
+        return
     
-    if settings.environment == "development" and not x_api_key:
-        return "dev-anonymous"
+    if _log_queue.full():
+        _log_queue.get_nowait()  # Drop the oldest entry rather than block the request
+    _log_queue.put_nowait(metric)
+
+
+def _write_logs(storage, batch: list[RequestMetric]):
+    """Record queued metrics with every tracker, then write their log entries in one call"""
+    if not batch:
+        return
     
-    if not x_api_key:
-        raise HTTPException(status_code=401, detail="Missing API key")
+    get_metrics_collector().record_many(batch)
     
-    if x_api_key not in settings.valid_api_keys:
-        raise HTTPException(status_code=403, detail="Invalid API key")
+    cost_calculator = get_cost_calculator()
+    model_router = get_router()
+    for metric in batch:
+        cost_calculator.record_cost(metric.model, metric.provider, metric.cost_usd)
+        if metric.cached:
+            continue  # no provider call was made; keep cache hits out of provider health
+        model_router.update_metrics(
+            metric.model, metric.success, metric.inference_time_ms, metric.cost_usd
+        )
     
-    return x_api_key
+    storage.put_logs_bulk([metric.to_log_dict() for metric in batch])
+
+
+def _drain_log_queue() -> list[RequestMetric]:
+    """Take everything currently queued"""
+    batch = []
+    while not _log_queue.empty():
+        batch.append(_log_queue.get_nowait())
+    return batch
+
+
+def discard_queued_logs():
+    """Drop queued bookkeeping, including a batch the flusher is still collecting"""
+    global _log_generation
+    _log_generation += 1
+    _drain_log_queue()
+
+
+async def _log_flusher():
+    """Write queued logs in batches of LOG_BATCH_SIZE or every LOG_FLUSH_INTERVAL_S"""
+    storage = get_local_storage()
+    loop = asyncio.get_running_loop()
+    batch: list[RequestMetric] = []
+    try:
+        while True:
+            batch = [await _log_queue.get()]
+            generation = _log_generation
+            deadline = loop.time() + LOG_FLUSH_INTERVAL_S
+            while len(batch) < LOG_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(_log_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            if generation == _log_generation:
+                _write_logs(storage, batch)
+            batch = []
+    finally:
+        if batch and generation != _log_generation:
+            batch = []
+        _write_logs(storage, batch + _drain_log_queue())
+
+
+def start_log_flusher():
+    """Start the background log flusher (called from the app lifespan)"""
+    global _log_flusher_task
+    if _log_flusher_task is None or _log_flusher_task.done():
+        _log_flusher_task = asyncio.create_task(_log_flusher())
+
+
+async def stop_log_flusher():
+    """Stop the flusher and write out anything still queued"""
+    global _log_flusher_task
+    if _log_flusher_task is None:
+        return
+    _log_flusher_task.cancel()
+    try:
+        await _log_flusher_task
+    except asyncio.CancelledError:
+        pass
+    _log_flusher_task = None
 
 
-@router.post("/generate", response_model=GenerateResponse, summary="Generate LLM Response")
+# No response_model: the response is built from trusted values and serialized once by
+# pydantic-core; the schema is still published through `responses`
+@router.post(
+    "/generate",
+    responses={200: {"model": GenerateResponse}},
+    summary="Generate LLM Response",
+)
 async def generate(
     request: GenerateRequest,
     http_request: Request,
     api_key: str = Depends(verify_api_key),
 ):
     """Generate a response using the optimal LLM model."""
-    start_time = time.perf_counter()
-    request_id = request.request_id or f"req_{uuid.uuid4().hex[:12]}"
+    t0 = time.perf_counter()
+    request_id = request.request_id or _new_request_id()
     
     model_router = get_router()
     cost_calculator = get_cost_calculator()
-    metrics_collector = get_metrics_collector()
-    storage = get_local_storage()
     
     try:
-        selected_model, routing_decision = await model_router.select_model(request)
-        routing_time = time.perf_counter()
-        
-        provider_response = await model_router.execute_request(
-            request=request,
-            model=selected_model,
-            routing_decision=routing_decision,
-        )
+        # Identical recent requests skip routing and inference (ENABLE_EXACT_CACHE)
+        hit = model_router.lookup_exact(request)
+        if hit is not None:
+            routing_decision, provider_response = hit
+            selected_model = routing_decision.selected_model
+            t1 = t2 = time.perf_counter()
+        else:
+            selected_model, routing_decision = await model_router.select_model(request)
+            t1 = time.perf_counter()
+            
+            provider_response = await model_router.execute_request(
+                request=request,
+                model=selected_model,
+                routing_decision=routing_decision,
+            )
+            
+            t2 = time.perf_counter()
         
-        inference_time = time.perf_counter()
+        # Read the provider result once; everything below reuses these locals
+        model_used = provider_response.model_used
+        input_tokens = provider_response.input_tokens
+        output_tokens = provider_response.output_tokens
 
-        # --- BUG FIX START ---
-        # Update routing decision if the actual model used differs from the initial selection
-        # This handles cases where fallbacks occurred inside execute_request
-        fallback_occurred = provider_response.model_used != selected_model
+        # Fallbacks inside execute_request may have used a different model than selected;
+        # RoutingDecision is frozen, so patch it with a single model_copy
+        fallback_occurred = model_used != selected_model
         if fallback_occurred:
-            # Fix: Use 'selected_model' instead of 'model' to match RoutingDecision definition
-            if hasattr(routing_decision, "selected_model"):
-                routing_decision.selected_model = provider_response.model_used
-            elif hasattr(routing_decision, "model"):
-                routing_decision.model = provider_response.model_used
-            
-            # Fix: Use 'reason' instead of 'reasoning' to match RoutingDecision definition
-            if hasattr(routing_decision, "reason"):
-                routing_decision.reason += f" (Fallback triggered. Used: {provider_response.model_used})"
-            elif hasattr(routing_decision, "reasoning"):
-                routing_decision.reasoning += f" (Fallback triggered. Used: {provider_response.model_used})"
-        # --- BUG FIX END ---
+            routing_decision = routing_decision.model_copy(update={
+                "selected_model": model_used,
+                "reason": f"{routing_decision.reason} (Fallback triggered. Used: {model_used})",
+            })
         
+        # Cached responses cost nothing; their token counts are still reported
+        cached = provider_response.cached
         cost_breakdown = cost_calculator.calculate_cost(
-            model=provider_response.model_used,
-            input_tokens=provider_response.input_tokens,
-            output_tokens=provider_response.output_tokens,
+            model=model_used,
+            input_tokens=0 if cached else input_tokens,
+            output_tokens=0 if cached else output_tokens,
         )
         
-        total_time_ms = (time.perf_counter() - start_time) * 1000
-        routing_time_ms = (routing_time - start_time) * 1000
-        inference_time_ms = (inference_time - routing_time) * 1000
+        t3 = time.perf_counter()
+        now_ns = time.time_ns()
+        ts_end = _UTC_EPOCH + timedelta(microseconds=now_ns // 1000)
+        total_time_ms = (t3 - t0) * 1000
+        routing_time_ms = (t1 - t0) * 1000
+        inference_time_ms = (t2 - t1) * 1000
         
-        usage = UsageMetrics(
-            input_tokens=provider_response.input_tokens,
-            output_tokens=provider_response.output_tokens,
-            total_tokens=provider_response.total_tokens,
+        usage = _build(
+            UsageMetrics,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
             input_cost_usd=cost_breakdown.input_cost_usd,
             output_cost_usd=cost_breakdown.output_cost_usd,
             total_cost_usd=cost_breakdown.total_cost_usd,
         )
         
-        performance = PerformanceMetrics(
+        performance = _build(
+            PerformanceMetrics,
             total_time_ms=total_time_ms,
             routing_time_ms=routing_time_ms,
             inference_time_ms=inference_time_ms,
@@ -113,84 +258,60 @@ async def generate(
             provider_latency_ms=provider_response.latency_ms,
         )
         
-        response = GenerateResponse(
+        response = _build(
+            GenerateResponse,
             success=provider_response.success,
             result=provider_response.content,
             error=provider_response.error,
             request_id=request_id,
-            timestamp=datetime.utcnow(),
+            timestamp=ts_end,
             routing=routing_decision,
             usage=usage,
             performance=performance,
-            cached=False,
+            cached=cached,
             retries=0,
             fallback_used=fallback_occurred,
         )
         
-        # Record metrics
+        # Metrics, cost and log bookkeeping happen after the response is returned
         metric = RequestMetric(
-            timestamp=datetime.utcnow(),
+            timestamp=ts_end,
+            timestamp_ns=now_ns,
             request_id=request_id,
-            model=provider_response.model_used,
+            model=model_used,
             provider=provider_response.provider,
             task=request.task.value,
             preference=request.model_preference.value,
             total_time_ms=total_time_ms,
             routing_time_ms=routing_time_ms,
             inference_time_ms=inference_time_ms,
-            input_tokens=provider_response.input_tokens,
-            output_tokens=provider_response.output_tokens,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
             cost_usd=cost_breakdown.total_cost_usd,
             success=provider_response.success,
-            cached=False,
-            fallback_used=response.fallback_used,
+            cached=cached,
+            fallback_used=fallback_occurred,
         )
-        metrics_collector.record(metric)
-        
-        storage.put_log({
-            "request_id": request_id,
-            "model": provider_response.model_used,
-            "provider": provider_response.provider,
-            "task": request.task.value,
-            "preference": request.model_preference.value,
-            "input_tokens": provider_response.input_tokens,
-            "output_tokens": provider_response.output_tokens,
-            "cost_usd": cost_breakdown.total_cost_usd,
-            "total_time_ms": total_time_ms,
-            "success": provider_response.success,
-        })
+        _enqueue_log(metric)
         
-        return response
+        return Response(content=response.model_dump_json(), media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
 
+@lru_cache(maxsize=1)
+def _models_payload(available_models: tuple[str, ...]) -> bytes:
+    """Serialized /models body, rebuilt whenever the set of available models changes"""
+    models = [MODEL_INFO_TABLE[model] for model in available_models]
+    return orjson.dumps({"models": models, "total": len(models)})
+
+
 @router.get("/models", summary="List Available Models")
 async def list_models(api_key: str = Depends(verify_api_key)):
     """List all available models with details"""
-    model_router = get_router()
-    available_models = model_router.get_available_models()
-    
-    models = []
-    for model in available_models:
-        pricing = MODEL_PRICING.get(model, {})
-        capabilities = MODEL_CAPABILITIES.get(model, {})
-        
-        models.append({
-            "model": model,
-            "provider": capabilities.get("provider", "unknown"),
-            "tasks": capabilities.get("tasks", []),
-            "max_tokens": capabilities.get("max_tokens", 4096),
-            "avg_latency_ms": capabilities.get("avg_latency_ms", 1000),
-            "quality_score": capabilities.get("quality_score", 0.5),
-            "pricing": {
-                "input_per_1k_tokens": pricing.get("input", 0),
-                "output_per_1k_tokens": pricing.get("output", 0),
-            }
-        })
-    
-    return {"models": models, "total": len(models)}
+    payload = _models_payload(get_router().get_available_models())
+    return Response(content=payload, media_type="application/json")
 
 
 @router.post("/estimate", summary="Estimate Request Cost")
@@ -203,10 +324,21 @@ async def estimate_cost(
     cost_calculator = get_cost_calculator()
     
     selected_model, routing_decision = await model_router.select_model(request)
-    estimated_cost = cost_calculator.estimate_cost(selected_model, request.text)
+    
+    # One O(1) token estimate (4 chars per token) shared by the estimate and the comparison
+    input_tokens = len(request.text) // 4
+    estimated_cost = cost_calculator.estimate_cost(
+        selected_model, request.text, input_tokens=input_tokens
+    )
+    cost_comparison = cost_calculator.compare_models(
+        [selected_model, *routing_decision.alternatives_considered],
+        input_tokens=input_tokens,
+        output_tokens=int(input_tokens * 0.3),
+    )
     
     return {
         "selected_model": selected_model,
         "estimated_cost_usd": estimated_cost,
         "routing_decision": routing_decision,
+        "cost_comparison": cost_comparison,
     }
\ No newline at end of file
@@ -3,17 +3,25 @@ LLM Orchestration Engine - Health Router
 Health checks and status endpoints
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Literal
 
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Response
+from fastapi.responses import ORJSONResponse
 
 from app.config import get_settings
-from app.services import get_metrics_collector
+from app.services import get_metrics_collector, get_aggregate_cache
 from app.services.providers import get_litellm_provider, get_mock_provider
 
 
-router = APIRouter(tags=["health"])
+router = APIRouter(tags=["health"], default_response_class=ORJSONResponse)
+
+
+def _now_iso() -> str:
+    """Current UTC time as a naive ISO string (the timestamp format used across the API)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
 
 
 @router.get(
@@ -25,7 +33,7 @@ async def health_check():
     """Simple health check"""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _now_iso(),
     }
 
 
@@ -39,12 +47,26 @@ async def detailed_health_check():
     settings = get_settings()
     metrics = get_metrics_collector()
     
-    # Check provider health
+    # No traffic yet (fresh pod): nothing to scan
+    if not metrics.total_requests_processed:
+        return {
+            "status": "healthy",
+            "version": settings.app_version,
+            "timestamp": _now_iso(),
+            "environment": settings.environment,
+            "providers": {},
+            "uptime_seconds": metrics.uptime_seconds,
+            "requests_processed": 0,
+            "error_rate_percent": 0.0,
+            "available_providers": settings.available_providers,
+        }
+    
+    # Check provider health (TTL-cached in the collector)
     providers_health = metrics.get_provider_health()
     
     # Determine overall status
     if not providers_health:
-        overall_status = "healthy"  # No requests yet
+        overall_status = "healthy"  # Everything recorded has aged out
     else:
         unhealthy_count = sum(
             1 for p in providers_health.values() 
@@ -63,12 +85,12 @@ async def detailed_health_check():
             overall_status = "healthy"
     
     # Get aggregate error rate
-    agg = metrics.aggregate()
+    agg = get_aggregate_cache().get("1h")
     
     return {
         "status": overall_status,
         "version": settings.app_version,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _now_iso(),
         "environment": settings.environment,
         "providers": providers_health,
         "uptime_seconds": metrics.uptime_seconds,
@@ -85,24 +107,33 @@ async def detailed_health_check():
 )
 async def readiness_check():
     """Readiness probe for Kubernetes"""
+    return Response(content=_readiness_payload(), media_type="application/json")
+
+
+@lru_cache(maxsize=1)
+def _readiness_payload() -> bytes:
+    """Serialized readiness body; depends only on settings"""
     settings = get_settings()
     
     # Check if at least one provider is available
     providers = settings.available_providers
     
-    if not providers or providers == ["mock"]:
+    if not providers or providers == ("mock",):
         # Only mock available - still ready but limited
-        return {
+        return orjson.dumps({
             "ready": True,
             "mode": "mock-only",
             "message": "Running in mock mode. Configure API keys for production.",
-        }
+        })
     
-    return {
+    return orjson.dumps({
         "ready": True,
         "mode": "production",
         "providers": providers,
-    }
+    })
+
+
+_LIVENESS_PAYLOAD = orjson.dumps({"alive": True})
 
 
 @router.get(
@@ -112,7 +143,7 @@ async def readiness_check():
 )
 async def liveness_check():
     """Liveness probe for Kubernetes"""
-    return {"alive": True}
+    return Response(content=_LIVENESS_PAYLOAD, media_type="application/json")
 
 
 @router.get(
@@ -122,9 +153,15 @@ async def liveness_check():
 )
 async def check_providers():
     """Debug endpoint to check which providers are configured"""
+    return Response(content=_providers_payload(), media_type="application/json")
+
+
+@lru_cache(maxsize=1)
+def _providers_payload() -> bytes:
+    """Serialized provider config body; call _providers_payload.cache_clear() after a settings reload"""
     settings = get_settings()
     
-    return {
+    return orjson.dumps({
         "configured_providers": {
             "openai": bool(settings.openai_api_key),
             "anthropic": bool(settings.anthropic_api_key),
@@ -141,4 +178,4 @@ async def check_providers():
             "anthropic": settings.anthropic_api_key[:8] + "..." if settings.anthropic_api_key else None,
             "gemini": settings.gemini_api_key[:8] + "..." if settings.gemini_api_key else None,
         }
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -3,30 +3,24 @@ LLM Orchestration Engine - Metrics Router
 Observability and analytics endpoints
 """
 
-from datetime import datetime, timedelta
-from typing import Optional, Literal
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable, Optional, Literal
 
-from fastapi import APIRouter, Depends, Query, Header, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from app.config import get_settings
-from app.services import get_metrics_collector, get_cost_calculator
+from app.services import get_metrics_collector, get_cost_calculator, get_aggregate_cache
 from app.db.local_storage import get_local_storage
+from app.routers.generate import discard_queued_logs
+from app.routers.deps import verify_metrics_api_key
 
 
-router = APIRouter(prefix="/api/v1/metrics", tags=["metrics"])
-
-
-async def verify_api_key(x_api_key: Optional[str] = Header(None)) -> str:
-    """Verify API key from header"""
-    settings = get_settings()
-    
-    if settings.environment == "development" and not x_api_key:
-        return "dev-anonymous"
-    
-    if not x_api_key or x_api_key not in settings.valid_api_keys:
-        raise HTTPException(status_code=401, detail="Invalid or missing API key")
-    
-    return x_api_key
+router = APIRouter(
+    prefix="/api/v1/metrics",
+    tags=["metrics"],
+    default_response_class=ORJSONResponse,
+)
 
 
 @router.get(
@@ -36,16 +30,20 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None)) -> str:
 )
 async def get_metrics_summary(
     hours: int = Query(default=24, ge=1, le=168, description="Hours to aggregate"),
-    api_key: str = Depends(verify_api_key),
+    api_key: str = Depends(verify_metrics_api_key),
 ):
     """Get aggregated metrics for the specified time period"""
     metrics = get_metrics_collector()
     cost_calc = get_cost_calculator()
     
-    start_time = datetime.utcnow() - timedelta(hours=hours)
-    agg = metrics.aggregate(start_time=start_time)
+    cached_window = {1: "1h", 24: "24h"}.get(hours)
+    if cached_window:
+        agg = get_aggregate_cache().get(cached_window)
+    else:
+        start_time = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=hours)
+        agg = metrics.aggregate(start_time=start_time)
     
-    return {
+    return ORJSONResponse({
         "time_range": {
             "start": agg.start_time.isoformat(),
             "end": agg.end_time.isoformat(),
@@ -59,16 +57,16 @@ async def get_metrics_summary(
             "fallbacks": agg.fallback_requests,
         },
         "latency_ms": {
-            "p50": round(agg.p50_latency_ms, 2),
-            "p95": round(agg.p95_latency_ms, 2),
-            "p99": round(agg.p99_latency_ms, 2),
-            "average": round(agg.average_latency_ms, 2),
+            "p50": agg.p50_latency_ms,
+            "p95": agg.p95_latency_ms,
+            "p99": agg.p99_latency_ms,
+            "average": agg.average_latency_ms,
         },
         "costs": {
-            "total_usd": round(agg.total_cost_usd, 6),
-            "average_per_request_usd": round(agg.average_cost_per_request_usd, 6),
-            "by_model": {k: round(v, 6) for k, v in agg.cost_by_model.items()},
-            "by_provider": {k: round(v, 6) for k, v in agg.cost_by_provider.items()},
+            "total_usd": agg.total_cost_usd,
+            "average_per_request_usd": agg.average_cost_per_request_usd,
+            "by_model": agg.cost_by_model,
+            "by_provider": agg.cost_by_provider,
         },
         "tokens": {
             "total": agg.total_tokens,
@@ -80,11 +78,11 @@ async def get_metrics_summary(
             "by_model": agg.requests_by_model,
         },
         "rates": {
-            "error_rate_percent": round(agg.error_rate_percent, 2),
-            "cache_hit_rate_percent": round(agg.cache_hit_rate_percent, 2),
-            "fallback_rate_percent": round(agg.fallback_rate_percent, 2),
+            "error_rate_percent": agg.error_rate_percent,
+            "cache_hit_rate_percent": agg.cache_hit_rate_percent,
+            "fallback_rate_percent": agg.fallback_rate_percent,
         },
-    }
+    })
 
 
 @router.get(
@@ -94,11 +92,11 @@ async def get_metrics_summary(
 )
 async def get_model_metrics(
     model: str,
-    api_key: str = Depends(verify_api_key),
+    api_key: str = Depends(verify_metrics_api_key),
 ):
     """Get detailed metrics for a specific model"""
     metrics = get_metrics_collector()
-    return metrics.get_model_performance(model)
+    return ORJSONResponse(metrics.get_model_performance(model))
 
 
 @router.get(
@@ -107,14 +105,14 @@ async def get_model_metrics(
     description="Get health status of all providers"
 )
 async def get_provider_health(
-    api_key: str = Depends(verify_api_key),
+    api_key: str = Depends(verify_metrics_api_key),
 ):
     """Get health status for all providers"""
     metrics = get_metrics_collector()
-    return {
+    return ORJSONResponse({
         "providers": metrics.get_provider_health(),
-        "timestamp": datetime.utcnow().isoformat(),
-    }
+        "timestamp": datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+    })
 
 
 @router.get(
@@ -123,7 +121,7 @@ async def get_provider_health(
     description="Get detailed cost breakdown"
 )
 async def get_cost_analysis(
-    api_key: str = Depends(verify_api_key),
+    api_key: str = Depends(verify_metrics_api_key),
 ):
     """Get cost analysis and comparison"""
     cost_calc = get_cost_calculator()
@@ -132,17 +130,27 @@ async def get_cost_analysis(
     summary = cost_calc.get_cost_summary()
     agg = metrics.aggregate()
     
-    return {
-        "total_cost_usd": round(summary["total_cost_usd"], 6),
-        "cost_by_model": {k: round(v, 6) for k, v in summary["cost_by_model"].items()},
-        "cost_by_provider": {k: round(v, 6) for k, v in summary["cost_by_provider"].items()},
-        "average_cost_per_request": round(agg.average_cost_per_request_usd, 6),
+    return ORJSONResponse({
+        "total_cost_usd": summary["total_cost_usd"],
+        # orjson only encodes real dicts, so materialize the read-only views here
+        "cost_by_model": dict(summary["cost_by_model"]),
+        "cost_by_provider": dict(summary["cost_by_provider"]),
+        "average_cost_per_request": agg.average_cost_per_request_usd,
         "tokens_processed": agg.total_tokens,
-        "cost_per_1k_tokens": round(
-            (summary["total_cost_usd"] / agg.total_tokens * 1000) if agg.total_tokens > 0 else 0, 
-            6
+        "cost_per_1k_tokens": (
+            (summary["total_cost_usd"] / agg.total_tokens * 1000) if agg.total_tokens > 0 else 0
         ),
-    }
+    })
+
+
+async def _stream_logs(logs: Iterable[dict]) -> AsyncIterator[bytes]:
+    """Encode {"logs": [...], "total": N} one entry at a time"""
+    yield b'{"logs":['
+    total = 0
+    for log_entry in logs:
+        yield (b"," if total else b"") + orjson.dumps(log_entry)
+        total += 1
+    yield b'],"total":%d}' % total
 
 
 @router.get(
@@ -154,19 +162,13 @@ async def get_request_logs(
     limit: int = Query(default=50, ge=1, le=500),
     model: Optional[str] = Query(default=None),
     success_only: bool = Query(default=False),
-    api_key: str = Depends(verify_api_key),
+    api_key: str = Depends(verify_metrics_api_key),
 ):
     """Get recent request logs"""
     storage = get_local_storage()
-    logs = storage.get_logs(limit=limit, model=model)
-    
-    if success_only:
-        logs = [l for l in logs if l.get("success", False)]
+    logs = storage.iter_logs(limit=limit, model=model, success_only=success_only)
     
-    return {
-        "logs": logs,
-        "total": len(logs),
-    }
+    return StreamingResponse(_stream_logs(logs), media_type="application/json")
 
 
 @router.get(
@@ -175,35 +177,35 @@ async def get_request_logs(
     description="Get real-time statistics for dashboard"
 )
 async def get_realtime_stats(
-    api_key: str = Depends(verify_api_key),
+    api_key: str = Depends(verify_metrics_api_key),
 ):
     """Get real-time stats for live dashboard"""
     metrics = get_metrics_collector()
     
+    aggregate_cache = get_aggregate_cache()
+    
     # Last minute stats
-    one_min_ago = datetime.utcnow() - timedelta(minutes=1)
-    recent = metrics.aggregate(start_time=one_min_ago)
+    recent = aggregate_cache.get("1m")
     
     # Last hour stats
-    one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-    hourly = metrics.aggregate(start_time=one_hour_ago)
+    hourly = aggregate_cache.get("1h")
     
-    return {
+    return ORJSONResponse({
         "last_minute": {
             "requests": recent.total_requests,
             "errors": recent.failed_requests,
-            "avg_latency_ms": round(recent.average_latency_ms, 2),
+            "avg_latency_ms": recent.average_latency_ms,
         },
         "last_hour": {
             "requests": hourly.total_requests,
             "errors": hourly.failed_requests,
-            "avg_latency_ms": round(hourly.average_latency_ms, 2),
-            "cost_usd": round(hourly.total_cost_usd, 6),
+            "avg_latency_ms": hourly.average_latency_ms,
+            "cost_usd": hourly.total_cost_usd,
         },
         "uptime_seconds": metrics.uptime_seconds,
         "total_requests": metrics.total_requests_processed,
         "provider_health": metrics.get_provider_health(),
-    }
+    })
 
 
 @router.get(
@@ -214,23 +216,20 @@ async def get_realtime_stats(
 async def export_metrics(
     format: Literal["json", "cloudwatch"] = Query(default="json"),
     hours: int = Query(default=24, ge=1, le=168),
-    api_key: str = Depends(verify_api_key),
+    api_key: str = Depends(verify_metrics_api_key),
 ):
     """Export metrics for external systems"""
     metrics = get_metrics_collector()
     
     if format == "cloudwatch":
-        return {
-            "Namespace": "LLMOrchestration",
-            "MetricData": metrics.to_cloudwatch_format(),
-        }
+        return Response(content=get_aggregate_cache().get_cloudwatch(), media_type="application/json")
     
-    # Default JSON format
-    start_time = datetime.utcnow() - timedelta(hours=hours)
-    return {
-        "exported_at": datetime.utcnow().isoformat(),
-        "metrics": metrics.aggregate(start_time=start_time).__dict__,
-    }
+    # Default JSON format; orjson encodes the AggregatedMetrics dataclass natively (no __dict__ copy)
+    start_time = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=hours)
+    return ORJSONResponse({
+        "exported_at": datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+        "metrics": metrics.aggregate(start_time=start_time),
+    })
 
 
 @router.delete(
@@ -239,32 +238,35 @@ async def export_metrics(
     description="Clear all metrics, logs, and request history"
 )
 async def clear_metrics(
-    api_key: str = Depends(verify_api_key),
+    api_key: str = Depends(verify_metrics_api_key),
 ):
     """Clear all stored metrics and logs"""
     from app.services import get_router
     
+    # Drop bookkeeping still queued for the flusher, so it isn't written back after the clear
+    discard_queued_logs()
+    
     # Clear metrics collector
     metrics = get_metrics_collector()
     metrics.clear()
+    get_aggregate_cache().invalidate()
     
     # Clear cost calculator
-    cost_calc = get_cost_calculator()
-    cost_calc._total_cost_usd = 0.0
-    cost_calc._cost_by_model = {}
-    cost_calc._cost_by_provider = {}
+    get_cost_calculator().reset()
     
-    # Clear router's internal metrics
-    router_service = get_router()
-    router_service._model_metrics = {}
-    router_service._provider_health = {}
+    # Clear router's internal metrics and cached responses (hits would re-log old answers)
+    model_router = get_router()
+    model_router.reset_metrics()
+    for cache in (model_router.exact_cache, model_router.semantic_cache):
+        if cache is not None:
+            cache.clear()
     
     # Clear local storage
     storage = get_local_storage()
     storage.clear()
     
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": "All metrics and logs cleared",
-        "timestamp": datetime.utcnow().isoformat(),
-    }
\ No newline at end of file
+        "timestamp": datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+    })
\ No newline at end of file
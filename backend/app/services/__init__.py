@@ -4,7 +4,15 @@ LLM Orchestration Engine - Services Package
 
 from .router import ModelRouter, get_router
 from .cost_calculator import CostCalculator, get_cost_calculator
-from .metrics_collector import MetricsCollector, get_metrics_collector, RequestMetric
+from .metrics_collector import (
+    MetricsCollector,
+    get_metrics_collector,
+    RequestMetric,
+    AggregateCache,
+    get_aggregate_cache,
+    warm_aggregate_kernel,
+)
+from .response_cache import ExactCache, SemanticCache
 
 __all__ = [
     "ModelRouter",
@@ -14,4 +22,9 @@ __all__ = [
     "MetricsCollector",
     "get_metrics_collector",
     "RequestMetric",
+    "AggregateCache",
+    "get_aggregate_cache",
+    "warm_aggregate_kernel",
+    "ExactCache",
+    "SemanticCache",
 ]
\ No newline at end of file
@@ -3,13 +3,16 @@ LLM Orchestration Engine - Cost Calculator
 Calculates and tracks costs for LLM usage
 """
 
-from typing import Optional
+from collections import defaultdict
+from functools import cache
+from types import MappingProxyType
+from typing import Callable, Optional
 from dataclasses import dataclass
 
 from app.config import MODEL_PRICING
 
 
-@dataclass
+@dataclass(slots=True)
 class CostBreakdown:
     """Detailed cost breakdown"""
     input_cost_usd: float
@@ -20,18 +23,40 @@ class CostBreakdown:
     model: str
 
 
+def _specialize(input_price: float, output_price: float) -> Callable[[int, int], float]:
+    """Total-cost function with one model's prices bound as closure constants"""
+    def total(input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens / 1000) * input_price + (output_tokens / 1000) * output_price
+    return total
+
+
 class CostCalculator:
     """
     Calculates and optimizes LLM costs
     """
     
+    DEFAULT_PRICING = {"input": 0.01, "output": 0.03}
+    
     def __init__(self):
         self.pricing = MODEL_PRICING
         
-        # Track cumulative costs
+        # Pricing is read-only, so derived lookups are computed once
+        self._max_pricing = max(self.pricing.values(), key=lambda p: p["input"] + p["output"])
+        self._blended_rate = {
+            model: p["input"] * 0.7 + p["output"] * 0.3 for model, p in self.pricing.items()
+        }
+        self._fast = {
+            model: _specialize(p["input"], p["output"]) for model, p in self.pricing.items()
+        }
+        self._generic = _specialize(self.DEFAULT_PRICING["input"], self.DEFAULT_PRICING["output"])
+        
+        self.reset()
+    
+    def reset(self):
+        """Clear cumulative cost tracking"""
         self._total_cost_usd = 0.0
-        self._cost_by_model: dict[str, float] = {}
-        self._cost_by_provider: dict[str, float] = {}
+        self._cost_by_model: defaultdict[str, float] = defaultdict(float)
+        self._cost_by_provider: defaultdict[str, float] = defaultdict(float)
     
     def calculate_cost(
         self,
@@ -42,17 +67,14 @@ class CostCalculator:
         """
         Calculate the cost for a request
         """
-        pricing = self.pricing.get(model, {"input": 0.01, "output": 0.03})
+        input_price, output_price = self._unit_cost(model)
         
-        input_cost = (input_tokens / 1000) * pricing["input"]
-        output_cost = (output_tokens / 1000) * pricing["output"]
+        input_cost = (input_tokens / 1000) * input_price
+        output_cost = (output_tokens / 1000) * output_price
         total_cost = input_cost + output_cost
         
         # Calculate savings vs most expensive model
-        max_pricing = max(
-            self.pricing.values(),
-            key=lambda p: p["input"] + p["output"]
-        )
+        max_pricing = self._max_pricing
         max_cost = (
             (input_tokens / 1000) * max_pricing["input"] +
             (output_tokens / 1000) * max_pricing["output"]
@@ -72,21 +94,31 @@ class CostCalculator:
             model=model,
         )
     
+    def _unit_cost(self, model: str) -> tuple[float, float]:
+        """(input, output) USD per 1K tokens"""
+        pricing = self.pricing.get(model, self.DEFAULT_PRICING)
+        return pricing["input"], pricing["output"]
+    
+    def total_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """Total USD cost only, skipping the CostBreakdown and savings math"""
+        return self._fast.get(model, self._generic)(input_tokens, output_tokens)
+    
     def estimate_cost(
         self,
         model: str,
         text: str,
         expected_output_ratio: float = 0.3,
+        input_tokens: Optional[int] = None,
     ) -> float:
         """
         Estimate cost before making a request
+        Pass input_tokens when already counted to reuse it across candidate models
         """
         # Rough token estimation (4 chars per token)
-        estimated_input_tokens = len(text) // 4
+        estimated_input_tokens = len(text) // 4 if input_tokens is None else input_tokens
         estimated_output_tokens = int(estimated_input_tokens * expected_output_ratio)
         
-        breakdown = self.calculate_cost(model, estimated_input_tokens, estimated_output_tokens)
-        return breakdown.total_cost_usd
+        return self.total_cost(model, estimated_input_tokens, estimated_output_tokens)
     
     def record_cost(
         self,
@@ -96,13 +128,7 @@ class CostCalculator:
     ):
         """Record cost for tracking and analytics"""
         self._total_cost_usd += cost_usd
-        
-        if model not in self._cost_by_model:
-            self._cost_by_model[model] = 0.0
         self._cost_by_model[model] += cost_usd
-        
-        if provider not in self._cost_by_provider:
-            self._cost_by_provider[provider] = 0.0
         self._cost_by_provider[provider] += cost_usd
     
     def get_cheapest_model(
@@ -111,24 +137,21 @@ class CostCalculator:
         estimated_tokens: int = 1000,
     ) -> str:
         """Find the cheapest model from a list"""
-        costs = []
-        for model in models:
-            if model in self.pricing:
-                pricing = self.pricing[model]
-                cost = (estimated_tokens / 1000) * (pricing["input"] * 0.7 + pricing["output"] * 0.3)
-                costs.append((model, cost))
+        rates = self._blended_rate
+        priced = [model for model in models if model in rates]
         
-        if not costs:
+        if not priced:
             return models[0] if models else "mock/default"
         
-        return min(costs, key=lambda x: x[1])[0]
+        # Token count scales every candidate equally, so compare blended rates directly
+        return min(priced, key=rates.__getitem__)
     
     def get_cost_summary(self) -> dict:
-        """Get cost summary for dashboard"""
+        """Get cost summary for dashboard (breakdowns are live read-only views)"""
         return {
             "total_cost_usd": self._total_cost_usd,
-            "cost_by_model": self._cost_by_model.copy(),
-            "cost_by_provider": self._cost_by_provider.copy(),
+            "cost_by_model": MappingProxyType(self._cost_by_model),
+            "cost_by_provider": MappingProxyType(self._cost_by_provider),
         }
     
     def compare_models(
@@ -140,14 +163,21 @@ class CostCalculator:
         """Compare costs across multiple models"""
         comparisons = []
         
+        # Token scaling is shared by every model; only the unit prices differ
+        input_k = input_tokens / 1000
+        output_k = output_tokens / 1000
+        total_tokens = input_tokens + output_tokens
         for model in models:
-            breakdown = self.calculate_cost(model, input_tokens, output_tokens)
+            input_price, output_price = self._unit_cost(model)
+            input_cost = input_k * input_price
+            output_cost = output_k * output_price
+            total_cost = input_cost + output_cost
             comparisons.append({
                 "model": model,
-                "input_cost": breakdown.input_cost_usd,
-                "output_cost": breakdown.output_cost_usd,
-                "total_cost": breakdown.total_cost_usd,
-                "cost_per_1k": breakdown.cost_per_1k_tokens,
+                "input_cost": input_cost,
+                "output_cost": output_cost,
+                "total_cost": total_cost,
+                "cost_per_1k": (total_cost / total_tokens * 1000) if total_tokens > 0 else 0,
             })
         
         # Sort by total cost
@@ -156,13 +186,8 @@ class CostCalculator:
         return comparisons
 
 
-# Singleton
-_calculator: Optional[CostCalculator] = None
-
-
+# Singleton (functools.cache keeps the accessor on the C fast path)
+@cache
 def get_cost_calculator() -> CostCalculator:
     """Get or create cost calculator instance"""
-    global _calculator
-    if _calculator is None:
-        _calculator = CostCalculator()
-    return _calculator
\ No newline at end of file
+    return CostCalculator()
\ No newline at end of file
@@ -3,16 +3,19 @@ LLM Orchestration Engine - Metrics Collector
 Collects, stores, and exposes metrics for observability
 """
 
+import asyncio
 import time
-import statistics
-from typing import Optional, Any
+from typing import Iterable, Optional, Any
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from functools import cache
 import json
 
+import numpy as np
+import orjson
 
-@dataclass
+
+@dataclass(slots=True)
 class RequestMetric:
     """Single request metric"""
     timestamp: datetime
@@ -40,9 +43,28 @@ class RequestMetric:
     
     # Client info
     user_agent: Optional[str] = None
+    
+    # Epoch nanoseconds for the same instant as timestamp; saves datetime math in record()
+    timestamp_ns: Optional[int] = None
+    
+    def to_log_dict(self) -> dict:
+        """Request log entry for storage"""
+        return {
+            "request_id": self.request_id,
+            "timestamp": _naive_utc(self.timestamp),
+            "model": self.model,
+            "provider": self.provider,
+            "task": self.task,
+            "preference": self.preference,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": self.cost_usd,
+            "total_time_ms": self.total_time_ms,
+            "success": self.success,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class AggregatedMetrics:
     """Aggregated metrics over a time period"""
     start_time: datetime
@@ -56,7 +78,10 @@ class AggregatedMetrics:
     fallback_requests: int = 0
     
     # Latency (ms)
-    latencies: list = field(default_factory=list)
+    p50_latency_ms: float = 0.0
+    p95_latency_ms: float = 0.0
+    p99_latency_ms: float = 0.0
+    average_latency_ms: float = 0.0
     
     # Costs
     total_cost_usd: float = 0.0
@@ -72,53 +97,431 @@ class AggregatedMetrics:
     requests_by_preference: dict = field(default_factory=dict)
     requests_by_model: dict = field(default_factory=dict)
     
-    @property
-    def p50_latency_ms(self) -> float:
-        if not self.latencies:
-            return 0.0
-        return statistics.median(self.latencies)
+    # Derived rates, computed once at construction
+    success_rate_percent: float = field(init=False, default=0.0)
+    error_rate_percent: float = field(init=False, default=0.0)
+    cache_hit_rate_percent: float = field(init=False, default=0.0)
+    fallback_rate_percent: float = field(init=False, default=0.0)
+    average_cost_per_request_usd: float = field(init=False, default=0.0)
     
-    @property
-    def p95_latency_ms(self) -> float:
-        if not self.latencies:
-            return 0.0
-        return statistics.quantiles(self.latencies, n=20)[18] if len(self.latencies) >= 20 else max(self.latencies)
+    def __post_init__(self):
+        total = self.total_requests
+        if total:
+            self.success_rate_percent = self.successful_requests / total * 100
+            self.error_rate_percent = self.failed_requests / total * 100
+            self.cache_hit_rate_percent = self.cached_requests / total * 100
+            self.fallback_rate_percent = self.fallback_requests / total * 100
+            self.average_cost_per_request_usd = self.total_cost_usd / total
+
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    """Aware datetime -> naive UTC; naive values are assumed UTC already"""
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _to_ns(ts: datetime) -> int:
+    """UTC datetime (naive or aware) -> epoch nanoseconds"""
+    return (_naive_utc(ts) - _EPOCH) // _US * 1000
+
+
+def _from_ns(ns: int) -> datetime:
+    """Epoch nanoseconds -> naive UTC datetime"""
+    return _EPOCH + timedelta(microseconds=ns // 1000)
+
+
+def _labelled(counts: np.ndarray, sums: np.ndarray, labels: list[str], cast=int) -> dict:
+    """label -> cast(sum) for every group with at least one row"""
+    return {labels[c]: cast(sums[c]) for c in np.flatnonzero(counts).tolist()}
+
+
+def _aggregate_numpy(success, cached, fallback, cost, tokens, latency, model, provider, task, pref,
+                     n_model, n_provider, n_task, n_pref):
+    """Window reduction with numpy primitives (one C loop per output)"""
+    model_counts = np.bincount(model, minlength=n_model)
+    return (
+        int(np.count_nonzero(success)),
+        int(np.count_nonzero(cached)),
+        int(np.count_nonzero(fallback)),
+        float(cost.sum()),
+        int(tokens.sum()),
+        model_counts,
+        np.bincount(model, weights=cost, minlength=n_model),
+        np.bincount(model, weights=tokens, minlength=n_model),
+        np.bincount(model, weights=success, minlength=n_model),
+        np.bincount(model, weights=latency, minlength=n_model),
+        np.bincount(provider, minlength=n_provider),
+        np.bincount(provider, weights=cost, minlength=n_provider),
+        np.bincount(task, minlength=n_task),
+        np.bincount(pref, minlength=n_pref),
+    )
+
+
+def _aggregate_loop(success, cached, fallback, cost, tokens, latency, model, provider, task, pref,
+                    n_model, n_provider, n_task, n_pref):
+    """Single-pass window reduction; compiled with Numba when available"""
+    model_counts = np.zeros(n_model, dtype=np.int64)
+    model_cost = np.zeros(n_model, dtype=np.float64)
+    model_tokens = np.zeros(n_model, dtype=np.int64)
+    model_successes = np.zeros(n_model, dtype=np.int64)
+    model_latency = np.zeros(n_model, dtype=np.float64)
+    provider_counts = np.zeros(n_provider, dtype=np.int64)
+    provider_cost = np.zeros(n_provider, dtype=np.float64)
+    task_counts = np.zeros(n_task, dtype=np.int64)
+    pref_counts = np.zeros(n_pref, dtype=np.int64)
+    successes = 0
+    cached_count = 0
+    fallback_count = 0
+    total_cost = 0.0
+    total_tokens = 0
+    for i in range(cost.shape[0]):
+        successes += success[i]
+        cached_count += cached[i]
+        fallback_count += fallback[i]
+        total_cost += cost[i]
+        total_tokens += tokens[i]
+        m = model[i]
+        model_counts[m] += 1
+        model_cost[m] += cost[i]
+        model_tokens[m] += tokens[i]
+        model_successes[m] += success[i]
+        model_latency[m] += latency[i]
+        p = provider[i]
+        provider_counts[p] += 1
+        provider_cost[p] += cost[i]
+        task_counts[task[i]] += 1
+        pref_counts[pref[i]] += 1
+    return (
+        successes, cached_count, fallback_count, total_cost, total_tokens,
+        model_counts, model_cost, model_tokens, model_successes, model_latency,
+        provider_counts, provider_cost, task_counts, pref_counts,
+    )
+
+
+# Numba is optional and imported on first use of a large window, so app import stays cheap
+NUMBA_MIN_ROWS = 100_000
+_numba_kernel = None
+_numba_checked = False
+
+
+def _load_numba_kernel():
+    """Compile (or load from Numba's on-disk cache) the single-pass kernel; None without numba"""
+    global _numba_kernel, _numba_checked
+    if not _numba_checked:
+        _numba_checked = True
+        try:
+            from numba import njit
+            _numba_kernel = njit(cache=True, fastmath=True)(_aggregate_loop)
+        except ImportError:
+            _numba_kernel = None
+    return _numba_kernel
+
+
+def _aggregate_kernel(rows: int):
+    """Pick the aggregation kernel: compiled single pass for large windows, numpy otherwise"""
+    if rows < NUMBA_MIN_ROWS:
+        return _aggregate_numpy
+    return _load_numba_kernel() or _aggregate_numpy
+
+
+def warm_aggregate_kernel():
+    """Specialize the Numba kernel for the column dtypes ahead of the first large window"""
+    kernel = _load_numba_kernel()
+    if kernel is None:
+        return
+    flags = np.zeros(1, dtype=np.bool_)
+    code = np.zeros(1, dtype=np.int16)
+    kernel(flags, flags, flags, np.zeros(1), np.zeros(1, dtype=np.int64), np.zeros(1), code, code, code, code, 1, 1, 1, 1)
+
+
+def _latency_summary(latencies: np.ndarray) -> tuple[float, float, float, float]:
+    """p50, p95, p99 and mean from a single quantile pass"""
+    # "weibull" matches statistics.quantiles' default; p95/p99 fall back to the max below 20/100 samples
+    n = len(latencies)
+    if not n:
+        return 0.0, 0.0, 0.0, 0.0
+    p50, p95, p99 = np.quantile(latencies, [0.5, 0.95, 0.99], method="weibull").tolist()
+    top = float(latencies.max())
+    return p50, p95 if n >= 20 else top, p99 if n >= 100 else top, float(latencies.mean())
+
+
+class _MetricColumns:
+    """
+    Column-oriented (SoA) storage for request metrics, kept in timestamp order
+    Live rows are [head, size); rows before head have aged out and are reclaimed on growth
+    """
     
-    @property
-    def p99_latency_ms(self) -> float:
-        if not self.latencies:
-            return 0.0
-        return statistics.quantiles(self.latencies, n=100)[98] if len(self.latencies) >= 100 else max(self.latencies)
+    INITIAL_CAPACITY = 1024
+    MAX_LABELS = np.iinfo(np.int16).max  # Categorical codes are int16
+    CATEGORIES = ("model", "provider", "task", "preference")
+    DTYPES = {
+        "ts_ns": np.int64,
+        "total_ms": np.float64,
+        "routing_ms": np.float64,
+        "inference_ms": np.float64,
+        "input_tokens": np.int32,
+        "output_tokens": np.int32,
+        "cost_usd": np.float64,
+        "success": np.bool_,
+        "cached": np.bool_,
+        "fallback": np.bool_,
+        "model": np.int16,
+        "provider": np.int16,
+        "task": np.int16,
+        "preference": np.int16,
+        "request_id": object,
+        "error": object,
+        "user_agent": object,
+    }
+    # Running totals, laid out like the aggregation kernel's output
+    TOTALS = (
+        "successes", "cached", "fallback", "cost", "tokens",
+        "model_counts", "model_cost", "model_tokens", "model_successes", "model_latency",
+        "provider_counts", "provider_cost",
+        "task_counts", "pref_counts",
+    )
+    TOTALS_BY_CATEGORY = {
+        "model": (
+            ("model_counts", 0), ("model_cost", 0.0), ("model_tokens", 0),
+            ("model_successes", 0), ("model_latency", 0.0),
+        ),
+        "provider": (("provider_counts", 0), ("provider_cost", 0.0)),
+        "task": (("task_counts", 0),),
+        "preference": (("pref_counts", 0),),
+    }
     
-    @property
-    def average_latency_ms(self) -> float:
-        if not self.latencies:
-            return 0.0
-        return statistics.mean(self.latencies)
+    def __init__(self):
+        self.clear()
     
-    @property
-    def error_rate_percent(self) -> float:
-        if self.total_requests == 0:
-            return 0.0
-        return (self.failed_requests / self.total_requests) * 100
+    def clear(self):
+        """Drop all rows and interned labels"""
+        self.capacity = self.INITIAL_CAPACITY
+        self.head = 0
+        self.size = 0
+        self.cols = {name: np.empty(self.capacity, dtype=dtype) for name, dtype in self.DTYPES.items()}
+        self.codes: dict[str, dict[str, int]] = {c: {} for c in self.CATEGORIES}
+        self.labels: dict[str, list[str]] = {c: [] for c in self.CATEGORIES}
+        self.totals: dict[str, Any] = {
+            "successes": 0, "cached": 0, "fallback": 0, "cost": 0.0, "tokens": 0,
+            **{name: [] for fields in self.TOTALS_BY_CATEGORY.values() for name, _ in fields},
+        }
     
-    @property
-    def cache_hit_rate_percent(self) -> float:
-        if self.total_requests == 0:
-            return 0.0
-        return (self.cached_requests / self.total_requests) * 100
+    def __len__(self) -> int:
+        return self.size - self.head
     
-    @property
-    def fallback_rate_percent(self) -> float:
-        if self.total_requests == 0:
-            return 0.0
-        return (self.fallback_requests / self.total_requests) * 100
+    def __getattr__(self, name: str) -> np.ndarray:
+        """Live view of a column, e.g. ``columns.total_ms``"""
+        try:
+            cols = self.__dict__["cols"]
+            return cols[name][self.__dict__["head"]:self.__dict__["size"]]
+        except KeyError:
+            raise AttributeError(name) from None
     
-    @property
-    def average_cost_per_request_usd(self) -> float:
-        if self.total_requests == 0:
-            return 0.0
-        return self.total_cost_usd / self.total_requests
+    def intern(self, category: str, value: str) -> int:
+        """Small-int code for a categorical value"""
+        codes = self.codes[category]
+        code = codes.get(value)
+        if code is None:
+            if len(codes) >= self.MAX_LABELS:
+                raise OverflowError(f"Too many distinct {category} values for metrics storage")
+            code = codes[value] = len(codes)
+            self.labels[category].append(value)
+            for name, zero in self.TOTALS_BY_CATEGORY[category]:
+                self.totals[name].append(zero)
+        return code
+    
+    def _reserve(self):
+        """Make room for one more row, compacting aged-out rows and doubling if still full"""
+        if self.size < self.capacity:
+            return
+        live = self.size - self.head
+        capacity = self.capacity if self.head * 2 >= self.capacity else self.capacity * 2
+        for name, col in self.cols.items():
+            fresh = np.empty(capacity, dtype=col.dtype)
+            fresh[:live] = col[self.head:self.size]
+            self.cols[name] = fresh
+        self.capacity, self.head, self.size = capacity, 0, live
+    
+    def append(self, metric: "RequestMetric") -> int:
+        """Insert a row, keeping the timestamp column sorted; returns its epoch-ns timestamp"""
+        self._reserve()
+        ts_ns = metric.timestamp_ns if metric.timestamp_ns is not None else _to_ns(metric.timestamp)
+        cols = self.cols
+        pos = self.size
+        if pos > self.head and ts_ns < cols["ts_ns"][pos - 1]:
+            # Out-of-order arrival (concurrent requests finishing): shift the tail by one
+            pos = self.head + int(np.searchsorted(cols["ts_ns"][self.head:self.size], ts_ns, side="right"))
+            for col in cols.values():
+                col[pos + 1:self.size + 1] = col[pos:self.size]
+        
+        cols["ts_ns"][pos] = ts_ns
+        cols["total_ms"][pos] = metric.total_time_ms
+        cols["routing_ms"][pos] = metric.routing_time_ms
+        cols["inference_ms"][pos] = metric.inference_time_ms
+        cols["input_tokens"][pos] = metric.input_tokens
+        cols["output_tokens"][pos] = metric.output_tokens
+        cols["cost_usd"][pos] = metric.cost_usd
+        cols["success"][pos] = metric.success
+        cols["cached"][pos] = metric.cached
+        cols["fallback"][pos] = metric.fallback_used
+        model, provider, task, preference = (
+            self.intern(category, getattr(metric, category)) for category in self.CATEGORIES
+        )
+        cols["model"][pos] = model
+        cols["provider"][pos] = provider
+        cols["task"][pos] = task
+        cols["preference"][pos] = preference
+        cols["request_id"][pos] = metric.request_id
+        cols["error"][pos] = metric.error
+        cols["user_agent"][pos] = metric.user_agent
+        self.size += 1
+        
+        tokens = metric.input_tokens + metric.output_tokens
+        t = self.totals
+        t["successes"] += bool(metric.success)
+        t["cached"] += bool(metric.cached)
+        t["fallback"] += bool(metric.fallback_used)
+        t["cost"] += metric.cost_usd
+        t["tokens"] += tokens
+        t["model_counts"][model] += 1
+        t["model_cost"][model] += metric.cost_usd
+        t["model_tokens"][model] += tokens
+        t["model_successes"][model] += bool(metric.success)
+        t["model_latency"][model] += metric.total_time_ms
+        t["provider_counts"][provider] += 1
+        t["provider_cost"][provider] += metric.cost_usd
+        t["task_counts"][task] += 1
+        t["pref_counts"][preference] += 1
+        return ts_ns
+    
+    def drop_until(self, cutoff_ns: int):
+        """Age out rows with timestamp <= cutoff_ns"""
+        # Rows are time-ordered: if the oldest hasn't expired, nothing has
+        if self.size == self.head or self.cols["ts_ns"][self.head] > cutoff_ns:
+            return
+        head = self.head + int(np.searchsorted(self.ts_ns, cutoff_ns, side="right"))
+        if head == self.head:
+            return
+        
+        # Subtract only the expired rows from the running totals
+        expired = self.reduce(slice(self.head, head), _aggregate_numpy)
+        t = self.totals
+        for name, value in zip(self.TOTALS, expired):
+            if isinstance(value, np.ndarray):
+                t[name] = [x - type(x)(y) for x, y in zip(t[name], value.tolist())]
+            else:
+                t[name] -= value
+        for name in ("request_id", "error", "user_agent"):
+            self.cols[name][self.head:head] = None
+        self.head = head
+    
+    def reduce(self, window: slice, kernel) -> tuple:
+        """Run an aggregation kernel over a slice of rows"""
+        c = self.cols
+        labels = self.labels
+        return kernel(
+            c["success"][window],
+            c["cached"][window],
+            c["fallback"][window],
+            c["cost_usd"][window],
+            c["input_tokens"][window].astype(np.int64) + c["output_tokens"][window],
+            c["total_ms"][window],
+            c["model"][window],
+            c["provider"][window],
+            c["task"][window],
+            c["preference"][window],
+            len(labels["model"]),
+            len(labels["provider"]),
+            len(labels["task"]),
+            len(labels["preference"]),
+        )
+    
+    def running_totals(self) -> tuple:
+        """Aggregates over all live rows, maintained incrementally (kernel output layout)"""
+        t = self.totals
+        return tuple(
+            np.asarray(t[name]) if isinstance(t[name], list) else t[name]
+            for name in self.TOTALS
+        )
+    
+    def window(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None, strict_start: bool = False) -> slice:
+        """Slice of live rows with start_ns <= ts <= end_ns (start exclusive when strict_start)"""
+        ts = self.ts_ns
+        lo = 0 if start_ns is None else int(np.searchsorted(ts, start_ns, side="right" if strict_start else "left"))
+        hi = len(ts) if end_ns is None else int(np.searchsorted(ts, end_ns, side="right"))
+        return slice(self.head + lo, self.head + max(lo, hi))
+    
+    def rows(self, index) -> list["RequestMetric"]:
+        """Rebuild RequestMetric objects for the given absolute row indices"""
+        cols = self.cols
+        labels = self.labels
+        return [
+            RequestMetric(
+                timestamp=_from_ns(int(cols["ts_ns"][i])),
+                request_id=cols["request_id"][i],
+                model=labels["model"][cols["model"][i]],
+                provider=labels["provider"][cols["provider"][i]],
+                task=labels["task"][cols["task"][i]],
+                preference=labels["preference"][cols["preference"][i]],
+                total_time_ms=float(cols["total_ms"][i]),
+                routing_time_ms=float(cols["routing_ms"][i]),
+                inference_time_ms=float(cols["inference_ms"][i]),
+                input_tokens=int(cols["input_tokens"][i]),
+                output_tokens=int(cols["output_tokens"][i]),
+                cost_usd=float(cols["cost_usd"][i]),
+                success=bool(cols["success"][i]),
+                cached=bool(cols["cached"][i]),
+                fallback_used=bool(cols["fallback"][i]),
+                error=cols["error"][i],
+                user_agent=cols["user_agent"][i],
+            )
+            for i in index
+        ]
+
+
+class _RecentWindow:
+    """Request/error/latency sums for one provider over the last WINDOW_NS, in fixed time buckets"""
+    
+    BUCKETS = 30
+    BUCKET_NS = 10 * 10**9  # 30 x 10s buckets cover the 5-minute health window
+    WINDOW_NS = BUCKETS * BUCKET_NS
+    
+    def __init__(self):
+        self.epochs = [-1] * self.BUCKETS
+        self.counts = [0] * self.BUCKETS
+        self.errors = [0] * self.BUCKETS
+        self.latency_ms = [0.0] * self.BUCKETS
+    
+    def add(self, ts_ns: int, success: bool, latency_ms: float):
+        """Count a request in its bucket, recycling the slot if it holds an older bucket"""
+        epoch = ts_ns // self.BUCKET_NS
+        i = epoch % self.BUCKETS
+        if self.epochs[i] != epoch:
+            if epoch < self.epochs[i]:
+                return  # Older than anything the slot can still represent
+            self.epochs[i] = epoch
+            self.counts[i] = self.errors[i] = 0
+            self.latency_ms[i] = 0.0
+        self.counts[i] += 1
+        self.errors[i] += not success
+        self.latency_ms[i] += latency_ms
+    
+    def totals(self, now_ns: int) -> tuple[int, int, float]:
+        """(requests, errors, latency sum) over buckets still inside the window"""
+        oldest = (now_ns - self.WINDOW_NS) // self.BUCKET_NS
+        count = errors = 0
+        latency = 0.0
+        for i, epoch in enumerate(self.epochs):
+            if epoch > oldest:
+                count += self.counts[i]
+                errors += self.errors[i]
+                latency += self.latency_ms[i]
+        return count, errors, latency
 
 
 class MetricsCollector:
@@ -127,30 +530,59 @@ class MetricsCollector:
     In production, this would integrate with CloudWatch/DynamoDB
     """
     
+    PROVIDER_HEALTH_TTL_S = 1.0
+    # (MetricName, AggregatedMetrics attribute, Unit) exported to CloudWatch
+    CLOUDWATCH_METRICS = (
+        ("RequestCount", "total_requests", "Count"),
+        ("SuccessRate", "success_rate_percent", "Percent"),
+        ("P50Latency", "p50_latency_ms", "Milliseconds"),
+        ("P99Latency", "p99_latency_ms", "Milliseconds"),
+        ("TotalCost", "total_cost_usd", "None"),  # USD
+    )
+    
     def __init__(self, retention_hours: int = 24 * 7):
         self.retention_hours = retention_hours
-        self._metrics: list[RequestMetric] = []
-        self._start_time = datetime.utcnow()
+        self._retention_ns = retention_hours * 3600 * 10**9
+        self._columns = _MetricColumns()
+        self._recent: dict[str, _RecentWindow] = {}
+        self._start_time = datetime.now(timezone.utc).replace(tzinfo=None)
         self._request_count = 0
+        self._provider_health_cache: Optional[tuple[float, dict[str, dict]]] = None
     
     def record(self, metric: RequestMetric):
         """Record a new metric"""
-        self._metrics.append(metric)
-        self._request_count += 1
+        self._append(metric)
         
         # Cleanup old metrics
         self._cleanup_old_metrics()
     
+    def record_many(self, metrics: Iterable[RequestMetric]):
+        """Record a batch of metrics, ageing out old rows once for the whole batch"""
+        for metric in metrics:
+            self._append(metric)
+        self._cleanup_old_metrics()
+    
+    def _append(self, metric: RequestMetric):
+        """Store one metric and update the per-provider recent window"""
+        ts_ns = self._columns.append(metric)
+        self._request_count += 1
+        
+        recent = self._recent.get(metric.provider)
+        if recent is None:
+            recent = self._recent[metric.provider] = _RecentWindow()
+        recent.add(ts_ns, metric.success, metric.total_time_ms)
+    
     def clear(self):
         """Clear all metrics"""
-        self._metrics = []
+        self._columns.clear()
+        self._recent.clear()
         self._request_count = 0
-        self._start_time = datetime.utcnow()
+        self._start_time = datetime.now(timezone.utc).replace(tzinfo=None)
+        self._provider_health_cache = None
     
     def _cleanup_old_metrics(self):
         """Remove metrics older than retention period"""
-        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
-        self._metrics = [m for m in self._metrics if m.timestamp > cutoff]
+        self._columns.drop_until(time.time_ns() - self._retention_ns)
     
     def get_metrics(
         self,
@@ -160,18 +592,18 @@ class MetricsCollector:
         task: Optional[str] = None,
     ) -> list[RequestMetric]:
         """Get filtered metrics"""
-        metrics = self._metrics
-        
-        if start_time:
-            metrics = [m for m in metrics if m.timestamp >= start_time]
-        if end_time:
-            metrics = [m for m in metrics if m.timestamp <= end_time]
-        if model:
-            metrics = [m for m in metrics if m.model == model]
-        if task:
-            metrics = [m for m in metrics if m.task == task]
+        cols = self._columns
+        window = cols.window(
+            _to_ns(start_time) if start_time else None,
+            _to_ns(end_time) if end_time else None,
+        )
+        mask = np.ones(window.stop - window.start, dtype=bool)
+        for category, value in (("model", model), ("task", task)):
+            if value:
+                code = cols.codes[category].get(value, -1)
+                mask &= cols.cols[category][window] == code
         
-        return metrics
+        return cols.rows((np.flatnonzero(mask) + window.start).tolist())
     
     def aggregate(
         self,
@@ -180,104 +612,116 @@ class MetricsCollector:
     ) -> AggregatedMetrics:
         """Aggregate metrics over a time period"""
         if start_time is None:
-            start_time = datetime.utcnow() - timedelta(hours=1)
+            start_time = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1)
         if end_time is None:
-            end_time = datetime.utcnow()
+            end_time = datetime.now(timezone.utc).replace(tzinfo=None)
         
-        metrics = self.get_metrics(start_time=start_time, end_time=end_time)
+        cols = self._columns
+        window = cols.window(_to_ns(start_time), _to_ns(end_time))
         
-        agg = AggregatedMetrics(start_time=start_time, end_time=end_time)
+        total = window.stop - window.start
+        if total == 0:
+            return AggregatedMetrics(start_time=start_time, end_time=end_time)
         
-        for m in metrics:
-            agg.total_requests += 1
-            
-            if m.success:
-                agg.successful_requests += 1
-            else:
-                agg.failed_requests += 1
-            
-            if m.cached:
-                agg.cached_requests += 1
-            
-            if m.fallback_used:
-                agg.fallback_requests += 1
-            
-            agg.latencies.append(m.total_time_ms)
-            agg.total_cost_usd += m.cost_usd
-            agg.total_tokens += m.input_tokens + m.output_tokens
-            
-            # By model
-            if m.model not in agg.cost_by_model:
-                agg.cost_by_model[m.model] = 0.0
-                agg.tokens_by_model[m.model] = 0
-                agg.requests_by_model[m.model] = 0
-            agg.cost_by_model[m.model] += m.cost_usd
-            agg.tokens_by_model[m.model] += m.input_tokens + m.output_tokens
-            agg.requests_by_model[m.model] += 1
-            
-            # By provider
-            if m.provider not in agg.cost_by_provider:
-                agg.cost_by_provider[m.provider] = 0.0
-            agg.cost_by_provider[m.provider] += m.cost_usd
-            
-            # By task
-            if m.task not in agg.requests_by_task:
-                agg.requests_by_task[m.task] = 0
-            agg.requests_by_task[m.task] += 1
-            
-            # By preference
-            if m.preference not in agg.requests_by_preference:
-                agg.requests_by_preference[m.preference] = 0
-            agg.requests_by_preference[m.preference] += 1
+        c = cols.cols
+        labels = cols.labels
+        if window.start == cols.head and window.stop == cols.size:
+            # Window covers every retained row: read the running totals instead of scanning
+            reduced = cols.running_totals()
+        else:
+            reduced = cols.reduce(window, _aggregate_kernel(total))
+        (
+            successes, cached, fallback, total_cost, total_tokens,
+            model_counts, model_cost, model_tokens, _, _,
+            provider_counts, provider_cost, task_counts, pref_counts,
+        ) = reduced
+        
+        successes = int(successes)
+        p50, p95, p99, average = _latency_summary(c["total_ms"][window])
         
-        return agg
+        return AggregatedMetrics(
+            start_time=start_time,
+            end_time=end_time,
+            total_requests=total,
+            successful_requests=successes,
+            failed_requests=total - successes,
+            cached_requests=int(cached),
+            fallback_requests=int(fallback),
+            p50_latency_ms=p50,
+            p95_latency_ms=p95,
+            p99_latency_ms=p99,
+            average_latency_ms=average,
+            total_cost_usd=float(total_cost),
+            cost_by_model=_labelled(model_counts, model_cost, labels["model"], float),
+            cost_by_provider=_labelled(provider_counts, provider_cost, labels["provider"], float),
+            total_tokens=int(total_tokens),
+            tokens_by_model=_labelled(model_counts, model_tokens, labels["model"]),
+            requests_by_task=_labelled(task_counts, task_counts, labels["task"]),
+            requests_by_preference=_labelled(pref_counts, pref_counts, labels["preference"]),
+            requests_by_model=_labelled(model_counts, model_counts, labels["model"]),
+        )
     
     def get_model_performance(self, model: str) -> dict:
         """Get performance metrics for a specific model"""
-        metrics = [m for m in self._metrics if m.model == model]
+        cols = self._columns
+        code = cols.codes["model"].get(model)
+        totals = cols.totals
+        count = totals["model_counts"][code] if code is not None else 0
         
-        if not metrics:
+        if not count:
             return {"model": model, "error": "No data available"}
         
-        latencies = [m.total_time_ms for m in metrics]
-        successes = sum(1 for m in metrics if m.success)
+        # Everything but p95 comes from the running per-model totals; only the percentile needs rows
+        _, p95, _, _ = _latency_summary(cols.total_ms[cols.model == code])
         
         return {
             "model": model,
-            "total_requests": len(metrics),
-            "success_rate": successes / len(metrics),
-            "avg_latency_ms": statistics.mean(latencies),
-            "p95_latency_ms": statistics.quantiles(latencies, n=20)[18] if len(latencies) >= 20 else max(latencies),
-            "total_cost_usd": sum(m.cost_usd for m in metrics),
-            "avg_tokens": statistics.mean(m.input_tokens + m.output_tokens for m in metrics),
+            "total_requests": count,
+            "success_rate": totals["model_successes"][code] / count,
+            "avg_latency_ms": totals["model_latency"][code] / count,
+            "p95_latency_ms": p95,
+            "total_cost_usd": float(totals["model_cost"][code]),
+            "avg_tokens": totals["model_tokens"][code] / count,
         }
     
     def get_provider_health(self) -> dict[str, dict]:
-        """Get health status for each provider"""
-        # Group by provider
-        by_provider = defaultdict(list)
-        for m in self._metrics:
-            by_provider[m.provider].append(m)
+        """Get health status for each provider (cached for PROVIDER_HEALTH_TTL_S)"""
+        now = time.monotonic()
+        if self._provider_health_cache and now - self._provider_health_cache[0] < self.PROVIDER_HEALTH_TTL_S:
+            return self._provider_health_cache[1]
+        
+        health = self._compute_provider_health()
+        self._provider_health_cache = (now, health)
+        return health
+    
+    def _compute_provider_health(self) -> dict[str, dict]:
+        """Compute health status for each provider from recent metrics"""
+        cols = self._columns
+        labels = cols.labels["provider"]
+        # Providers with retained rows come from the running per-provider counts, not a scan
+        seen = [code for code, count in enumerate(cols.totals["provider_counts"]) if count]
+        
+        now_ns = time.time_ns()
         
         health = {}
-        for provider, metrics in by_provider.items():
-            recent = [m for m in metrics if m.timestamp > datetime.utcnow() - timedelta(minutes=5)]
-            
-            if not recent:
+        for code in seen:
+            provider = labels[code]
+            recent = self._recent.get(provider)
+            count, errors, latency = recent.totals(now_ns) if recent else (0, 0, 0.0)
+            if not count:
                 health[provider] = {
                     "status": "unknown",
                     "recent_requests": 0,
                     "error_rate": 0.0,
                 }
             else:
-                errors = sum(1 for m in recent if not m.success)
-                error_rate = errors / len(recent)
+                error_rate = errors / count
                 
                 health[provider] = {
                     "status": "healthy" if error_rate < 0.1 else "degraded" if error_rate < 0.5 else "unhealthy",
-                    "recent_requests": len(recent),
+                    "recent_requests": count,
                     "error_rate": error_rate,
-                    "avg_latency_ms": statistics.mean(m.total_time_ms for m in recent),
+                    "avg_latency_ms": latency / count,
                 }
         
         return health
@@ -285,55 +729,110 @@ class MetricsCollector:
     @property
     def uptime_seconds(self) -> float:
         """Get service uptime"""
-        return (datetime.utcnow() - self._start_time).total_seconds()
+        return (datetime.now(timezone.utc).replace(tzinfo=None) - self._start_time).total_seconds()
     
     @property
     def total_requests_processed(self) -> int:
         """Get total requests processed"""
         return self._request_count
     
-    def to_cloudwatch_format(self) -> list[dict]:
-        """Export metrics in CloudWatch-compatible format"""
-        agg = self.aggregate()
+    def to_cloudwatch_format(self, agg: Optional[AggregatedMetrics] = None) -> list[dict]:
+        """Export metrics in CloudWatch-compatible format (last hour unless an aggregate is given)"""
+        if agg is None:
+            agg = self.aggregate()
         
-        metrics = [
-            {
-                "MetricName": "RequestCount",
-                "Value": agg.total_requests,
-                "Unit": "Count",
-            },
-            {
-                "MetricName": "SuccessRate",
-                "Value": (agg.successful_requests / agg.total_requests * 100) if agg.total_requests > 0 else 0,
-                "Unit": "Percent",
-            },
-            {
-                "MetricName": "P50Latency",
-                "Value": agg.p50_latency_ms,
-                "Unit": "Milliseconds",
-            },
-            {
-                "MetricName": "P99Latency",
-                "Value": agg.p99_latency_ms,
-                "Unit": "Milliseconds",
-            },
-            {
-                "MetricName": "TotalCost",
-                "Value": agg.total_cost_usd,
-                "Unit": "None",  # USD
-            },
+        return [
+            {"MetricName": name, "Value": getattr(agg, attr), "Unit": unit}
+            for name, attr, unit in self.CLOUDWATCH_METRICS
         ]
-        
-        return metrics
 
 
-# Singleton
-_collector: Optional[MetricsCollector] = None
+class AggregateCache:
+    """
+    Aggregates for the canonical dashboard windows, refreshed in the background
+    Endpoints read the cached result instead of re-scanning metrics per request
+    """
+    
+    WINDOWS = {
+        "1m": timedelta(minutes=1),
+        "1h": timedelta(hours=1),
+        "24h": timedelta(hours=24),
+    }
+    REFRESH_INTERVAL_S = 2.0
+    CLOUDWATCH_NAMESPACE = "LLMOrchestration"
+    
+    def __init__(self, collector: MetricsCollector):
+        self.collector = collector
+        self._cache: dict[str, AggregatedMetrics] = {}
+        self._cloudwatch: Optional[bytes] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def refresh(self):
+        """Recompute every window and the serialized CloudWatch export"""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        self._cache = {
+            key: self.collector.aggregate(start_time=now - window, end_time=now)
+            for key, window in self.WINDOWS.items()
+        }
+        self._cloudwatch = self._serialize_cloudwatch(self._cache["1h"])
+    
+    def invalidate(self):
+        """Drop cached aggregates until the next refresh"""
+        self._cache = {}
+        self._cloudwatch = None
+    
+    def _serialize_cloudwatch(self, agg: AggregatedMetrics) -> bytes:
+        return orjson.dumps({
+            "Namespace": self.CLOUDWATCH_NAMESPACE,
+            "MetricData": self.collector.to_cloudwatch_format(agg),
+        })
+    
+    def get_cloudwatch(self) -> bytes:
+        """Serialized CloudWatch export for the last hour, prebuilt by the refresh loop"""
+        if self._cloudwatch is not None and self._task is not None and not self._task.done():
+            return self._cloudwatch
+        return self._serialize_cloudwatch(self.get("1h"))
+    
+    def get(self, window: str) -> AggregatedMetrics:
+        """Cached aggregate for a window, computed live when no refresh loop is running"""
+        cached = self._cache.get(window)
+        if cached is not None and self._task is not None and not self._task.done():
+            return cached
+        
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return self.collector.aggregate(start_time=now - self.WINDOWS[window], end_time=now)
+    
+    async def _refresh_loop(self):
+        while True:
+            self.refresh()
+            await asyncio.sleep(self.REFRESH_INTERVAL_S)
+    
+    def start(self):
+        """Start the background refresh task (called from the app lifespan)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        """Stop the background refresh task"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.invalidate()
 
 
+# Singleton (functools.cache keeps the accessors on the C fast path)
+@cache
 def get_metrics_collector() -> MetricsCollector:
     """Get or create metrics collector instance"""
-    global _collector
-    if _collector is None:
-        _collector = MetricsCollector()
-    return _collector
\ No newline at end of file
+    return MetricsCollector()
+
+
+@cache
+def get_aggregate_cache() -> AggregateCache:
+    """Get or create the aggregate cache for the shared collector"""
+    return AggregateCache(get_metrics_collector())
\ No newline at end of file
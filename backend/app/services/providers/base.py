@@ -10,7 +10,7 @@ from datetime import datetime
 import time
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderResponse:
     """Standardized response from any provider"""
     
@@ -28,14 +28,21 @@ class ProviderResponse:
     # Provider metadata
     model_used: str
     provider: str
-    raw_response: Optional[dict] = None
+    raw_response: Optional[Any] = None  # Provider's own response object, kept by reference
+    cached: bool = False  # Served from the response cache instead of the provider
     
     @property
     def total_tokens(self) -> int:
         return self.input_tokens + self.output_tokens
+    
+    def raw_response_dict(self) -> Optional[dict]:
+        """Plain-dict copy of the raw response, built on demand"""
+        if self.raw_response is None:
+            return None
+        return dict(self.raw_response)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderHealth:
     """Provider health status"""
     
@@ -5,8 +5,13 @@ Unified provider using LiteLLM for OpenAI, Anthropic, Azure, and Bedrock
 
 import time
 import asyncio
+import hashlib
+import sys
+from collections import OrderedDict
+from functools import cache, lru_cache
+from types import MappingProxyType
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
 from .base import BaseProvider, ProviderResponse, ProviderHealth
 from app.config import get_settings
@@ -20,6 +25,29 @@ except ImportError:
     LITELLM_AVAILABLE = False
 
 
+# Provider detection: explicit route prefix first, then well-known name fragments (in priority order)
+_PROVIDER_PREFIXES = {"azure": "azure", "bedrock": "bedrock", "gemini": "gemini"}
+_PROVIDER_SUBSTRINGS = (
+    ("gemini", "gemini"),
+    ("claude", "anthropic"),
+    ("gpt", "openai"),
+    ("o1", "openai"),
+)
+
+
+@lru_cache(maxsize=128)
+def _detect_provider(model: str) -> str:
+    """Detect which provider a model belongs to (model names form a small set, so memoized)"""
+    model_lower = model.lower()
+    prefix, sep, _ = model_lower.partition("/")
+    if sep and prefix in _PROVIDER_PREFIXES:
+        return _PROVIDER_PREFIXES[prefix]
+    for fragment, provider in _PROVIDER_SUBSTRINGS:
+        if fragment in model_lower:
+            return provider
+    return "unknown"
+
+
 class LiteLLMProvider(BaseProvider):
     """
     Unified LLM provider using LiteLLM
@@ -60,10 +88,17 @@ class LiteLLMProvider(BaseProvider):
         "bedrock/anthropic.claude-3-sonnet": "bedrock/anthropic.claude-3-sonnet-20240229-v1:0",
         "bedrock/meta.llama3-70b-instruct": "bedrock/meta.llama3-70b-instruct-v1:0",
     }
+    # Read-only, with interned names so lookups reuse cached string hashes
+    MODEL_MAPPINGS = MappingProxyType({sys.intern(k): sys.intern(v) for k, v in MODEL_MAPPINGS.items()})
+    
+    TOKEN_CACHE_SIZE = 4096
+    TOKEN_COUNT_MODEL = "gpt-4o"
     
     def __init__(self):
         super().__init__(name="litellm")
         self.settings = get_settings()
+        # LRU of prompt digest -> token count; prompts are keyed by hash so large texts aren't retained
+        self._token_cache: OrderedDict[bytes, int] = OrderedDict()
         self._configure_litellm()
     
     def _configure_litellm(self):
@@ -99,20 +134,7 @@ class LiteLLMProvider(BaseProvider):
     
     def _detect_provider(self, model: str) -> str:
         """Detect which provider a model belongs to"""
-        model_lower = model.lower()
-        
-        if model_lower.startswith("azure/"):
-            return "azure"
-        elif model_lower.startswith("bedrock/"):
-            return "bedrock"
-        elif model_lower.startswith("gemini/") or "gemini" in model_lower:
-            return "gemini"
-        elif "claude" in model_lower:
-            return "anthropic"
-        elif "gpt" in model_lower or "o1" in model_lower:
-            return "openai"
-        else:
-            return "unknown"
+        return _detect_provider(model)
     
     async def generate(
         self,
@@ -121,9 +143,10 @@ class LiteLLMProvider(BaseProvider):
         max_tokens: int = 1024,
         temperature: float = 0.7,
         system_prompt: Optional[str] = None,
+        include_raw: bool = False,
         **kwargs
     ) -> ProviderResponse:
-        """Generate response using LiteLLM"""
+        """Generate response using LiteLLM (include_raw keeps the LiteLLM response object)"""
         
         if not LITELLM_AVAILABLE:
             return ProviderResponse(
@@ -184,7 +207,7 @@ class LiteLLMProvider(BaseProvider):
                 latency_ms=latency_ms,
                 model_used=actual_model,
                 provider=actual_provider,
-                raw_response=dict(response)
+                raw_response=response if include_raw else None,
             )
             
         except Exception as e:
@@ -210,7 +233,7 @@ class LiteLLMProvider(BaseProvider):
                 available=False,
                 latency_ms=None,
                 error="LiteLLM not installed",
-                last_checked=datetime.utcnow(),
+                last_checked=datetime.now(timezone.utc).replace(tzinfo=None),
                 success_rate=0.0
             )
         
@@ -235,7 +258,7 @@ class LiteLLMProvider(BaseProvider):
                 available=True,
                 latency_ms=latency_ms,
                 error=None,
-                last_checked=datetime.utcnow(),
+                last_checked=datetime.now(timezone.utc).replace(tzinfo=None),
                 success_rate=self.success_rate
             )
             
@@ -246,7 +269,7 @@ class LiteLLMProvider(BaseProvider):
                 available=False,
                 latency_ms=latency_ms,
                 error=str(e),
-                last_checked=datetime.utcnow(),
+                last_checked=datetime.now(timezone.utc).replace(tzinfo=None),
                 success_rate=self.success_rate
             )
     
@@ -292,20 +315,27 @@ class LiteLLMProvider(BaseProvider):
             # Rough estimate: 4 chars per token
             return len(text) // 4
         
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        cache = self._token_cache
+        tokens = cache.get(key)
+        if tokens is not None:
+            cache.move_to_end(key)
+            return tokens
+        
         try:
-            return token_counter(model="gpt-4o", text=text)
+            tokens = token_counter(model=self.TOKEN_COUNT_MODEL, text=text)
         except Exception:
             # Fallback to rough estimate
-            return len(text) // 4
-
-
-# Singleton instance
-_litellm_provider: Optional[LiteLLMProvider] = None
+            tokens = len(text) // 4
+        
+        cache[key] = tokens
+        if len(cache) > self.TOKEN_CACHE_SIZE:
+            cache.popitem(last=False)
+        return tokens
 
 
+# Singleton instance (constructed lazily: configuring LiteLLM needs settings)
+@cache
 def get_litellm_provider() -> LiteLLMProvider:
     """Get or create LiteLLM provider instance"""
-    global _litellm_provider
-    if _litellm_provider is None:
-        _litellm_provider = LiteLLMProvider()
-    return _litellm_provider
\ No newline at end of file
+    return LiteLLMProvider()
\ No newline at end of file
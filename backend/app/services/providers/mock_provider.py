@@ -3,68 +3,109 @@ LLM Orchestration Engine - Mock Provider
 Mock provider for testing, demos, and development without API keys
 """
 
+import re
 import time
 import random
 import asyncio
+import hashlib
+from collections import OrderedDict
+from functools import cache
+from string import Template
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
 from .base import BaseProvider, ProviderResponse, ProviderHealth
 
 
+# Word substitutions applied by the mock rewrite task, in a single regex pass
+_REWRITE_SUBS = {
+    "very": "extremely",
+    "good": "excellent",
+    "bad": "suboptimal",
+    "big": "substantial",
+    "small": "minimal",
+}
+_REWRITE_RE = re.compile(r"\b(" + "|".join(_REWRITE_SUBS) + r")\b")
+
+
+def _rewrite_word(match: re.Match) -> str:
+    """Replacement for one _REWRITE_RE match"""
+    return _REWRITE_SUBS[match.group(1)]
+
+
 class MockProvider(BaseProvider):
     """
     Mock LLM provider for testing and demos
     Generates realistic-looking responses without calling external APIs
     """
     
-    # Simulated task responses
+    # Simulated task responses ($-placeholders, so JSON and code braces stay literal)
     MOCK_RESPONSES = {
-        "summarize": [
-            "This text discusses the key points of {topic}. The main takeaway is that there are multiple factors to consider when evaluating this subject. The author presents a balanced view while emphasizing the importance of evidence-based conclusions.",
-            "In summary, the content covers {topic} from several angles. Key insights include the relationship between different elements and their impact on outcomes. The conclusion suggests further analysis may be beneficial.",
-            "The document provides an overview of {topic}, highlighting three main aspects: context, implications, and recommendations. Overall, it presents a comprehensive analysis suitable for decision-making."
-        ],
-        "sentiment": [
+        "summarize": (
+            "This text discusses the key points of $topic. The main takeaway is that there are multiple factors to consider when evaluating this subject. The author presents a balanced view while emphasizing the importance of evidence-based conclusions.",
+            "In summary, the content covers $topic from several angles. Key insights include the relationship between different elements and their impact on outcomes. The conclusion suggests further analysis may be beneficial.",
+            "The document provides an overview of $topic, highlighting three main aspects: context, implications, and recommendations. Overall, it presents a comprehensive analysis suitable for decision-making."
+        ),
+        "sentiment": (
             '{"sentiment": "positive", "confidence": 0.87, "aspects": {"tone": "optimistic", "emotion": "hopeful"}}',
             '{"sentiment": "neutral", "confidence": 0.92, "aspects": {"tone": "informative", "emotion": "calm"}}',
             '{"sentiment": "negative", "confidence": 0.78, "aspects": {"tone": "critical", "emotion": "concerned"}}'
-        ],
-        "rewrite": [
-            "Here is a refined version of the text:\n\n{rewritten}\n\nKey improvements include enhanced clarity, better structure, and more precise language.",
-            "The rewritten content:\n\n{rewritten}\n\nChanges focus on improved readability and professional tone.",
-        ],
-        "chat": [
-            "I understand your question about {topic}. Based on the context, I can provide several insights. First, it's important to consider the underlying factors. Second, there are multiple approaches to address this. Would you like me to elaborate on any specific aspect?",
-            "That's an interesting point about {topic}. Let me share my perspective: the key consideration here is understanding the relationship between cause and effect. There are typically three main factors to consider in situations like this.",
-            "Thank you for bringing up {topic}. This is a nuanced subject with several dimensions to explore. The most relevant points include the context, the stakeholders involved, and the potential outcomes."
-        ],
-        "code": [
+        ),
+        "rewrite": (
+            "Here is a refined version of the text:\n\n$rewritten\n\nKey improvements include enhanced clarity, better structure, and more precise language.",
+            "The rewritten content:\n\n$rewritten\n\nChanges focus on improved readability and professional tone.",
+        ),
+        "chat": (
+            "I understand your question about $topic. Based on the context, I can provide several insights. First, it's important to consider the underlying factors. Second, there are multiple approaches to address this. Would you like me to elaborate on any specific aspect?",
+            "That's an interesting point about $topic. Let me share my perspective: the key consideration here is understanding the relationship between cause and effect. There are typically three main factors to consider in situations like this.",
+            "Thank you for bringing up $topic. This is a nuanced subject with several dimensions to explore. The most relevant points include the context, the stakeholders involved, and the potential outcomes."
+        ),
+        "code": (
             "```python\ndef solution(data):\n    \"\"\"Solves the given problem efficiently.\"\"\"\n    result = []\n    for item in data:\n        processed = process_item(item)\n        result.append(processed)\n    return result\n```\n\nThis solution handles the core requirements with O(n) time complexity.",
             "```python\nclass Handler:\n    def __init__(self):\n        self.cache = {}\n    \n    def process(self, input_data):\n        if input_data in self.cache:\n            return self.cache[input_data]\n        result = self._compute(input_data)\n        self.cache[input_data] = result\n        return result\n```\n\nI've added caching for improved performance.",
-        ],
-        "analysis": [
-            "Analysis Results:\n\n1. **Overview**: The data shows interesting patterns in {topic}.\n\n2. **Key Findings**:\n   - Finding A: Significant correlation observed\n   - Finding B: Trend indicates growth\n   - Finding C: Anomaly detected in subset\n\n3. **Recommendations**: Based on this analysis, I suggest focusing on areas with highest impact potential.",
-            "Executive Summary:\n\nThis analysis examines {topic} across multiple dimensions. The primary conclusion is that current metrics indicate positive trajectory. Areas requiring attention include optimization of resources and alignment with strategic goals."
-        ],
-        "default": [
-            "I've processed your request regarding {topic}. Here are my thoughts:\n\nThe subject matter involves several interconnected elements. Based on the information provided, I can offer the following insights and recommendations for your consideration.",
-            "Thank you for your inquiry about {topic}. After considering the relevant factors, I believe the most important points to address are: context, approach, and expected outcomes. Each of these contributes to a comprehensive understanding."
-        ]
+        ),
+        "analysis": (
+            "Analysis Results:\n\n1. **Overview**: The data shows interesting patterns in $topic.\n\n2. **Key Findings**:\n   - Finding A: Significant correlation observed\n   - Finding B: Trend indicates growth\n   - Finding C: Anomaly detected in subset\n\n3. **Recommendations**: Based on this analysis, I suggest focusing on areas with highest impact potential.",
+            "Executive Summary:\n\nThis analysis examines $topic across multiple dimensions. The primary conclusion is that current metrics indicate positive trajectory. Areas requiring attention include optimization of resources and alignment with strategic goals."
+        ),
+        "default": (
+            "I've processed your request regarding $topic. Here are my thoughts:\n\nThe subject matter involves several interconnected elements. Based on the information provided, I can offer the following insights and recommendations for your consideration.",
+            "Thank you for your inquiry about $topic. After considering the relevant factors, I believe the most important points to address are: context, approach, and expected outcomes. Each of these contributes to a comprehensive understanding."
+        )
     }
     
+    # Templates are parsed once per class, not on every substitution
+    MOCK_TEMPLATES = {
+        task: tuple(Template(text) for text in texts) for task, texts in MOCK_RESPONSES.items()
+    }
+    
+    CONTENT_CACHE_SIZE = 1024
+    
+    # Above this size estimate_tokens counts separators instead of materializing split()
+    LARGE_TEXT_CHARS = 10_000
+    
     def __init__(
         self,
         min_latency_ms: float = 100,
         max_latency_ms: float = 500,
         failure_rate: float = 0.0,  # 0-1, percentage of requests to fail
         tokens_per_word: float = 1.3,  # Approximate tokens per word
+        simulate_latency: bool = True,  # False returns immediately (tests)
     ):
         super().__init__(name="mock")
         self.min_latency_ms = min_latency_ms
         self.max_latency_ms = max_latency_ms
         self.failure_rate = failure_rate
         self.tokens_per_word = tokens_per_word
+        self.simulate_latency = simulate_latency
+        
+        # Per-provider generator; draws are scaled by hand instead of via uniform()/choice()
+        self._random = random.Random().random
+        
+        # Rendered (content, input_tokens, output_tokens) per exact request, LRU-ordered
+        self._content_cache: OrderedDict[tuple, tuple[str, int, int]] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
     
     async def generate(
         self,
@@ -80,12 +121,15 @@ class MockProvider(BaseProvider):
         
         start_time = time.perf_counter()
         
-        # Simulate network latency
-        simulated_latency = random.uniform(self.min_latency_ms, self.max_latency_ms)
-        await asyncio.sleep(simulated_latency / 1000)
+        # Simulate network latency; content is built inside the window, not after it
+        rand = self._random
+        simulated_latency = self.min_latency_ms + (self.max_latency_ms - self.min_latency_ms) * rand()
+        deadline = start_time + simulated_latency / 1000
         
         # Simulate random failures
-        if random.random() < self.failure_rate:
+        if rand() < self.failure_rate:
+            if self.simulate_latency:
+                await asyncio.sleep(simulated_latency / 1000)
             latency_ms = (time.perf_counter() - start_time) * 1000
             self.record_request(success=False, latency_ms=latency_ms)
             
@@ -100,73 +144,98 @@ class MockProvider(BaseProvider):
                 provider="mock"
             )
         
+        # Repeated prompts reuse the rendered content; latency and stats stay per request
+        key = (
+            task_type,
+            model,
+            max_tokens,
+            hashlib.blake2b(prompt.encode(), digest_size=16).digest(),
+            hashlib.blake2b(system_prompt.encode(), digest_size=16).digest() if system_prompt else None,
+        )
+        cache = self._content_cache
+        cached = cache.get(key)
+        if cached is not None:
+            cache.move_to_end(key)
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            cached = self._render(prompt, max_tokens, system_prompt, task_type)
+            cache[key] = cached
+            if len(cache) > self.CONTENT_CACHE_SIZE:
+                cache.popitem(last=False)
+        content, input_tokens, output_tokens = cached
+        
+        if self.simulate_latency:
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+        
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        self.record_request(success=True, latency_ms=latency_ms)
+        
+        return ProviderResponse(
+            success=True,
+            content=content,
+            error=None,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency_ms=latency_ms,
+            model_used=model,
+            provider="mock"
+        )
+    
+    def _render(
+        self,
+        prompt: str,
+        max_tokens: int,
+        system_prompt: Optional[str],
+        task_type: str,
+    ) -> tuple[str, int, int]:
+        """Build mock content and its (input, output) token estimates"""
         # Extract topic from prompt for response personalization
+        # (one split of the prompt also feeds the input token estimate)
         words = prompt.split()
         topic = " ".join(words[:5]) + "..." if len(words) > 5 else prompt
         
         # Select appropriate response template
-        response_templates = self.MOCK_RESPONSES.get(
+        response_templates = self.MOCK_TEMPLATES.get(
             task_type, 
-            self.MOCK_RESPONSES["default"]
+            self.MOCK_TEMPLATES["default"]
         )
-        template = random.choice(response_templates)
+        template = response_templates[int(self._random() * len(response_templates))]
         
-        # Generate response
-        content = template.format(
+        # Generate response; only rewrite templates need the rewritten prompt
+        content = template.safe_substitute(
             topic=topic,
-            rewritten=self._rewrite_text(prompt) if task_type == "rewrite" else ""
+            rewritten=self._rewrite_text(prompt) if "$rewritten" in template.template else ""
         )
         
         # Truncate to max_tokens (approximate)
         content_words = content.split()
+        output_words = len(content_words)
         max_words = int(max_tokens / self.tokens_per_word)
-        if len(content_words) > max_words:
+        if output_words > max_words:
             content = " ".join(content_words[:max_words]) + "..."
+            output_words = max(max_words, 1)  # "..." alone still counts as a word
         
-        # Calculate tokens
-        input_tokens = self.estimate_tokens(prompt)
+        # Calculate tokens from the word counts already in hand
+        input_tokens = self._tokens_from_wordcount(len(words))
         if system_prompt:
             input_tokens += self.estimate_tokens(system_prompt)
-        output_tokens = self.estimate_tokens(content)
-        
-        latency_ms = (time.perf_counter() - start_time) * 1000
-        self.record_request(success=True, latency_ms=latency_ms)
+        output_tokens = self._tokens_from_wordcount(output_words)
         
-        return ProviderResponse(
-            success=True,
-            content=content,
-            error=None,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            latency_ms=latency_ms,
-            model_used=model,
-            provider="mock"
-        )
+        return content, input_tokens, output_tokens
     
     def _rewrite_text(self, text: str) -> str:
         """Simple text rewriting for mock responses"""
-        # Just return a slightly modified version
-        sentences = text.replace(".", ".|").replace("!", "!|").replace("?", "?|").split("|")
-        rewritten = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if sentence:
-                # Simple word substitutions for variety
-                sentence = sentence.replace("very", "extremely")
-                sentence = sentence.replace("good", "excellent")
-                sentence = sentence.replace("bad", "suboptimal")
-                sentence = sentence.replace("big", "substantial")
-                sentence = sentence.replace("small", "minimal")
-                rewritten.append(sentence)
-        return " ".join(rewritten)
+        # Simple word substitutions for variety
+        return _REWRITE_RE.sub(_rewrite_word, text.strip())
     
     async def check_health(self) -> ProviderHealth:
         """Mock health check - always healthy"""
         return ProviderHealth(
             available=True,
-            latency_ms=random.uniform(10, 50),
+            latency_ms=10 + 40 * self._random(),
             error=None,
-            last_checked=datetime.utcnow(),
+            last_checked=datetime.now(timezone.utc).replace(tzinfo=None),
             success_rate=1.0 - self.failure_rate
         )
     
@@ -180,17 +249,19 @@ class MockProvider(BaseProvider):
     
     def estimate_tokens(self, text: str) -> int:
         """Estimate token count based on word count"""
-        word_count = len(text.split())
+        if len(text) > self.LARGE_TEXT_CHARS:
+            # Approximate: separators + 1, no list allocation (runs of whitespace overcount)
+            word_count = text.count(" ") + text.count("\n") + text.count("\t") + 1
+            return self._tokens_from_wordcount(word_count)
+        return self._tokens_from_wordcount(len(text.split()))
+    
+    def _tokens_from_wordcount(self, word_count: int) -> int:
+        """Token estimate for an already-counted number of words"""
         return int(word_count * self.tokens_per_word)
 
 
-# Singleton instance
-_mock_provider: Optional[MockProvider] = None
-
-
+# Singleton instance (functools.cache keeps the accessor on the C fast path)
+@cache
 def get_mock_provider() -> MockProvider:
     """Get or create mock provider instance"""
-    global _mock_provider
-    if _mock_provider is None:
-        _mock_provider = MockProvider()
-    return _mock_provider
\ No newline at end of file
+    return MockProvider()
\ No newline at end of file
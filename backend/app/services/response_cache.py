@@ -0,0 +1,171 @@
+"""
+LLM Orchestration Engine - Response Cache
+Reuses provider responses for near-duplicate requests
+"""
+
+import hashlib
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Hashable, Optional
+
+import numpy as np
+
+from app.models import RoutingDecision
+from app.services.providers import ProviderResponse
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class ExactCache:
+    """
+    Bounded LRU of successful provider responses keyed by a digest of the exact request
+    Entries keep the routing decision they were served under and expire after ttl_s.
+    """
+    
+    def __init__(self, capacity: int = 4096, ttl_s: float = 300.0):
+        self.capacity = capacity
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[bytes, tuple[float, RoutingDecision, ProviderResponse]] = OrderedDict()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(*parts) -> bytes:
+        """Digest of the request fields that determine the response"""
+        return hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+    
+    def get(self, key: bytes) -> Optional[tuple[RoutingDecision, ProviderResponse]]:
+        """Routing decision and cached response for this key, if present and not expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        stored_at, routing, response = entry
+        if time.monotonic() - stored_at > self.ttl_s:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return routing, replace(response, cached=True, latency_ms=0.0)
+    
+    def put(self, key: bytes, routing: RoutingDecision, response: ProviderResponse):
+        """Cache a successful response, evicting the least recently used entry when full"""
+        if not response.success:
+            return
+        
+        self._entries[key] = (time.monotonic(), routing, response)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached response"""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SemanticCache:
+    """
+    Bounded similarity cache of successful provider responses
+    Texts are embedded as L2-normalised hashed bag-of-words vectors; a lookup hits
+    when cosine similarity with an entry in the same bucket reaches the threshold.
+    Buckets separate requests that must not share answers (task, model, prompt, ...).
+    """
+    
+    def __init__(self, capacity: int = 1024, threshold: float = 0.85, dims: int = 512):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.dims = dims
+        
+        self._buckets: dict[Hashable, list[tuple[np.ndarray, ProviderResponse]]] = {}
+        self._matrices: dict[Hashable, np.ndarray] = {}  # stacked bucket vectors, built lazily
+        self._order: OrderedDict[int, Hashable] = OrderedDict()  # entry id -> bucket, LRU-ordered
+        self._ids: dict[Hashable, list[int]] = {}
+        self._next_id = 0
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def embed(self, text: str) -> np.ndarray:
+        """Hashed term-frequency vector for a text (unit length unless empty)"""
+        words = _WORD_RE.findall(text.lower())
+        if not words:
+            return np.zeros(self.dims, dtype=np.float32)
+        
+        index = np.fromiter((zlib.crc32(w.encode()) % self.dims for w in words), dtype=np.intp, count=len(words))
+        vec = np.bincount(index, minlength=self.dims).astype(np.float32)
+        return vec / np.linalg.norm(vec)
+    
+    def lookup(self, bucket: Hashable, vec: np.ndarray) -> Optional[ProviderResponse]:
+        """Most similar cached response in the bucket, if it clears the threshold"""
+        matrix = self._matrix(bucket)
+        if matrix is None:
+            self.misses += 1
+            return None
+        
+        similarities = matrix @ vec
+        best = int(similarities.argmax())
+        if similarities[best] < self.threshold:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self._order.move_to_end(self._ids[bucket][best])
+        return replace(self._buckets[bucket][best][1], cached=True, latency_ms=0.0)
+    
+    def insert(self, bucket: Hashable, vec: np.ndarray, response: ProviderResponse):
+        """Cache a successful response, evicting the least recently used entry when full"""
+        if not response.success or not vec.any():
+            return
+        
+        entry_id = self._next_id
+        self._next_id += 1
+        self._buckets.setdefault(bucket, []).append((vec, response))
+        self._ids.setdefault(bucket, []).append(entry_id)
+        self._order[entry_id] = bucket
+        self._matrices.pop(bucket, None)
+        
+        if len(self._order) > self.capacity:
+            oldest, oldest_bucket = self._order.popitem(last=False)
+            self._remove(oldest_bucket, oldest)
+    
+    def clear(self):
+        """Drop every cached response"""
+        self._buckets.clear()
+        self._matrices.clear()
+        self._order.clear()
+        self._ids.clear()
+    
+    def __len__(self) -> int:
+        return len(self._order)
+    
+    def _matrix(self, bucket: Hashable) -> Optional[np.ndarray]:
+        """Stacked vectors for a bucket (None if empty)"""
+        matrix = self._matrices.get(bucket)
+        if matrix is None:
+            entries = self._buckets.get(bucket)
+            if not entries:
+                return None
+            matrix = self._matrices[bucket] = np.stack([vec for vec, _ in entries])
+        return matrix
+    
+    def _remove(self, bucket: Hashable, entry_id: int):
+        """Remove one entry from its bucket"""
+        ids = self._ids[bucket]
+        position = ids.index(entry_id)
+        del ids[position]
+        del self._buckets[bucket][position]
+        self._matrices.pop(bucket, None)
+        if not ids:
+            del self._ids[bucket]
+            del self._buckets[bucket]
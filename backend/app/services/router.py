@@ -3,15 +3,20 @@ LLM Orchestration Engine - Intelligent Model Router
 The brain of the system: selects optimal model based on task, preferences, and metrics
 """
 
+import asyncio
+import heapq
+import logging
 import time
+from operator import attrgetter
+from functools import cache, lru_cache
 from typing import Optional
 from dataclasses import dataclass
 from datetime import datetime
 
 from app.config import (
     get_settings,
-    MODEL_PRICING,
     MODEL_CAPABILITIES,
+    MODEL_TABLE,
 )
 from app.models import (
     TaskType,
@@ -24,9 +29,39 @@ from app.services.providers import (
     get_mock_provider,
     ProviderResponse,
 )
+from app.services.cost_calculator import get_cost_calculator
+from app.services.response_cache import ExactCache, SemanticCache
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+# Focus named in routing reasons; other preferences get the fixed balanced reason
+_REASON_FOCUS = {
+    "fast": "speed",
+    "cheap": "cost",
+    "best": "quality",
+}
+
+
+@lru_cache(maxsize=64)
+def _reason_prefix(preference: str, task: str) -> str:
+    """Fixed part of a routing reason for a (preference, task) pair"""
+    focus = _REASON_FOCUS.get(preference)
+    if focus is None:
+        return f"Selected for {task} with balanced optimization across cost, speed, and quality"
+    return f"Selected for {task} with focus on {focus}. Model offers "
+
+
+@dataclass(slots=True)
+class ModelStats:
+    """Running request totals for one model"""
+    total_requests: int = 0
+    successful_requests: int = 0
+    total_latency_ms: float = 0.0
+    total_cost_usd: float = 0.0
+
+
+@dataclass(slots=True)
 class ModelScore:
     """Scoring breakdown for a model"""
     model: str
@@ -39,6 +74,9 @@ class ModelScore:
     reason: str
 
 
+_final_score_of = attrgetter("final_score")
+
+
 class ModelRouter:
     """
     Intelligent model router that selects the optimal model based on:
@@ -89,17 +127,119 @@ class ModelRouter:
         TaskType.CUSTOM: ["gpt-4o", "claude-3-5-sonnet-20241022", "gemini/gemini-1.5-pro"],
     }
     
+    # Default system prompts per task type
+    DEFAULT_SYSTEM_PROMPTS = {
+        TaskType.SUMMARIZE: "You are a skilled summarizer. Provide clear, concise summaries that capture the key points.",
+        TaskType.SENTIMENT: "You are a sentiment analyzer. Analyze the sentiment and return a JSON object with 'sentiment' (positive/negative/neutral), 'confidence' (0-1), and 'aspects' dict.",
+        TaskType.REWRITE: "You are a professional editor. Rewrite the given text to improve clarity, flow, and professionalism while preserving the original meaning.",
+        TaskType.TOOLS: "You are an AI assistant with tool-use capabilities. Analyze requests and determine appropriate actions.",
+        TaskType.CODE: "You are an expert programmer. Provide clean, efficient, well-documented code solutions.",
+        TaskType.ANALYSIS: "You are a data analyst. Provide thorough, insightful analysis with clear structure and actionable conclusions.",
+        TaskType.CHAT: "You are a helpful AI assistant. Provide clear, accurate, and helpful responses.",
+        TaskType.CUSTOM: "You are a versatile AI assistant. Complete the requested task effectively.",
+    }
+    
+    # Provider configuration only changes on reload, so the model list is reused this long
+    AVAILABLE_MODELS_TTL_S = 30.0
+    # Rankings for identical scoring inputs are reused this long (bounds provider-health staleness)
+    SCORE_CACHE_TTL_S = 1.0
+    SCORE_CACHE_SIZE = 1024
+    # Best model plus alternatives kept per ranking
+    TOP_K = 5
+    # Provider health is re-derived from recorded request outcomes this often
+    HEALTH_REFRESH_INTERVAL_S = 10.0
+    # Requests a provider needs since the last update before its availability score moves
+    HEALTH_MIN_REQUESTS = 5
+    # Availability of providers without recorded outcomes
+    DEFAULT_AVAILABILITY = 0.95
+    # Lowest derived availability; keeps a failing provider in the candidate set
+    HEALTH_FLOOR = 0.05
+    # Share of the gap to DEFAULT_AVAILABILITY recovered per refresh without new requests
+    HEALTH_RECOVERY_RATE = 0.25
+    
     def __init__(self):
         self.settings = get_settings()
         self.litellm_provider = get_litellm_provider()
         self.mock_provider = get_mock_provider()
+        self.cost_calculator = get_cost_calculator()
         
         # Dynamic metrics storage (in production, this would be from DynamoDB)
-        self._model_metrics: dict[str, dict] = {}
+        self._model_metrics: dict[str, ModelStats] = {}
         self._provider_health: dict[str, float] = {}  # availability scores
+        self._health_seen: dict[str, tuple[int, int]] = {}  # (requests, successes) at last update
+        self._health_task: Optional[asyncio.Task] = None
+        self._available_models_cache: Optional[tuple[float, tuple[str, ...]]] = None
+        self._score_cache: dict[tuple, tuple[float, list[ModelScore]]] = {}
+        
+        # Identical-request response reuse (opt-in via ENABLE_EXACT_CACHE)
+        self.exact_cache: Optional[ExactCache] = None
+        if self.settings.enable_exact_cache:
+            self.exact_cache = ExactCache(
+                capacity=self.settings.exact_cache_size,
+                ttl_s=self.settings.exact_cache_ttl_s,
+            )
+        
+        # Near-duplicate response reuse (opt-in via ENABLE_SEMANTIC_CACHE)
+        self.semantic_cache: Optional[SemanticCache] = None
+        if self.settings.enable_semantic_cache:
+            self.semantic_cache = SemanticCache(
+                capacity=self.settings.semantic_cache_size,
+                threshold=self.settings.semantic_cache_threshold,
+            )
+        
+        # Provider configuration is fixed per settings instance: map each known model to its
+        # provider if configured, None if not (models without a provider are left out)
+        self._configured_provider: dict[str, Optional[str]] = {
+            model: provider if self.settings.provider_flags & flags else None
+            for model, provider, flags in zip(
+                MODEL_TABLE.names, MODEL_TABLE.providers, MODEL_TABLE.provider_flags
+            )
+            if provider is not None
+        }
+        
+        self._unconfigured_models = frozenset(
+            model for model, provider in self._configured_provider.items() if provider is None
+        )
+        
+        # Preference weights as (cost, latency, quality, availability) tuples
+        self._weights = {
+            preference: (w["cost"], w["latency"], w["quality"], w["availability"])
+            for preference, w in self.PREFERENCE_WEIGHTS.items()
+        }
+        
+        # Quality boost by position in each task's preference list
+        self._task_boost = {
+            task: {
+                model: (len(preferred) - position) / len(preferred) * 0.1
+                for position, model in enumerate(preferred)
+            }
+            for task, preferred in self.TASK_MODEL_PREFERENCES.items()
+        }
+        
+        # Latency and task-quality scores only depend on static model data and settings,
+        # so score every known model once instead of per request
+        self._latency_scores = {
+            model: self._calculate_latency_score(model) for model in MODEL_TABLE.names
+        }
+        self._quality_scores = {
+            (task, model): self._calculate_quality_score(model, task)
+            for task in TaskType
+            for model in MODEL_TABLE.names
+        }
+    
+    def get_available_models(self) -> tuple[str, ...]:
+        """Get currently available models (cached for AVAILABLE_MODELS_TTL_S; do not mutate)"""
+        now = time.monotonic()
+        cached = self._available_models_cache
+        if cached and now - cached[0] < self.AVAILABLE_MODELS_TTL_S:
+            return cached[1]
+        
+        models = self._collect_available_models()
+        self._available_models_cache = (now, models)
+        return models
     
-    def get_available_models(self) -> list[str]:
-        """Get list of currently available models"""
+    def _collect_available_models(self) -> tuple[str, ...]:
+        """Query providers for the deduplicated set of available models"""
         available = []
         
         # Get models from LiteLLM provider
@@ -112,19 +252,28 @@ class ModelRouter:
         # Mock always available for testing
         available.append("mock/default")
         
-        return list(set(available))
+        # Drop models whose provider isn't configured so they are never scored
+        unconfigured = self._unconfigured_models
+        return tuple(model for model in set(available) if model not in unconfigured)
     
-    def _calculate_cost_score(self, model: str, estimated_tokens: int) -> float:
+    def _calculate_cost_score(
+        self,
+        model: str,
+        estimated_tokens: int,
+        i: Optional[int] = None,
+    ) -> float:
         """
         Calculate cost efficiency score (0-1, higher is better/cheaper)
+        Pass the MODEL_TABLE row as i when the caller has already looked it up
         """
-        pricing = MODEL_PRICING.get(model)
-        if not pricing:
+        if i is None:
+            i = MODEL_TABLE.index.get(model)
+        if i is None or MODEL_TABLE.input_cost[i] is None:
             return 0.5  # Unknown pricing, neutral score
         
         # Estimate cost
-        input_cost = (estimated_tokens * 0.7) * pricing["input"] / 1000  # Assume 70% input
-        output_cost = (estimated_tokens * 0.3) * pricing["output"] / 1000  # Assume 30% output
+        input_cost = (estimated_tokens * 0.7) * MODEL_TABLE.input_cost[i] / 1000  # Assume 70% input
+        output_cost = (estimated_tokens * 0.3) * MODEL_TABLE.output_cost[i] / 1000  # Assume 30% output
         total_cost = input_cost + output_cost
         
         # Score: cheaper = higher score
@@ -142,11 +291,11 @@ class ModelRouter:
         """
         Calculate latency score (0-1, higher is better/faster)
         """
-        capabilities = MODEL_CAPABILITIES.get(model)
-        if not capabilities:
+        i = MODEL_TABLE.index.get(model)
+        if i is None or MODEL_TABLE.avg_latency_ms[i] is None:
             return 0.5  # Unknown latency, neutral score
         
-        avg_latency = capabilities.get("avg_latency_ms", 1000)
+        avg_latency = MODEL_TABLE.avg_latency_ms[i]
         
         # Score: faster = higher score
         # Under 500ms = 1.0, over 3000ms = 0.0
@@ -161,23 +310,20 @@ class ModelRouter:
         """
         Calculate quality score for specific task (0-1, higher is better)
         """
-        capabilities = MODEL_CAPABILITIES.get(model)
-        if not capabilities:
+        i = MODEL_TABLE.index.get(model)
+        if i is None or MODEL_TABLE.quality_score[i] is None:
             return 0.5
         
         # Check if model supports the task
-        supported_tasks = capabilities.get("tasks", [])
-        if task.value not in supported_tasks:
+        if not (MODEL_TABLE.task_mask.get(task.value, 0) >> i) & 1:
             return 0.1  # Penalize models that don't support the task
         
         # Base quality score
-        base_quality = capabilities.get("quality_score", 0.5)
+        base_quality = MODEL_TABLE.quality_score[i]
         
         # Boost score if model is preferred for this task
-        preferred_models = self.TASK_MODEL_PREFERENCES.get(task, [])
-        if model in preferred_models:
-            position = preferred_models.index(model)
-            boost = (len(preferred_models) - position) / len(preferred_models) * 0.1
+        boost = self._task_boost.get(task, {}).get(model)
+        if boost is not None:
             base_quality = min(1.0, base_quality + boost)
         
         return base_quality
@@ -186,23 +332,16 @@ class ModelRouter:
         """
         Calculate availability score based on provider health
         """
-        capabilities = MODEL_CAPABILITIES.get(model)
-        if not capabilities:
+        if model not in self._configured_provider:
             return 0.5
         
-        provider = capabilities.get("provider", "unknown")
-        
-        # Check if provider is configured
-        available_providers = self.settings.available_providers
-        if provider not in available_providers:
+        # Check if provider is configured (resolved once at init)
+        provider = self._configured_provider[model]
+        if provider is None:
             return 0.0  # Not available
         
-        # Get historical availability (from dynamic metrics)
-        if provider in self._provider_health:
-            return self._provider_health[provider]
-        
-        # Default to high availability for configured providers
-        return 0.95
+        # Historical availability (from dynamic metrics), else high for configured providers
+        return self._provider_health.get(provider, self.DEFAULT_AVAILABILITY)
     
     def score_model(
         self,
@@ -213,32 +352,39 @@ class ModelRouter:
         """
         Calculate comprehensive score for a model
         """
-        cost_score = self._calculate_cost_score(model, estimated_tokens)
-        latency_score = self._calculate_latency_score(model)
-        quality_score = self._calculate_quality_score(model, request.task)
+        # One table lookup per model, shared by the cost score, constraints and provider
+        i = MODEL_TABLE.index.get(model)
+        
+        cost_score = self._calculate_cost_score(model, estimated_tokens, i)
+        latency_score = self._latency_scores.get(model)
+        if latency_score is None:
+            latency_score = self._calculate_latency_score(model)
+        quality_score = self._quality_scores.get((request.task, model))
+        if quality_score is None:
+            quality_score = self._calculate_quality_score(model, request.task)
         availability_score = self._calculate_availability_score(model)
         
         # Get weights for user preference
-        weights = self.PREFERENCE_WEIGHTS[request.model_preference]
+        w_cost, w_latency, w_quality, w_availability = self._weights[request.model_preference]
         
         # Calculate weighted final score
         final_score = (
-            weights["cost"] * cost_score +
-            weights["latency"] * latency_score +
-            weights["quality"] * quality_score +
-            weights["availability"] * availability_score
+            w_cost * cost_score +
+            w_latency * latency_score +
+            w_quality * quality_score +
+            w_availability * availability_score
         )
         
         # Apply user constraints
         if request.max_cost_usd is not None:
-            pricing = MODEL_PRICING.get(model, {})
-            est_cost = (estimated_tokens * (pricing.get("input", 0) + pricing.get("output", 0))) / 1000
+            input_price = (MODEL_TABLE.input_cost[i] if i is not None else None) or 0
+            output_price = (MODEL_TABLE.output_cost[i] if i is not None else None) or 0
+            est_cost = (estimated_tokens * (input_price + output_price)) / 1000
             if est_cost > request.max_cost_usd:
                 final_score *= 0.1  # Heavy penalty for exceeding cost
         
         if request.max_latency_ms is not None:
-            capabilities = MODEL_CAPABILITIES.get(model, {})
-            avg_latency = capabilities.get("avg_latency_ms", 1000)
+            avg_latency = (MODEL_TABLE.avg_latency_ms[i] if i is not None else None) or 1000
             if avg_latency > request.max_latency_ms:
                 final_score *= 0.5  # Penalty for exceeding latency
         
@@ -247,8 +393,7 @@ class ModelRouter:
             model, request, cost_score, latency_score, quality_score
         )
         
-        capabilities = MODEL_CAPABILITIES.get(model, {})
-        provider = capabilities.get("provider", "unknown")
+        provider = (MODEL_TABLE.providers[i] if i is not None else None) or "unknown"
         
         return ModelScore(
             model=model,
@@ -271,7 +416,9 @@ class ModelRouter:
     ) -> str:
         """Generate human-readable routing reason"""
         preference = request.model_preference.value
-        task = request.task.value
+        prefix = _reason_prefix(preference, request.task.value)
+        if preference not in _REASON_FOCUS:
+            return prefix
         
         # Find the dominant factor
         scores = [
@@ -281,14 +428,7 @@ class ModelRouter:
         ]
         best_factor = max(scores, key=lambda x: x[1])
         
-        if preference == "fast":
-            return f"Selected for {task} with focus on speed. Model offers {best_factor[0]} (score: {best_factor[1]:.2f})"
-        elif preference == "cheap":
-            return f"Selected for {task} with focus on cost. Model offers {best_factor[0]} (score: {best_factor[1]:.2f})"
-        elif preference == "best":
-            return f"Selected for {task} with focus on quality. Model offers {best_factor[0]} (score: {best_factor[1]:.2f})"
-        else:
-            return f"Selected for {task} with balanced optimization across cost, speed, and quality"
+        return f"{prefix}{best_factor[0]} (score: {best_factor[1]:.2f})"
     
     async def select_model(
         self,
@@ -316,21 +456,8 @@ class ModelRouter:
                 final_score=0.5,
             )
         
-        # Estimate tokens for scoring
-        estimated_tokens = len(request.text.split()) * 1.3  # Rough estimate
-        
-        # Get available models
-        available_models = self.get_available_models()
-        
-        # Score each model
-        model_scores: list[ModelScore] = []
-        for model in available_models:
-            score = self.score_model(model, request, int(estimated_tokens))
-            if score.availability_score > 0:  # Only consider available models
-                model_scores.append(score)
-        
-        # Sort by final score (descending)
-        model_scores.sort(key=lambda x: x.final_score, reverse=True)
+        shortlist = self._candidate_shortlist(request)
+        model_scores = await self._final_score(request, shortlist)
         
         # Select best model
         if not model_scores:
@@ -355,7 +482,7 @@ class ModelRouter:
             selected_model=best.model,
             provider=best.provider,
             reason=best.reason,
-            alternatives_considered=[s.model for s in model_scores[1:5]],  # Top 4 alternatives
+            alternatives_considered=[s.model for s in model_scores[1:self.TOP_K]],  # Top 4 alternatives
             routing_time_ms=routing_time_ms,
             cost_score=best.cost_score,
             latency_score=best.latency_score,
@@ -366,6 +493,69 @@ class ModelRouter:
         
         return best.model, routing_decision
     
+    def _candidate_shortlist(self, request: GenerateRequest) -> tuple[str, ...]:
+        """Cheap pre-routing step: the models eligible for scoring"""
+        return self.get_available_models()
+    
+    async def _final_score(
+        self,
+        request: GenerateRequest,
+        shortlist: tuple[str, ...],
+    ) -> list[ModelScore]:
+        """Score the shortlist and return the top available models best-first (treat as read-only)"""
+        # Estimate tokens for scoring
+        estimated_tokens = len(request.text) >> 2  # Rough estimate: ~4 chars per token
+        
+        # Requests with identical scoring inputs share one ranking for SCORE_CACHE_TTL_S
+        key = (
+            request.task,
+            request.model_preference,
+            estimated_tokens,
+            request.max_cost_usd,
+            request.max_latency_ms,
+            shortlist,
+        )
+        now = time.monotonic()
+        cached = self._score_cache.get(key)
+        if cached is not None and now - cached[0] < self.SCORE_CACHE_TTL_S:
+            return cached[1]
+        
+        # Score each model
+        model_scores: list[ModelScore] = []
+        for model in shortlist:
+            score = self.score_model(model, request, estimated_tokens)
+            if score.availability_score > 0:  # Only consider available models
+                model_scores.append(score)
+        
+        # Only the best model and 4 alternatives are used: partial sort by final score
+        model_scores = heapq.nlargest(self.TOP_K, model_scores, key=_final_score_of)
+        
+        if len(self._score_cache) >= self.SCORE_CACHE_SIZE:
+            self._score_cache.clear()
+        self._score_cache[key] = (now, model_scores)
+        return model_scores
+    
+    @staticmethod
+    def _exact_key(request: GenerateRequest) -> bytes:
+        """Exact-cache key over every request field that affects routing or the response"""
+        return ExactCache.key(
+            request.text, request.task.value, request.model_preference.value,
+            request.model_override, request.max_tokens, request.temperature,
+            request.system_prompt, request.max_cost_usd, request.max_latency_ms, request.hedge,
+        )
+    
+    def lookup_exact(
+        self,
+        request: GenerateRequest,
+    ) -> Optional[tuple[RoutingDecision, ProviderResponse]]:
+        """
+        Routing decision and response of an identical recent request, if cached
+        Checked before select_model, so a hit skips scoring as well as inference
+        """
+        if self.exact_cache is None:
+            return None
+        return self.exact_cache.get(self._exact_key(request))
+    
     async def execute_request(
         self,
         request: GenerateRequest,
@@ -379,13 +569,51 @@ class ModelRouter:
         # Get task-specific system prompt
         system_prompt = request.system_prompt or self._get_default_system_prompt(request.task)
         
+        # Near-duplicate prompts for the same task/model/settings reuse a cached answer
+        cache = self.semantic_cache
+        if cache is not None:
+            bucket = (request.task, model, request.max_tokens, request.temperature, system_prompt)
+            vec = cache.embed(request.text)
+            cached = cache.lookup(bucket, vec)
+            if cached is not None:
+                return cached
+        
+        alternatives = routing_decision.alternatives_considered
+        if request.hedge and request.model_preference == ModelPreference.FAST and alternatives:
+            # Latency-first: race the top two models (up to double the token spend; a loser that
+            # completes is costed by _first_success, a cancelled one may be billed unseen)
+            response = await self._first_success(request, [model, alternatives[0]], system_prompt)
+            fallbacks = alternatives[1:2]
+        else:
+            response = await self._call_provider(request, model, system_prompt)
+            fallbacks = alternatives[:2]
+        
+        # Handle fallback if failed
+        if not response.success and fallbacks:
+            self._record_discarded(response)
+            response = await self._first_success(request, fallbacks, system_prompt)
+        
+        if self.exact_cache is not None:
+            self.exact_cache.put(self._exact_key(request), routing_decision, response)
+        if cache is not None:
+            cache.insert(bucket, vec, response)
+        
+        return response
+    
+    async def _call_provider(
+        self,
+        request: GenerateRequest,
+        model: str,
+        system_prompt: str,
+    ) -> ProviderResponse:
+        """Send the request to the provider serving this model"""
         # Determine provider
         capabilities = MODEL_CAPABILITIES.get(model, {})
         provider_name = capabilities.get("provider", "mock")
         
         # Execute based on provider
         if provider_name == "mock":
-            response = await self.mock_provider.generate(
+            return await self.mock_provider.generate(
                 prompt=request.text,
                 model=model,
                 max_tokens=request.max_tokens or 1024,
@@ -393,83 +621,153 @@ class ModelRouter:
                 system_prompt=system_prompt,
                 task_type=request.task.value,
             )
-        else:
-            response = await self.litellm_provider.generate(
-                prompt=request.text,
-                model=model,
-                max_tokens=request.max_tokens or 1024,
-                temperature=request.temperature or 0.7,
-                system_prompt=system_prompt,
-            )
-        
-        # Handle fallback if failed
-        if not response.success and routing_decision.alternatives_considered:
-            for fallback_model in routing_decision.alternatives_considered[:2]:
-                fallback_caps = MODEL_CAPABILITIES.get(fallback_model, {})
-                fallback_provider = fallback_caps.get("provider", "mock")
-                
-                if fallback_provider == "mock":
-                    response = await self.mock_provider.generate(
-                        prompt=request.text,
-                        model=fallback_model,
-                        max_tokens=request.max_tokens or 1024,
-                        temperature=request.temperature or 0.7,
-                        system_prompt=system_prompt,
-                        task_type=request.task.value,
-                    )
-                else:
-                    response = await self.litellm_provider.generate(
-                        prompt=request.text,
-                        model=fallback_model,
-                        max_tokens=request.max_tokens or 1024,
-                        temperature=request.temperature or 0.7,
-                        system_prompt=system_prompt,
-                    )
-                
-                if response.success:
-                    break
-        
-        return response
+        return await self.litellm_provider.generate(
+            prompt=request.text,
+            model=model,
+            max_tokens=request.max_tokens or 1024,
+            temperature=request.temperature or 0.7,
+            system_prompt=system_prompt,
+        )
+    
+    async def _first_success(
+        self,
+        request: GenerateRequest,
+        models: list[str],
+        system_prompt: str,
+    ) -> ProviderResponse:
+        """
+        Call the models concurrently and return the first success, cancelling the rest
+        If all fail, returns the last model's failure (as sequential retries would).
+        Every other completed call is recorded via _record_discarded; calls still in
+        flight are cancelled, but the provider may bill them anyway and that is not seen here.
+        """
+        tasks = {
+            asyncio.create_task(self._call_provider(request, model, system_prompt)): model
+            for model in models
+        }
+        responses: dict[str, ProviderResponse] = {}
+        winner: Optional[ProviderResponse] = None
+        pending = set(tasks)
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    response = responses[tasks[task]] = task.result()
+                    if winner is None and response.success:
+                        winner = response
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if winner is None:
+            winner = responses[models[-1]]
+        for response in responses.values():
+            if response is not winner:
+                self._record_discarded(response)
+        return winner
+    
+    def _record_discarded(self, response: ProviderResponse):
+        """Record spend and outcome of a completed provider call that is not returned"""
+        cost_usd = self.cost_calculator.total_cost(
+            response.model_used, response.input_tokens, response.output_tokens
+        )
+        if cost_usd:
+            self.cost_calculator.record_cost(response.model_used, response.provider, cost_usd)
+        self.update_metrics(response.model_used, response.success, response.latency_ms, cost_usd)
     
     def _get_default_system_prompt(self, task: TaskType) -> str:
         """Get default system prompt for task type"""
-        prompts = {
-            TaskType.SUMMARIZE: "You are a skilled summarizer. Provide clear, concise summaries that capture the key points.",
-            TaskType.SENTIMENT: "You are a sentiment analyzer. Analyze the sentiment and return a JSON object with 'sentiment' (positive/negative/neutral), 'confidence' (0-1), and 'aspects' dict.",
-            TaskType.REWRITE: "You are a professional editor. Rewrite the given text to improve clarity, flow, and professionalism while preserving the original meaning.",
-            TaskType.TOOLS: "You are an AI assistant with tool-use capabilities. Analyze requests and determine appropriate actions.",
-            TaskType.CODE: "You are an expert programmer. Provide clean, efficient, well-documented code solutions.",
-            TaskType.ANALYSIS: "You are a data analyst. Provide thorough, insightful analysis with clear structure and actionable conclusions.",
-            TaskType.CHAT: "You are a helpful AI assistant. Provide clear, accurate, and helpful responses.",
-            TaskType.CUSTOM: "You are a versatile AI assistant. Complete the requested task effectively.",
-        }
+        prompts = self.DEFAULT_SYSTEM_PROMPTS
         return prompts.get(task, prompts[TaskType.CHAT])
     
     def update_metrics(self, model: str, success: bool, latency_ms: float, cost_usd: float):
         """Update dynamic metrics for model selection improvement"""
-        if model not in self._model_metrics:
-            self._model_metrics[model] = {
-                "total_requests": 0,
-                "successful_requests": 0,
-                "total_latency_ms": 0,
-                "total_cost_usd": 0,
-            }
+        stats = self._model_metrics.get(model)
+        if stats is None:
+            stats = self._model_metrics[model] = ModelStats()
         
-        metrics = self._model_metrics[model]
-        metrics["total_requests"] += 1
-        metrics["total_latency_ms"] += latency_ms
-        metrics["total_cost_usd"] += cost_usd
+        stats.total_requests += 1
+        stats.total_latency_ms += latency_ms
+        stats.total_cost_usd += cost_usd
         if success:
-            metrics["successful_requests"] += 1
-
-
-# Singleton instance
-_router: Optional[ModelRouter] = None
+            stats.successful_requests += 1
+    
+    def refresh_provider_health(self):
+        """
+        Derive each provider's availability score from its recorded success rate
+        Only requests since the provider's last update count, so outages show up quickly;
+        providers with fewer than HEALTH_MIN_REQUESTS new requests keep their prior score.
+        Providers with no new requests at all drift back toward DEFAULT_AVAILABILITY, so one
+        that routing moved away from after an outage is eventually tried again.
+        No provider calls are made (health checks against paid APIs spend tokens).
+        """
+        totals: dict[str, list[int]] = {}
+        for model, stats in self._model_metrics.items():
+            provider = self._configured_provider.get(model)
+            if provider is None:
+                continue
+            counts = totals.setdefault(provider, [0, 0])
+            counts[0] += stats.total_requests
+            counts[1] += stats.successful_requests
+        
+        health = dict(self._provider_health)
+        for provider, score in self._provider_health.items():
+            requests = totals[provider][0] if provider in totals else 0
+            if requests != self._health_seen.get(provider, (0, 0))[0]:
+                continue
+            score += (self.DEFAULT_AVAILABILITY - score) * self.HEALTH_RECOVERY_RATE
+            if self.DEFAULT_AVAILABILITY - score < 0.01:
+                del health[provider]  # recovered; back to the default
+            else:
+                health[provider] = score
+        
+        for provider, (requests, successes) in totals.items():
+            seen_requests, seen_successes = self._health_seen.get(provider, (0, 0))
+            new_requests = requests - seen_requests
+            if new_requests < self.HEALTH_MIN_REQUESTS:
+                continue
+            rate = (successes - seen_successes) / new_requests
+            health[provider] = max(rate, self.HEALTH_FLOOR)
+            self._health_seen[provider] = (requests, successes)
+        
+        if health != self._provider_health:
+            self._provider_health = health
+            self._score_cache.clear()  # rankings embed the previous health scores
+    
+    async def _health_loop(self):
+        while True:
+            try:
+                self.refresh_provider_health()
+            except Exception as e:
+                logger.warning(f"Provider health refresh failed: {e}")
+            await asyncio.sleep(self.HEALTH_REFRESH_INTERVAL_S)
+    
+    def start_health_monitor(self):
+        """Start the background provider health refresh (called from the app lifespan)"""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def stop_health_monitor(self):
+        """Stop the background provider health refresh"""
+        if self._health_task is None:
+            return
+        self._health_task.cancel()
+        try:
+            await self._health_task
+        except asyncio.CancelledError:
+            pass
+        self._health_task = None
+    
+    def reset_metrics(self):
+        """Clear dynamic model metrics and provider health"""
+        self._model_metrics = {}
+        self._provider_health = {}
+        self._health_seen = {}
+        self._score_cache.clear()
 
 
+# Singleton instance (functools.cache keeps the accessor on the C fast path)
+@cache
 def get_router() -> ModelRouter:
     """Get or create router instance"""
-    global _router
-    if _router is None:
-        _router = ModelRouter()
-    return _router
\ No newline at end of file
+    return ModelRouter()
\ No newline at end of file
@@ -3,6 +3,8 @@ LLM Orchestration Engine - AWS Lambda Handler
 Uses Mangum to adapt FastAPI for Lambda + API Gateway
 """
 
+import asyncio
+
 from mangum import Mangum
 
 from app.main import app
@@ -11,6 +13,22 @@ from app.main import app
 # Create Lambda handler
 handler = Mangum(app, lifespan="off")
 
+# One event loop per container, reused across warm invocations (Mangum picks it up too)
+_LOOP = asyncio.new_event_loop()
+asyncio.set_event_loop(_LOOP)
+
+
+async def _run_async_generate(request):
+    """Route and execute a generation request in a single loop entry"""
+    from app.services import get_router
+    
+    router = get_router()
+    hit = router.lookup_exact(request)
+    if hit is not None:
+        return hit[1]
+    model, decision = await router.select_model(request)
+    return await router.execute_request(request, model, decision)
+
 
 # Optional: Add Lambda-specific warmup handling
 def lambda_handler(event, context):
@@ -23,6 +41,10 @@ def lambda_handler(event, context):
     - Direct Lambda invocations
     """
     
+    # HTTP traffic dominates: API Gateway REST (v1) and HTTP API (v2) events go straight to Mangum
+    if "requestContext" in event or "httpMethod" in event:
+        return handler(event, context)
+    
     # Handle warmup events (CloudWatch scheduled)
     if event.get("source") == "aws.events" or event.get("detail-type") == "Scheduled Event":
         return {
@@ -33,20 +55,13 @@ def lambda_handler(event, context):
     # Handle direct invocations for async processing
     if event.get("type") == "async_generate":
         # Process async generation request
-        from app.services import get_router
         from app.models import GenerateRequest
-        import asyncio
         
         request_data = event.get("request", {})
         request = GenerateRequest(**request_data)
         
-        router = get_router()
         # Run async code in Lambda
-        loop = asyncio.get_event_loop()
-        model, decision = loop.run_until_complete(router.select_model(request))
-        response = loop.run_until_complete(
-            router.execute_request(request, model, decision)
-        )
+        response = _LOOP.run_until_complete(_run_async_generate(request))
         
         return {
             "success": response.success,
@@ -54,5 +69,5 @@ def lambda_handler(event, context):
             "model": response.model_used,
         }
     
-    # Default: Handle HTTP requests via Mangum
+    # Default: anything else Mangum understands (ALB, Lambda function URLs, ...)
     return handler(event, context)
\ No newline at end of file
@@ -3,7 +3,12 @@ LLM Orchestration Engine - API Tests
 FastAPI endpoint testing
 """
 
+import asyncio
+
+import httpx
+import orjson
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from datetime import datetime
 
@@ -11,24 +16,63 @@ import sys
 sys.path.insert(0, './backend')
 
 from app.main import app
+from app.db import local_storage
+from app.services import get_router
+from app.services.response_cache import ExactCache
+from app.routers import generate as generate_module
+
+from test_core import _metric
 
 
 # ============================================
 # Fixtures
 # ============================================
 
-@pytest.fixture
+def _json(response) -> dict:
+    """Parse a response body with orjson"""
+    return orjson.loads(response.content)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _in_memory_storage():
+    """Point the storage singleton at an in-memory store so test runs leave no files behind"""
+    previous = local_storage._local_storage
+    local_storage._local_storage = local_storage.LocalStorage(in_memory=True)
+    yield local_storage._local_storage
+    local_storage._local_storage = previous
+
+
+@pytest.fixture(scope="session")
 def client():
     """Create test client"""
     return TestClient(app)
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client():
+    """In-process async client sharing one event loop across the session"""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
 def auth_headers():
     """Headers with valid API key"""
     return {"X-API-Key": "dev-key-123"}
 
 
+@pytest.fixture(scope="session")
+def json_auth_headers(auth_headers):
+    """Valid API key plus an explicit JSON content type"""
+    return {**auth_headers, "Content-Type": "application/json"}
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session", autouse=True)
+async def _warmup(async_client, auth_headers):
+    """Serve one discarded request so lazily built state isn't timed by the first test"""
+    await async_client.post("/api/v1/generate", headers=auth_headers, json={"text": "warm"})
+
+
 # ============================================
 # Health Endpoint Tests
 # ============================================
@@ -88,6 +132,13 @@ class TestRootEndpoint:
         assert data["name"] == "LLM Orchestration Engine"
         assert "version" in data
         assert "api" in data
+    
+    def test_root_hides_disabled_docs(self, client, monkeypatch):
+        """Test the root endpoint only advertises /docs when docs are mounted"""
+        assert client.get("/").json()["docs"] == app.docs_url
+        
+        monkeypatch.setattr(app, "docs_url", None)
+        assert "docs" not in client.get("/").json()
 
 
 # ============================================
@@ -241,6 +292,18 @@ class TestGenerateEndpoint:
         assert "total_time_ms" in perf
         assert "routing_time_ms" in perf
         assert "inference_time_ms" in perf
+    
+    def test_timestamp_format(self, client, auth_headers):
+        """Test /generate uses the same naive UTC ISO timestamps as /health and /metrics"""
+        timestamps = [
+            client.post("/api/v1/generate", headers=auth_headers, json={"text": "Test text"}).json()["timestamp"],
+            client.get("/health").json()["timestamp"],
+            client.get("/api/v1/metrics/providers", headers=auth_headers).json()["timestamp"],
+        ]
+        
+        for timestamp in timestamps:
+            assert not timestamp.endswith("Z")
+            assert datetime.fromisoformat(timestamp).tzinfo is None
 
 
 # ============================================
@@ -279,6 +342,16 @@ class TestModelsEndpoint:
         assert "provider" in model
         assert "tasks" in model
         assert "pricing" in model
+    
+    def test_models_follow_available_set(self, client, auth_headers, monkeypatch):
+        """Test the cached /models body is rebuilt when the available models change"""
+        before = client.get("/api/v1/models", headers=auth_headers).json()
+        
+        monkeypatch.setattr(get_router(), "get_available_models", lambda: ("mock/default",))
+        after = client.get("/api/v1/models", headers=auth_headers).json()
+        
+        assert before["total"] > 1
+        assert after["total"] == 1 and after["models"][0]["model"] == "mock/default"
 
 
 # ============================================
@@ -312,80 +385,91 @@ class TestEstimateEndpoint:
 # Metrics Endpoint Tests
 # ============================================
 
+METRIC_ENDPOINTS = [
+    ("/api/v1/metrics/summary", {"time_range", "requests", "latency_ms", "costs"}),
+    ("/api/v1/metrics/providers", {"providers"}),
+    ("/api/v1/metrics/costs", {"total_cost_usd"}),
+    ("/api/v1/metrics/logs", {"logs", "total"}),
+    ("/api/v1/metrics/realtime", {"last_minute", "last_hour"}),
+]
+
+
 class TestMetricsEndpoints:
     """Tests for metrics endpoints"""
     
-    def test_metrics_summary(self, client, auth_headers):
-        """Test metrics summary"""
-        response = client.get(
-            "/api/v1/metrics/summary",
-            headers=auth_headers
-        )
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+    
+    @pytest.mark.parametrize("path, required_keys", METRIC_ENDPOINTS)
+    async def test_metrics_endpoint(self, async_client, auth_headers, path, required_keys):
+        """Test each metrics endpoint responds with its top-level fields"""
+        response = await async_client.get(path, headers=auth_headers)
         
         assert response.status_code == 200
-        data = response.json()
-        
-        assert "time_range" in data
-        assert "requests" in data
-        assert "latency_ms" in data
-        assert "costs" in data
+        assert required_keys <= _json(response).keys()
     
-    def test_metrics_summary_with_hours(self, client, auth_headers):
+    async def test_metrics_summary_with_hours(self, async_client, auth_headers):
         """Test metrics summary with custom hours"""
-        response = client.get(
+        response = await async_client.get(
             "/api/v1/metrics/summary?hours=48",
             headers=auth_headers
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["time_range"]["hours"] == 48
     
-    def test_provider_health(self, client, auth_headers):
-        """Test provider health endpoint"""
-        response = client.get(
-            "/api/v1/metrics/providers",
+    async def test_request_logs_success_only(self, async_client, auth_headers):
+        """Test streamed logs honour limit and success_only filtering"""
+        response = await async_client.get(
+            "/api/v1/metrics/logs",
+            params={"limit": 5, "success_only": True},
             headers=auth_headers
         )
         
         assert response.status_code == 200
-        data = response.json()
-        assert "providers" in data
+        data = _json(response)
+        assert data["total"] == len(data["logs"]) <= 5
+        assert all(log["success"] for log in data["logs"])
     
-    def test_cost_analysis(self, client, auth_headers):
-        """Test cost analysis endpoint"""
-        response = client.get(
-            "/api/v1/metrics/costs",
+    async def test_export_cloudwatch(self, async_client, auth_headers):
+        """Test CloudWatch export payload"""
+        response = await async_client.get(
+            "/api/v1/metrics/export",
+            params={"format": "cloudwatch"},
             headers=auth_headers
         )
         
         assert response.status_code == 200
-        data = response.json()
-        assert "total_cost_usd" in data
+        data = _json(response)
+        assert data["Namespace"] == "LLMOrchestration"
+        assert {m["MetricName"] for m in data["MetricData"]} >= {"RequestCount", "TotalCost"}
     
-    def test_request_logs(self, client, auth_headers):
-        """Test request logs endpoint"""
-        response = client.get(
-            "/api/v1/metrics/logs",
-            headers=auth_headers
+    async def test_read_endpoints_concurrently(self, async_client, auth_headers):
+        """Test independent metrics reads served concurrently on one loop"""
+        responses = await asyncio.gather(
+            *(async_client.get(path, headers=auth_headers) for path, _ in METRIC_ENDPOINTS)
         )
         
-        assert response.status_code == 200
-        data = response.json()
-        assert "logs" in data
-        assert "total" in data
+        assert [r.status_code for r in responses] == [200] * len(METRIC_ENDPOINTS)
     
-    def test_realtime_stats(self, client, auth_headers):
-        """Test realtime stats endpoint"""
-        response = client.get(
-            "/api/v1/metrics/realtime",
-            headers=auth_headers
-        )
+    async def test_clear_drops_caches_and_queued_logs(self, async_client, auth_headers, monkeypatch):
+        """Test clearing also empties the response caches and the pending log queue"""
+        model_router = get_router()
+        monkeypatch.setattr(model_router, "exact_cache", ExactCache())
+        body = {"text": "Cache me before the clear"}
+        await async_client.post("/api/v1/generate", headers=auth_headers, json=body)
+        queued = await async_client.post("/api/v1/generate", headers=auth_headers, json=body)
+        assert _json(queued)["cached"] is True
+        
+        # Bookkeeping waiting for the flusher must not be written back after the clear
+        generate_module._log_queue.put_nowait(_metric(request_id="queued"))
+        
+        response = await async_client.delete("/api/v1/metrics/clear", headers=auth_headers)
         
         assert response.status_code == 200
-        data = response.json()
-        assert "last_minute" in data
-        assert "last_hour" in data
+        assert len(model_router.exact_cache) == 0
+        assert generate_module._log_queue.empty()
+        assert local_storage.get_local_storage().get_logs(limit=10) == []
 
 
 # ============================================
@@ -395,9 +479,11 @@ class TestMetricsEndpoints:
 class TestErrorHandling:
     """Tests for error handling"""
     
-    def test_invalid_api_key(self, client):
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+    
+    async def test_invalid_api_key(self, async_client):
         """Test invalid API key returns 403"""
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/generate",
             headers={"X-API-Key": "invalid-key"},
             json={"text": "Test"}
@@ -407,19 +493,28 @@ class TestErrorHandling:
         # In dev mode, might pass through
         assert response.status_code in [200, 403]
     
-    def test_invalid_json(self, client, auth_headers):
+    async def test_metrics_invalid_api_key(self, async_client):
+        """Test metrics endpoints reject an invalid API key with 401"""
+        response = await async_client.get(
+            "/api/v1/metrics/summary",
+            headers={"X-API-Key": "invalid-key"}
+        )
+        
+        assert response.status_code == 401
+    
+    async def test_invalid_json(self, async_client, json_auth_headers):
         """Test invalid JSON returns 422"""
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/generate",
-            headers={**auth_headers, "Content-Type": "application/json"},
+            headers=json_auth_headers,
             content="invalid json"
         )
         
         assert response.status_code == 422
     
-    def test_missing_required_field(self, client, auth_headers):
+    async def test_missing_required_field(self, async_client, auth_headers):
         """Test missing required field returns 422"""
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/generate",
             headers=auth_headers,
             json={}  # Missing 'text' field
@@ -427,9 +522,9 @@ class TestErrorHandling:
         
         assert response.status_code == 422
     
-    def test_invalid_task_type(self, client, auth_headers):
+    async def test_invalid_task_type(self, async_client, auth_headers):
         """Test invalid task type returns 422"""
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/generate",
             headers=auth_headers,
             json={
@@ -448,9 +543,11 @@ class TestErrorHandling:
 class TestPerformance:
     """Basic performance tests"""
     
-    def test_response_time_header(self, client, auth_headers):
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+    
+    async def test_response_time_header(self, async_client, auth_headers):
         """Test response includes timing header"""
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/generate",
             headers=auth_headers,
             json={"text": "Quick test"}
@@ -0,0 +1,50 @@
+"""
+LLM Orchestration Engine - Benchmarks
+Performance regression tests for hot paths (requires pytest-benchmark)
+"""
+
+import pytest
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+# Import app components
+import sys
+sys.path.insert(0, './backend')
+
+from app.services.metrics_collector import MetricsCollector
+
+from test_core import _metric
+
+pytest.importorskip("pytest_benchmark")
+
+
+# ============================================
+# Metrics Benchmarks
+# ============================================
+
+class TestMetricsBenchmarks:
+    """Benchmarks for metrics aggregation"""
+    
+    # Generous bound: full-window aggregation reads running totals, so this only trips on rescans
+    AGGREGATE_MEAN_LIMIT_S = 0.05
+    
+    def test_aggregate_perf(self, benchmark):
+        """Benchmark aggregate() over 10k retained metrics"""
+        collector = MetricsCollector(retention_hours=1)
+        now = datetime.utcnow()
+        template = _metric(timestamp=now, request_id="", task="summarize", total_time_ms=0)
+        collector.record_many([
+            replace(
+                template,
+                timestamp=now - timedelta(milliseconds=10_000 - i),
+                request_id=f"bench-{i}",
+                total_time_ms=100 + i % 400,
+                success=i % 20 != 0,
+            )
+            for i in range(10_000)
+        ])
+        
+        result = benchmark(collector.aggregate)
+        
+        assert result.total_requests == 10_000
+        assert benchmark.stats.stats.mean < self.AGGREGATE_MEAN_LIMIT_S
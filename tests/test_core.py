@@ -5,8 +5,10 @@ Comprehensive tests for all components
 
 import pytest
 import asyncio
-from datetime import datetime
-from unittest.mock import AsyncMock, patch, MagicMock
+import json
+import numpy as np
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 
 # Import app components
 import sys
@@ -18,22 +20,54 @@ from app.models import (
     ModelPreference,
     GenerateRequest,
     GenerateResponse,
+    RoutingDecision,
 )
 from app.services.providers.base import ProviderResponse
 from app.services.providers.mock_provider import MockProvider, get_mock_provider
 from app.services.cost_calculator import CostCalculator, get_cost_calculator
-from app.services.metrics_collector import MetricsCollector, RequestMetric
+from app.services.metrics_collector import (
+    MetricsCollector, RequestMetric, AggregateCache, _aggregate_numpy, _aggregate_loop,
+)
+from app.services.response_cache import ExactCache, SemanticCache
+from app.services.router import ModelRouter, get_router
 from app.db.local_storage import LocalStorage
+from app.routers.generate import _write_logs
 
 
 # ============================================
 # Fixtures
 # ============================================
 
+def _metric(**overrides) -> RequestMetric:
+    """Successful gpt-4o request metric recorded now, with any fields overridden"""
+    fields = dict(
+        timestamp=datetime.now(timezone.utc).replace(tzinfo=None),
+        request_id="test",
+        model="gpt-4o",
+        provider="openai",
+        task="chat",
+        preference="balanced",
+        total_time_ms=500,
+        routing_time_ms=10,
+        inference_time_ms=480,
+        input_tokens=100,
+        output_tokens=50,
+        cost_usd=0.001,
+        success=True,
+        cached=False,
+        fallback_used=False,
+    )
+    fields.update(overrides)
+    return RequestMetric(**fields)
+
+
+# Providers, calculators and collectors keep per-instance counters the tests assert on,
+# so only the immutable sample request is shared across the session
+
 @pytest.fixture
 def mock_provider():
     """Create a mock provider instance"""
-    return MockProvider(min_latency_ms=10, max_latency_ms=50, failure_rate=0.0)
+    return MockProvider(min_latency_ms=0, max_latency_ms=0, failure_rate=0.0, simulate_latency=False)
 
 
 @pytest.fixture
@@ -49,13 +83,12 @@ def metrics_collector():
 
 
 @pytest.fixture
-def local_storage(tmp_path):
-    """Create a temporary local storage instance"""
-    storage_path = tmp_path / "test_storage.json"
-    return LocalStorage(str(storage_path))
+def local_storage():
+    """Create a memory-only local storage instance"""
+    return LocalStorage(":memory:", in_memory=True)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_request():
     """Create a sample generate request"""
     return GenerateRequest(
@@ -120,13 +153,26 @@ class TestMockProvider:
     @pytest.mark.asyncio
     async def test_generate_with_task_type(self, mock_provider):
         """Test generation with different task types"""
-        for task in ["summarize", "sentiment", "chat", "code"]:
-            response = await mock_provider.generate(
-                prompt="Test prompt",
-                model="mock/default",
-                task_type=task,
-            )
-            assert response.success is True
+        tasks = ["summarize", "sentiment", "chat", "code"]
+        responses = await asyncio.gather(*(
+            mock_provider.generate(prompt="Test prompt", model="mock/default", task_type=task)
+            for task in tasks
+        ))
+        assert all(response.success for response in responses)
+    
+    @pytest.mark.asyncio
+    async def test_content_cache(self, mock_provider):
+        """Test repeated prompts reuse rendered content"""
+        first = await mock_provider.generate(prompt="Cache me", model="mock/default", task_type="chat")
+        second = await mock_provider.generate(prompt="Cache me", model="mock/default", task_type="chat")
+        
+        assert second.content == first.content
+        assert second.output_tokens == first.output_tokens
+        assert mock_provider.cache_hits == 1
+        assert mock_provider.cache_misses == 1
+        
+        await mock_provider.generate(prompt="Cache me", model="mock/default", task_type="summarize")
+        assert mock_provider.cache_misses == 2
     
     @pytest.mark.asyncio
     async def test_health_check(self, mock_provider):
@@ -152,10 +198,18 @@ class TestMockProvider:
         assert tokens > 0
         assert tokens < len(text)  # Tokens should be fewer than characters
     
+    def test_token_estimation_large_text(self, mock_provider):
+        """Test large texts use the separator-count estimate"""
+        text = "one two three\n" * 1000
+        assert len(text) > mock_provider.LARGE_TEXT_CHARS
+        
+        exact = int(len(text.split()) * mock_provider.tokens_per_word)
+        assert abs(mock_provider.estimate_tokens(text) - exact) <= 2
+    
     @pytest.mark.asyncio
     async def test_failure_simulation(self):
         """Test failure rate simulation"""
-        failing_provider = MockProvider(failure_rate=1.0)  # 100% failure
+        failing_provider = MockProvider(failure_rate=1.0, simulate_latency=False)  # 100% failure
         
         response = await failing_provider.generate(
             prompt="Test",
@@ -195,6 +249,12 @@ class TestCostCalculator:
         
         assert estimated >= 0
     
+    def test_total_cost_matches_breakdown(self, cost_calculator):
+        """Test specialized total matches the full breakdown"""
+        for model in ["gpt-4o", "gpt-4o-mini", "unknown-model"]:
+            breakdown = cost_calculator.calculate_cost(model, 1234, 567)
+            assert cost_calculator.total_cost(model, 1234, 567) == breakdown.total_cost_usd
+    
     def test_get_cheapest_model(self, cost_calculator):
         """Test finding cheapest model"""
         models = ["gpt-4o", "gpt-4o-mini", "claude-3-5-sonnet-20241022"]
@@ -229,6 +289,270 @@ class TestCostCalculator:
         assert comparisons[0]["total_cost"] <= comparisons[1]["total_cost"]
 
 
+# ============================================
+# Response Cache Tests
+# ============================================
+
+def _response(content: str) -> ProviderResponse:
+    """Successful mock provider response with the given content"""
+    return ProviderResponse(
+        success=True, content=content, error=None, input_tokens=5, output_tokens=5,
+        latency_ms=120.0, model_used="mock/default", provider="mock",
+    )
+
+
+def _routing() -> RoutingDecision:
+    """Routing decision for the mock model"""
+    return RoutingDecision(
+        selected_model="mock/default", provider="mock", reason="test",
+        alternatives_considered=[], routing_time_ms=1.0, cost_score=1.0,
+        latency_score=1.0, quality_score=0.5, availability_score=1.0, final_score=0.7,
+    )
+
+
+class TestExactCache:
+    """Tests for the exact-match response cache"""
+    
+    def test_hit_and_eviction(self):
+        """Test identical keys hit and the cache stays bounded"""
+        cache = ExactCache(capacity=2)
+        routing = _routing()
+        response = _response("answer")
+        first = ExactCache.key("text", "chat", "mock/default", None)
+        
+        assert cache.get(first) is None
+        cache.put(first, routing, response)
+        hit_routing, hit = cache.get(first)
+        assert hit_routing is routing
+        assert hit.content == "answer" and hit.cached is True
+        assert cache.get(ExactCache.key("text", "code", "mock/default", None)) is None
+        
+        cache.put(ExactCache.key("b"), routing, response)
+        cache.put(ExactCache.key("c"), routing, response)
+        assert len(cache) == 2
+        assert cache.get(first) is None
+    
+    def test_ttl_expiry(self):
+        """Test entries older than the TTL miss and are dropped"""
+        cache = ExactCache(ttl_s=60.0)
+        key = ExactCache.key("text")
+        cache.put(key, _routing(), _response("answer"))
+        assert cache.get(key) is not None
+        
+        cache.ttl_s = -1.0
+        assert cache.get(key) is None
+        assert len(cache) == 0
+
+
+class TestSemanticCache:
+    """Tests for the semantic response cache"""
+    
+    def test_near_duplicate_hit(self):
+        """Test near-duplicate text in the same bucket hits"""
+        cache = SemanticCache(threshold=0.85)
+        bucket = ("chat", "mock/default")
+        text = "Explain how the model router picks the cheapest available model for a task"
+        cache.insert(bucket, cache.embed(text), _response("answer"))
+        
+        hit = cache.lookup(bucket, cache.embed(text + "?"))
+        assert hit is not None
+        assert hit.content == "answer"
+        assert hit.cached is True
+        
+        assert cache.lookup(("code", "mock/default"), cache.embed(text)) is None
+        assert cache.lookup(bucket, cache.embed("Write a haiku about autumn leaves")) is None
+        assert (cache.hits, cache.misses) == (1, 2)
+    
+    def test_lru_eviction(self):
+        """Test the cache stays within capacity"""
+        cache = SemanticCache(capacity=2)
+        for i, text in enumerate(["alpha beta", "gamma delta", "epsilon zeta"]):
+            cache.insert("b", cache.embed(text), _response(str(i)))
+        
+        assert len(cache) == 2
+        assert cache.lookup("b", cache.embed("alpha beta")) is None
+        assert cache.lookup("b", cache.embed("epsilon zeta")).content == "2"
+
+
+# ============================================
+# Model Router Tests
+# ============================================
+
+class TestModelRouter:
+    """Tests for the model router"""
+    
+    def test_provider_health_from_outcomes(self):
+        """Test availability scores follow recorded success rates per provider"""
+        router = ModelRouter()
+        
+        for _ in range(router.HEALTH_MIN_REQUESTS - 1):
+            router.update_metrics("mock/default", False, 100, 0.0)
+        router.refresh_provider_health()
+        assert router._calculate_availability_score("mock/default") == 0.95
+        
+        router.update_metrics("mock/default", True, 100, 0.0)
+        router.refresh_provider_health()
+        expected = 1 / router.HEALTH_MIN_REQUESTS
+        assert router._calculate_availability_score("mock/default") == expected
+        
+        # Other providers are untouched, and too few new requests keep the prior score
+        assert "anthropic" not in router._provider_health
+        router.update_metrics("mock/default", True, 100, 0.0)
+        router.refresh_provider_health()
+        assert router._calculate_availability_score("mock/default") == expected
+    
+    def test_cache_hits_skip_router_stats(self):
+        """Test cached responses are logged but not counted as provider outcomes"""
+        router = get_router()
+        router.reset_metrics()
+        metrics = [
+            _metric(
+                request_id=f"cached-{cached}",
+                model="mock/default",
+                provider="mock",
+                total_time_ms=10,
+                routing_time_ms=1,
+                inference_time_ms=5,
+                input_tokens=10,
+                output_tokens=10,
+                cost_usd=0.0,
+                cached=cached,
+            )
+            for cached in (True, False)
+        ]
+        _write_logs(LocalStorage(in_memory=True), metrics)
+        
+        assert router._model_metrics["mock/default"].total_requests == 1
+        router.reset_metrics()
+    
+    def test_failed_provider_recovers(self):
+        """Test a provider that failed every request stays routable and drifts back without traffic"""
+        router = ModelRouter()
+        for _ in range(router.HEALTH_MIN_REQUESTS):
+            router.update_metrics("mock/default", False, 100, 0.0)
+        router.refresh_provider_health()
+        assert router._calculate_availability_score("mock/default") == router.HEALTH_FLOOR
+        
+        scores = []
+        for _ in range(20):
+            router.refresh_provider_health()
+            scores.append(router._calculate_availability_score("mock/default"))
+        assert scores == sorted(scores)
+        assert scores[-1] == router.DEFAULT_AVAILABILITY
+        assert "mock" not in router._provider_health
+    
+    @pytest.mark.asyncio
+    async def test_exact_cache_skips_routing(self):
+        """Test an identical request is answered with the cached routing decision"""
+        router = ModelRouter()
+        router.exact_cache = ExactCache()
+        request = GenerateRequest(task=TaskType.CHAT, text="Hello there", model_override="mock/default")
+        
+        assert router.lookup_exact(request) is None
+        model, decision = await router.select_model(request)
+        response = await router.execute_request(request, model, decision)
+        
+        routing, cached = router.lookup_exact(request)
+        assert routing is decision
+        assert cached.cached is True and cached.content == response.content
+        assert router.lookup_exact(request.model_copy(update={"temperature": 0.1})) is None
+    
+    @staticmethod
+    def _scripted_router(outcomes: dict[str, tuple[bool, float]]) -> tuple[ModelRouter, list[str]]:
+        """
+        Router whose provider calls succeed or fail per model after a delay, each spending tokens
+        Also returns the list of models whose calls were cancelled before finishing
+        """
+        router = ModelRouter()
+        router.cost_calculator = CostCalculator()
+        cancelled: list[str] = []
+        
+        async def call_provider(request, model, system_prompt):
+            success, delay_s = outcomes[model]
+            try:
+                await asyncio.sleep(delay_s)
+            except asyncio.CancelledError:
+                cancelled.append(model)
+                raise
+            return ProviderResponse(
+                success=success, content=model, error=None, input_tokens=100,
+                output_tokens=50, latency_ms=delay_s * 1000, model_used=model, provider="openai",
+            )
+        
+        router._call_provider = call_provider
+        return router, cancelled
+    
+    @pytest.mark.asyncio
+    async def test_fallback_records_discarded_spend(self):
+        """Test failed attempts before a successful fallback are still costed"""
+        router, _ = self._scripted_router({"gpt-4o": (False, 0.0), "gpt-4o-mini": (True, 0.0)})
+        decision = _routing().model_copy(update={"alternatives_considered": ["gpt-4o-mini"]})
+        
+        response = await router.execute_request(GenerateRequest(task=TaskType.CHAT, text="Hi"), "gpt-4o", decision)
+        
+        assert response.model_used == "gpt-4o-mini"
+        # The returned response is costed by the caller; only the failed primary is recorded here
+        cost_by_model = router.cost_calculator.get_cost_summary()["cost_by_model"]
+        assert set(cost_by_model) == {"gpt-4o"}
+        stats = router._model_metrics["gpt-4o"]
+        assert (stats.total_requests, stats.successful_requests) == (1, 0)
+    
+    @pytest.mark.asyncio
+    async def test_fallback_race_cancels_slow_alternate(self):
+        """Test concurrent fallbacks return the fast success and cancel the slow call"""
+        router, cancelled = self._scripted_router({
+            "gpt-4o": (False, 0.0),
+            "claude-3-5-sonnet-20241022": (True, 5.0),
+            "gpt-4o-mini": (True, 0.01),
+        })
+        decision = _routing().model_copy(update={
+            "alternatives_considered": ["claude-3-5-sonnet-20241022", "gpt-4o-mini", "gpt-4o"],
+        })
+        
+        response = await router.execute_request(GenerateRequest(task=TaskType.CHAT, text="Hi"), "gpt-4o", decision)
+        await asyncio.sleep(0)  # let the cancelled call unwind
+        
+        assert response.model_used == "gpt-4o-mini"
+        assert cancelled == ["claude-3-5-sonnet-20241022"]
+        # Only the failed primary completed without being returned; the cancelled call is unseen
+        cost_by_model = router.cost_calculator.get_cost_summary()["cost_by_model"]
+        assert cost_by_model == {"gpt-4o": router.cost_calculator.total_cost("gpt-4o", 100, 50)}
+        assert "claude-3-5-sonnet-20241022" not in router._model_metrics
+    
+    @staticmethod
+    def _hedged_request() -> GenerateRequest:
+        return GenerateRequest(
+            task=TaskType.CHAT, model_preference=ModelPreference.FAST, text="Hi", hedge=True
+        )
+    
+    @pytest.mark.asyncio
+    async def test_hedge_returns_faster_model(self):
+        """Test a hedged race returns the faster model and cancels the slower call"""
+        router, cancelled = self._scripted_router({"gpt-4o": (True, 5.0), "gpt-4o-mini": (True, 0.01)})
+        decision = _routing().model_copy(update={"alternatives_considered": ["gpt-4o-mini"]})
+        
+        response = await router.execute_request(self._hedged_request(), "gpt-4o", decision)
+        await asyncio.sleep(0)  # let the cancelled call unwind
+        
+        assert response.model_used == "gpt-4o-mini"
+        assert cancelled == ["gpt-4o"]
+        assert router.cost_calculator.get_cost_summary()["cost_by_model"] == {}
+    
+    @pytest.mark.asyncio
+    async def test_hedge_records_losing_spend(self):
+        """Test a hedged race costs a losing call that completed"""
+        router, cancelled = self._scripted_router({"gpt-4o": (False, 0.01), "gpt-4o-mini": (True, 0.05)})
+        decision = _routing().model_copy(update={"alternatives_considered": ["gpt-4o-mini"]})
+        
+        response = await router.execute_request(self._hedged_request(), "gpt-4o", decision)
+        
+        # The primary lost by failing first; its spend is recorded, the returned winner's is not
+        assert response.model_used == "gpt-4o-mini"
+        assert cancelled == []
+        cost_by_model = router.cost_calculator.get_cost_summary()["cost_by_model"]
+        assert cost_by_model == {"gpt-4o": router.cost_calculator.total_cost("gpt-4o", 100, 50)}
+
+
 # ============================================
 # Metrics Collector Tests
 # ============================================
@@ -238,23 +562,7 @@ class TestMetricsCollector:
     
     def test_record_metric(self, metrics_collector):
         """Test recording a metric"""
-        metric = RequestMetric(
-            timestamp=datetime.utcnow(),
-            request_id="test-123",
-            model="gpt-4o",
-            provider="openai",
-            task="summarize",
-            preference="balanced",
-            total_time_ms=500,
-            routing_time_ms=10,
-            inference_time_ms=480,
-            input_tokens=100,
-            output_tokens=50,
-            cost_usd=0.001,
-            success=True,
-            cached=False,
-            fallback_used=False,
-        )
+        metric = _metric(request_id="test-123", task="summarize")
         
         metrics_collector.record(metric)
         
@@ -262,26 +570,18 @@ class TestMetricsCollector:
     
     def test_aggregate_metrics(self, metrics_collector):
         """Test metrics aggregation"""
-        # Record multiple metrics
-        for i in range(10):
-            metric = RequestMetric(
-                timestamp=datetime.utcnow(),
+        # Record multiple metrics in one batch, varying a shared template
+        template = _metric(request_id="", task="summarize", total_time_ms=0)
+        metrics_collector.record_many([
+            replace(
+                template,
                 request_id=f"test-{i}",
-                model="gpt-4o",
-                provider="openai",
-                task="summarize",
-                preference="balanced",
                 total_time_ms=500 + i * 10,
-                routing_time_ms=10,
-                inference_time_ms=480,
-                input_tokens=100,
-                output_tokens=50,
-                cost_usd=0.001,
                 success=i < 9,  # 1 failure
                 cached=i == 5,  # 1 cached
-                fallback_used=False,
             )
-            metrics_collector.record(metric)
+            for i in range(10)
+        ])
         
         agg = metrics_collector.aggregate()
         
@@ -294,13 +594,12 @@ class TestMetricsCollector:
     def test_model_performance(self, metrics_collector):
         """Test getting model-specific performance"""
         # Record metrics for specific model
+        now = datetime.utcnow()
         for i in range(5):
-            metric = RequestMetric(
-                timestamp=datetime.utcnow(),
+            metric = _metric(
+                timestamp=now,
                 request_id=f"test-{i}",
                 model="gpt-4o-mini",
-                provider="openai",
-                task="chat",
                 preference="fast",
                 total_time_ms=300,
                 routing_time_ms=5,
@@ -308,9 +607,6 @@ class TestMetricsCollector:
                 input_tokens=50,
                 output_tokens=100,
                 cost_usd=0.0001,
-                success=True,
-                cached=False,
-                fallback_used=False,
             )
             metrics_collector.record(metric)
         
@@ -319,6 +615,163 @@ class TestMetricsCollector:
         assert perf["total_requests"] == 5
         assert perf["success_rate"] == 1.0
         assert perf["avg_latency_ms"] == 300
+    
+    def test_aggregate_window_and_breakdowns(self, metrics_collector):
+        """Test windowed aggregation over out-of-order records"""
+        now = datetime.utcnow()
+        for i, minutes_ago in enumerate([5, 45, 1, 30]):
+            metric = _metric(
+                timestamp=now - timedelta(minutes=minutes_ago),
+                request_id=f"window-{i}",
+                model="gpt-4o" if i % 2 else "claude-3-5-haiku",
+                provider="openai" if i % 2 else "anthropic",
+                total_time_ms=100 * (i + 1),
+                routing_time_ms=5,
+                inference_time_ms=90,
+                input_tokens=10,
+                output_tokens=20,
+                cost_usd=0.25,
+            )
+            metrics_collector.record(metric)
+        
+        agg = metrics_collector.aggregate(start_time=now - timedelta(minutes=40), end_time=now)
+        
+        assert agg.total_requests == 3
+        assert agg.p50_latency_ms == 300
+        assert agg.average_latency_ms == 800 / 3
+        assert agg.total_tokens == 90
+        assert agg.cost_by_model == {"claude-3-5-haiku": 0.5, "gpt-4o": 0.25}
+        assert agg.requests_by_model == {"claude-3-5-haiku": 2, "gpt-4o": 1}
+        
+        recorded = metrics_collector.get_metrics(model="gpt-4o")
+        assert [m.request_id for m in recorded] == ["window-1", "window-3"]
+    
+    def test_running_totals_follow_retention(self, metrics_collector):
+        """Test running totals drop expired rows and match a full scan"""
+        now = datetime.utcnow()
+        for i, minutes_ago in enumerate([2, 120, 1, 3]):
+            metric = _metric(
+                timestamp=now - timedelta(minutes=minutes_ago),
+                request_id=f"totals-{i}",
+                model="gpt-4o" if i % 2 else "gpt-4o-mini",
+                preference="fast",
+                total_time_ms=200,
+                routing_time_ms=5,
+                inference_time_ms=190,
+                input_tokens=10,
+                output_tokens=10,
+                cost_usd=0.5,
+                success=i != 3,
+            )
+            metrics_collector.record(metric)
+        
+        # Covers every retained row, so this is served from the running totals
+        agg = metrics_collector.aggregate(start_time=now - timedelta(hours=2), end_time=now)
+        
+        assert agg.total_requests == 3
+        assert agg.failed_requests == 1
+        assert agg.total_tokens == 60
+        assert agg.cost_by_model == {"gpt-4o-mini": 1.0, "gpt-4o": 0.5}
+        assert agg.requests_by_task == {"chat": 3}
+    
+    def test_aware_timestamps(self, metrics_collector):
+        """Test timezone-aware datetimes are accepted and left untouched"""
+        now = datetime.now(timezone.utc)
+        metric = _metric(
+            timestamp=now - timedelta(minutes=1),
+            request_id="aware-0",
+            model="gpt-4o-mini",
+            preference="fast",
+            total_time_ms=200,
+            routing_time_ms=5,
+            inference_time_ms=190,
+            input_tokens=10,
+            output_tokens=10,
+            cost_usd=0.5,
+        )
+        metrics_collector.record(metric)
+        
+        assert metric.timestamp.tzinfo is timezone.utc
+        assert metric.to_log_dict()["timestamp"].tzinfo is None
+        
+        agg = metrics_collector.aggregate(start_time=now - timedelta(minutes=5), end_time=now)
+        assert agg.total_requests == 1
+        
+        recorded = metrics_collector.get_metrics(start_time=now - timedelta(minutes=5), end_time=now)
+        assert [m.request_id for m in recorded] == ["aware-0"]
+    
+    def test_provider_health(self, metrics_collector):
+        """Test provider health over the recent window"""
+        now = datetime.utcnow()
+        for i in range(11):
+            metric = _metric(
+                timestamp=now - timedelta(minutes=10) if i == 10 else now,
+                request_id=f"health-{i}",
+                model="gpt-4o" if i < 10 else "claude-3-5-haiku",
+                provider="openai" if i < 10 else "anthropic",
+                total_time_ms=100,
+                routing_time_ms=5,
+                inference_time_ms=90,
+                input_tokens=10,
+                output_tokens=10,
+                success=i >= 3,
+            )
+            metrics_collector.record(metric)
+        
+        health = metrics_collector.get_provider_health()
+        
+        assert health["openai"]["status"] == "degraded"
+        assert health["openai"]["recent_requests"] == 10
+        assert health["openai"]["avg_latency_ms"] == 100
+        assert health["anthropic"]["status"] == "unknown"
+    
+    def test_aggregate_kernels_agree(self):
+        """Test the single-pass (Numba) kernel matches the numpy kernel"""
+        rng = np.random.default_rng(0)
+        n = 200
+        args = (
+            rng.random(n) < 0.8,
+            rng.random(n) < 0.1,
+            rng.random(n) < 0.1,
+            rng.random(n),
+            rng.integers(0, 1000, n),
+            rng.random(n) * 1000,
+            rng.integers(0, 3, n).astype(np.int32),
+            rng.integers(0, 2, n).astype(np.int32),
+            rng.integers(0, 4, n).astype(np.int32),
+            rng.integers(0, 3, n).astype(np.int32),
+            3, 2, 4, 3,
+        )
+        for expected, actual in zip(_aggregate_numpy(*args), _aggregate_loop(*args)):
+            assert np.allclose(expected, actual)
+    
+    async def test_aggregate_cache(self, metrics_collector):
+        """Test cached window aggregates are served while the refresh loop runs"""
+        cache = AggregateCache(metrics_collector)
+        metric = _metric(
+            request_id="cache-1",
+            preference="fast",
+            total_time_ms=300,
+            routing_time_ms=5,
+            inference_time_ms=290,
+            input_tokens=50,
+            output_tokens=100,
+            cost_usd=0.0001,
+        )
+        
+        # Without a running refresh loop, results are live
+        metrics_collector.record(metric)
+        assert cache.get("1h").total_requests == 1
+        
+        cache.start()
+        await asyncio.sleep(0)
+        metrics_collector.record(metric)
+        assert cache.get("1h").total_requests == 1  # Served from cache until next refresh
+        
+        cache.refresh()
+        assert cache.get("1h").total_requests == 2
+        assert cache.get("1h") is cache.get("1h")  # Same cached aggregate until the next refresh
+        await cache.stop()
 
 
 # ============================================
@@ -342,6 +795,39 @@ class TestLocalStorage:
         logs = local_storage.get_logs(limit=10)
         assert len(logs) == 1
         assert logs[0]["request_id"] == "log-123"
+        assert set(logs[0]) == {"request_id", "model", "success", "timestamp"}
+    
+    def test_get_logs_filters(self, local_storage):
+        """Test log queries filter by model and return newest first"""
+        for i in range(6):
+            local_storage.put_log({
+                "request_id": f"log-{i}",
+                "model": "gpt-4o" if i % 2 else "mock/default",
+            })
+        
+        logs = local_storage.get_logs(limit=2, model="gpt-4o")
+        assert [l["request_id"] for l in logs] == ["log-5", "log-3"]
+        
+        logs = local_storage.get_logs(limit=10, model="unknown")
+        assert logs == []
+        
+        now = datetime.utcnow()
+        assert len(local_storage.get_logs(limit=10, start_time=now - timedelta(minutes=1))) == 6
+        assert local_storage.get_logs(limit=10, start_time=now + timedelta(minutes=1)) == []
+        assert local_storage.get_logs(limit=10, end_time=now - timedelta(minutes=1)) == []
+    
+    def test_get_logs_out_of_order(self, local_storage):
+        """Test logs that finish out of order stay visible to ranged queries"""
+        now = datetime.utcnow()
+        local_storage.put_log({"request_id": "late", "timestamp": now - timedelta(minutes=5)})
+        local_storage.put_log({"request_id": "early", "timestamp": now - timedelta(minutes=10)})
+        local_storage.put_log({"request_id": "newest", "timestamp": now})
+        
+        logs = local_storage.get_logs(limit=10, start_time=now - timedelta(minutes=7))
+        assert [l["request_id"] for l in logs] == ["newest", "late"]
+        
+        logs = local_storage.get_logs(limit=10)
+        assert [l["request_id"] for l in logs] == ["newest", "late", "early"]
     
     def test_put_and_get_job(self, local_storage):
         """Test storing and retrieving jobs"""
@@ -386,6 +872,77 @@ class TestLocalStorage:
         assert stats["total_logs"] == 1
         assert stats["total_jobs"] == 1
     
+    def test_persistence(self, tmp_path):
+        """Test logs and jobs written to disk are reloaded on restart"""
+        storage = LocalStorage(str(tmp_path / "persisted.json"))
+        storage.put_log({"request_id": "log-1", "model": "gpt-4o"})
+        storage.put_job("job-1", {"status": "pending", "result": {"finished_at": datetime(2024, 1, 1)}})
+        storage.close()
+        
+        reopened = LocalStorage(str(tmp_path / "persisted.json"))
+        assert [l["request_id"] for l in reopened.get_logs(limit=10)] == ["log-1"]
+        assert reopened.get_job("job-1")["status"] == "pending"
+        assert reopened.get_job("job-1")["result"]["finished_at"].startswith("2024-01-01")
+        assert reopened.get_stats()["storage_size_bytes"] > 0
+        reopened.close()
+    
+    def test_legacy_file_migration(self, tmp_path):
+        """Test logs, metrics and jobs from a pre-stream storage.json are imported once"""
+        path = tmp_path / "storage.json"
+        path.write_text(json.dumps({
+            "logs": [{"request_id": "old-log", "model": "gpt-4o", "timestamp": "2024-01-01T00:00:00"}],
+            "jobs": {"old-job": {"status": "completed", "created_at": "2024-01-01T00:00:00"}},
+            "metrics": [{"name": "latency", "value": 1.0, "timestamp": "2024-01-01T00:00:00"}],
+        }, indent=2))
+        
+        storage = LocalStorage(str(path))
+        assert [l["request_id"] for l in storage.get_logs(limit=10)] == ["old-log"]
+        assert [m["name"] for m in storage.get_metrics()] == ["latency"]
+        assert storage.get_job("old-job")["status"] == "completed"
+        storage.close()
+        
+        assert json.loads(path.read_text()) == {}
+        reopened = LocalStorage(str(path))
+        assert [l["request_id"] for l in reopened.get_logs(limit=10)] == ["old-log"]
+        assert reopened.get_job("old-job")["status"] == "completed"
+        reopened.close()
+    
+    def test_writer_survives_failed_write(self, tmp_path):
+        """Test a failed disk write is logged and later writes still persist"""
+        storage = LocalStorage(str(tmp_path / "flaky.json"))
+        append_many = storage._logs.append_many
+        
+        def fail_once(records):
+            storage._logs.append_many = append_many
+            raise OSError("No space left on device")
+        
+        storage._logs.append_many = fail_once
+        storage.put_log({"request_id": "dropped"})
+        storage.flush()
+        storage.put_log({"request_id": "kept"})
+        storage.flush()
+        assert storage._writer.is_alive()
+        storage.close()
+        
+        reopened = LocalStorage(str(tmp_path / "flaky.json"))
+        assert [l["request_id"] for l in reopened.get_logs(limit=10)] == ["kept"]
+        reopened.close()
+    
+    def test_log_retention_cap(self, tmp_path):
+        """Test logs are capped to the newest entries across restarts"""
+        class SmallStorage(LocalStorage):
+            MAX_LOGS = 5
+        
+        storage = SmallStorage(str(tmp_path / "capped.json"))
+        for i in range(12):
+            storage.put_log({"request_id": f"log-{i}"})
+        storage.close()
+        
+        reopened = SmallStorage(str(tmp_path / "capped.json"))
+        logs = reopened.get_logs(limit=100)
+        assert len(logs) == 5
+        assert {l["request_id"] for l in logs} == {f"log-{i}" for i in range(7, 12)}
+    
     def test_clear_storage(self, local_storage):
         """Test clearing storage"""
         local_storage.put_log({"id": 1})
@@ -432,14 +989,16 @@ class TestRequestModels:
     
     def test_all_task_types(self):
         """Test all task types are valid"""
+        payload = {"text": "Test"}
         for task in TaskType:
-            request = GenerateRequest(task=task, text="Test")
+            request = GenerateRequest.model_validate({**payload, "task": task.value})
             assert request.task == task
     
     def test_all_preferences(self):
         """Test all preferences are valid"""
+        payload = {"text": "Test"}
         for pref in ModelPreference:
-            request = GenerateRequest(model_preference=pref, text="Test")
+            request = GenerateRequest.model_validate({**payload, "model_preference": pref.value})
             assert request.model_preference == pref
 
 
@@ -472,13 +1031,11 @@ class TestIntegration:
         assert cost.total_cost_usd >= 0
         
         # 3. Record metric
-        metric = RequestMetric(
-            timestamp=datetime.utcnow(),
+        metric = _metric(
             request_id="integration-test",
             model="mock/default",
             provider="mock",
             task="summarize",
-            preference="balanced",
             total_time_ms=response.latency_ms,
             routing_time_ms=5,
             inference_time_ms=response.latency_ms - 5,
@@ -486,8 +1043,6 @@ class TestIntegration:
             output_tokens=response.output_tokens,
             cost_usd=cost.total_cost_usd,
             success=response.success,
-            cached=False,
-            fallback_used=False,
         )
         metrics_collector.record(metric)
         